@@ -6,6 +6,7 @@ StreamScribe Core Package
 模块说明:
 - config: 配置文件加载和管理
 - manager: 任务管理和平台分发
+- cancel: 任务取消与超时
 - transcriber: AI 转录功能
 - utils: 通用工具函数
 - platform: 平台特定的处理逻辑
@@ -17,5 +18,6 @@ __author__ = "StreamScribe Team"
 # 导出主要的类和函数，方便外部调用
 from .manager import TaskManager
 from .config import Config
+from .cancel import CancellationToken
 
-__all__ = ['TaskManager', 'Config']
+__all__ = ['TaskManager', 'Config', 'CancellationToken']
@@ -0,0 +1,10 @@
+"""
+python -m core 入口，详见 core/cli.py
+"""
+
+import sys
+from .cli import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,504 @@
+"""
+缓存模块
+
+提供基于 SQLite 的持久化缓存，存放在临时文件目录中：
+- MetadataCache: 视频信息缓存，按 (平台, 视频ID) 索引，支持过期时间和容量上限
+- TranscriptCache: 文稿缓存，按音频内容哈希 + 转录参数索引，相同音频不再重复转录
+- ShortLinkCache: 短链接缓存，按 (平台, 短链接代码) 记录跳转后的视频链接
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from .config import get_config
+
+
+class MetadataCache:
+    """视频信息缓存"""
+
+    def __init__(self, db_path=None, ttl_hours=None, max_entries=None):
+        """
+        初始化视频信息缓存
+
+        Args:
+            db_path (str): 数据库文件路径，默认为临时目录下的 metadata_cache.db
+            ttl_hours (float): 缓存有效期（小时），默认读取 [cache] metadata_ttl_hours
+            max_entries (int): 最大缓存条目数，默认读取 [cache] metadata_max_entries
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        if db_path is None:
+            db_path = os.path.join(self.config.temp_dir, 'metadata_cache.db')
+        if ttl_hours is None:
+            ttl_hours = self.config.metadata_cache_ttl_hours
+        if max_entries is None:
+            max_entries = self.config.metadata_cache_max_entries
+
+        self.db_path = db_path
+        self.ttl = ttl_hours * 3600
+        self.max_entries = max(1, max_entries)
+        self.enabled = self.config.metadata_cache_enabled
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            try:
+                self._init_db()
+            except sqlite3.Error as e:
+                self.logger.warning(f"无法初始化视频信息缓存，已禁用: {e}")
+                self.enabled = False
+
+    def _connect(self):
+        """创建数据库连接"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """创建缓存表"""
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS metadata (
+                    platform TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (platform, video_id)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_metadata_accessed ON metadata (accessed_at)')
+            conn.commit()
+
+    def get(self, platform, video_id):
+        """
+        读取缓存的视频信息
+
+        Args:
+            platform (str): 平台名称
+            video_id (str): 视频 ID
+
+        Returns:
+            dict: 视频信息，未命中或已过期时返回 None
+        """
+        if not self.enabled or not video_id:
+            return None
+
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                row = conn.execute(
+                    'SELECT data, created_at FROM metadata WHERE platform = ? AND video_id = ?',
+                    (platform, video_id)
+                ).fetchone()
+
+                if not row:
+                    return None
+
+                data, created_at = row
+                now = time.time()
+
+                if now - created_at > self.ttl:
+                    conn.execute('DELETE FROM metadata WHERE platform = ? AND video_id = ?', (platform, video_id))
+                    conn.commit()
+                    return None
+
+                conn.execute(
+                    'UPDATE metadata SET accessed_at = ? WHERE platform = ? AND video_id = ?',
+                    (now, platform, video_id)
+                )
+                conn.commit()
+
+            self.logger.info(f"视频信息缓存命中: {platform}/{video_id}")
+            return json.loads(data)
+
+        except (sqlite3.Error, ValueError) as e:
+            self.logger.warning(f"读取视频信息缓存失败: {e}")
+            return None
+
+    def set(self, platform, video_id, info):
+        """
+        写入视频信息
+
+        Args:
+            platform (str): 平台名称
+            video_id (str): 视频 ID
+            info (dict): 视频信息
+        """
+        if not self.enabled or not video_id or not info:
+            return
+
+        try:
+            data = json.dumps(info, ensure_ascii=False)
+            now = time.time()
+
+            with self._lock, closing(self._connect()) as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO metadata (platform, video_id, data, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (platform, video_id, data, now, now)
+                )
+                self._evict(conn, now)
+                conn.commit()
+
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.logger.warning(f"写入视频信息缓存失败: {e}")
+
+    def _evict(self, conn, now):
+        """删除过期条目，超出容量时按最近访问时间淘汰"""
+        conn.execute('DELETE FROM metadata WHERE created_at < ?', (now - self.ttl,))
+
+        count = conn.execute('SELECT COUNT(*) FROM metadata').fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                'DELETE FROM metadata WHERE rowid IN ('
+                'SELECT rowid FROM metadata ORDER BY accessed_at ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        """清空缓存"""
+        if not self.enabled:
+            return
+
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('DELETE FROM metadata')
+            conn.commit()
+
+
+class TranscriptCache:
+    """文稿缓存（内容寻址）"""
+
+    def __init__(self, db_path=None, max_entries=None):
+        """
+        初始化文稿缓存
+
+        Args:
+            db_path (str): 数据库文件路径，默认为临时目录下的 transcript_cache.db
+            max_entries (int): 最大缓存条目数，默认读取 [cache] transcript_max_entries
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        if db_path is None:
+            db_path = os.path.join(self.config.temp_dir, 'transcript_cache.db')
+        if max_entries is None:
+            max_entries = self.config.transcript_cache_max_entries
+
+        self.db_path = db_path
+        self.max_entries = max(1, max_entries)
+        self.enabled = self.config.transcript_cache_enabled
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            try:
+                self._init_db()
+            except sqlite3.Error as e:
+                self.logger.warning(f"无法初始化文稿缓存，已禁用: {e}")
+                self.enabled = False
+
+    def _connect(self):
+        """创建数据库连接"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """创建缓存表"""
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    cache_key TEXT PRIMARY KEY,
+                    ext TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    audio_duration REAL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_transcripts_accessed ON transcripts (accessed_at)')
+            conn.commit()
+
+    @staticmethod
+    def make_key(audio_hash, params):
+        """
+        生成缓存键
+
+        Args:
+            audio_hash (str): 音频内容哈希
+            params (list): 影响转录结果的参数（模型、量化类型、语言、提示词、VAD、输出格式等）
+
+        Returns:
+            str: 缓存键
+        """
+        payload = json.dumps({'audio': audio_hash, 'params': params}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, cache_key):
+        """
+        读取缓存的文稿
+
+        Args:
+            cache_key (str): make_key 生成的缓存键
+
+        Returns:
+            dict: 包含 ext、content、audio_duration 的字典，未命中时返回 None
+        """
+        if not self.enabled or not cache_key:
+            return None
+
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                row = conn.execute(
+                    'SELECT ext, content, audio_duration FROM transcripts WHERE cache_key = ?',
+                    (cache_key,)
+                ).fetchone()
+
+                if not row:
+                    return None
+
+                conn.execute('UPDATE transcripts SET accessed_at = ? WHERE cache_key = ?', (time.time(), cache_key))
+                conn.commit()
+
+            ext, content, audio_duration = row
+            return {'ext': ext, 'content': content, 'audio_duration': audio_duration or 0.0}
+
+        except sqlite3.Error as e:
+            self.logger.warning(f"读取文稿缓存失败: {e}")
+            return None
+
+    def set(self, cache_key, transcript_file, audio_duration=None):
+        """
+        写入文稿
+
+        Args:
+            cache_key (str): make_key 生成的缓存键
+            transcript_file (str): 生成的文稿文件路径
+            audio_duration (float): 音频时长（秒）
+        """
+        if not self.enabled or not cache_key:
+            return
+
+        try:
+            with open(transcript_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+            ext = os.path.splitext(transcript_file)[1]
+            now = time.time()
+
+            with self._lock, closing(self._connect()) as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO transcripts (cache_key, ext, content, audio_duration, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (cache_key, ext, content, audio_duration, now, now)
+                )
+
+                count = conn.execute('SELECT COUNT(*) FROM transcripts').fetchone()[0]
+                if count > self.max_entries:
+                    conn.execute(
+                        'DELETE FROM transcripts WHERE rowid IN ('
+                        'SELECT rowid FROM transcripts ORDER BY accessed_at ASC LIMIT ?)',
+                        (count - self.max_entries,)
+                    )
+                conn.commit()
+
+        except (OSError, UnicodeDecodeError, sqlite3.Error) as e:
+            self.logger.warning(f"写入文稿缓存失败: {e}")
+
+    def clear(self):
+        """清空缓存"""
+        if not self.enabled:
+            return
+
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('DELETE FROM transcripts')
+            conn.commit()
+
+
+class ShortLinkCache:
+    """短链接缓存（短链接与视频的对应关系不会变化，不设过期时间）"""
+
+    # 最大缓存条目数，超出时按最近访问时间淘汰
+    MAX_ENTRIES = 20000
+    # 每次查询的短链接数（SQLite 默认最多 999 个参数）
+    QUERY_BATCH = 500
+
+    def __init__(self, db_path=None):
+        """
+        初始化短链接缓存
+
+        Args:
+            db_path (str): 数据库文件路径，默认为临时目录下的 short_link_cache.db
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        if db_path is None:
+            db_path = os.path.join(self.config.temp_dir, 'short_link_cache.db')
+
+        self.db_path = db_path
+        self.enabled = self.config.short_link_cache_enabled
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            try:
+                self._init_db()
+            except sqlite3.Error as e:
+                self.logger.warning(f"无法初始化短链接缓存，已禁用: {e}")
+                self.enabled = False
+
+    def _connect(self):
+        """创建数据库连接"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """创建缓存表"""
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS short_links (
+                    platform TEXT NOT NULL,
+                    code TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (platform, code)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_short_links_accessed ON short_links (accessed_at)')
+            conn.commit()
+
+    def get_many(self, platform, codes):
+        """
+        批量读取短链接跳转后的链接
+
+        Args:
+            platform (str): 平台名称
+            codes (list): 短链接代码列表
+
+        Returns:
+            dict: {短链接代码: 视频链接}，只包含命中的条目
+        """
+        codes = list(dict.fromkeys(code for code in codes if code))
+        if not self.enabled or not codes:
+            return {}
+
+        found = {}
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                for start in range(0, len(codes), self.QUERY_BATCH):
+                    batch = codes[start:start + self.QUERY_BATCH]
+                    placeholders = ','.join('?' * len(batch))
+                    found.update(conn.execute(
+                        f'SELECT code, url FROM short_links WHERE platform = ? AND code IN ({placeholders})',
+                        [platform] + batch
+                    ).fetchall())
+
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        'UPDATE short_links SET accessed_at = ? WHERE platform = ? AND code = ?',
+                        [(now, platform, code) for code in found]
+                    )
+                    conn.commit()
+
+        except sqlite3.Error as e:
+            self.logger.warning(f"读取短链接缓存失败: {e}")
+            return {}
+
+        return found
+
+    def get(self, platform, code):
+        """
+        读取短链接跳转后的链接
+
+        Returns:
+            str: 视频链接，未命中时返回 None
+        """
+        return self.get_many(platform, [code]).get(code)
+
+    def set(self, platform, code, url):
+        """
+        写入短链接跳转后的链接
+
+        Args:
+            platform (str): 平台名称
+            code (str): 短链接代码
+            url (str): 视频链接
+        """
+        if not self.enabled or not code or not url:
+            return
+
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO short_links (platform, code, url, accessed_at) VALUES (?, ?, ?, ?)',
+                    (platform, code, url, time.time())
+                )
+
+                count = conn.execute('SELECT COUNT(*) FROM short_links').fetchone()[0]
+                if count > self.MAX_ENTRIES:
+                    conn.execute(
+                        'DELETE FROM short_links WHERE rowid IN ('
+                        'SELECT rowid FROM short_links ORDER BY accessed_at ASC LIMIT ?)',
+                        (count - self.MAX_ENTRIES,)
+                    )
+                conn.commit()
+
+        except sqlite3.Error as e:
+            self.logger.warning(f"写入短链接缓存失败: {e}")
+
+    def clear(self):
+        """清空缓存"""
+        if not self.enabled:
+            return
+
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('DELETE FROM short_links')
+            conn.commit()
+
+
+# 全局缓存实例
+_metadata_cache = None
+_transcript_cache = None
+_short_link_cache = None
+_cache_lock = threading.Lock()
+
+def get_metadata_cache():
+    """
+    获取全局视频信息缓存实例
+
+    Returns:
+        MetadataCache: 缓存实例
+    """
+    global _metadata_cache
+    with _cache_lock:
+        if _metadata_cache is None:
+            _metadata_cache = MetadataCache()
+    return _metadata_cache
+
+
+def get_transcript_cache():
+    """
+    获取全局文稿缓存实例
+
+    Returns:
+        TranscriptCache: 缓存实例
+    """
+    global _transcript_cache
+    with _cache_lock:
+        if _transcript_cache is None:
+            _transcript_cache = TranscriptCache()
+    return _transcript_cache
+
+
+def get_short_link_cache():
+    """
+    获取全局短链接缓存实例
+
+    Returns:
+        ShortLinkCache: 缓存实例
+    """
+    global _short_link_cache
+    with _cache_lock:
+        if _short_link_cache is None:
+            _short_link_cache = ShortLinkCache()
+    return _short_link_cache
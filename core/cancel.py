@@ -0,0 +1,278 @@
+"""
+任务取消模块
+
+CancellationToken 把取消请求从 UI / 命令行 / HTTP 服务传递到 TaskManager 和各平台处理器。
+取消时会立即终止登记在令牌上的外部进程及其子进程（yt-dlp / BBDown / ffmpeg / whisper），
+正在等待重试的任务也会被唤醒。
+
+批量执行器为每个任务创建子令牌并绑定到执行线程（contextvars），
+处理器、转录器和 run_process 通过 current_token() 取得当前任务的令牌，不需要逐层传参。
+"""
+
+import atexit
+import contextlib
+import contextvars
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+
+
+class JobCancelledError(Exception):
+    """任务被取消或超时"""
+
+
+_current_token = contextvars.ContextVar('streamscribe_cancel_token', default=None)
+
+# 所有正在运行的外部进程，程序退出时一并终止
+_running_processes = set()
+_running_lock = threading.Lock()
+
+
+class CancellationToken:
+    """取消令牌"""
+
+    def __init__(self, parent=None):
+        """
+        创建取消令牌
+
+        Args:
+            parent (CancellationToken): 父令牌，父令牌取消时本令牌一并取消
+        """
+        self.logger = logging.getLogger(__name__)
+        self.reason = None
+        self.parent = parent
+
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._children = set()
+        self._timer = None
+
+        if parent:
+            parent._add_child(self)
+
+    @property
+    def cancelled(self):
+        """是否已取消"""
+        return self._event.is_set()
+
+    def cancel(self, reason="任务已取消"):
+        """
+        取消令牌：终止登记的外部进程，并取消所有子令牌
+
+        Args:
+            reason (str): 取消原因，作为任务的错误信息
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            processes = list(self._processes)
+            children = list(self._children)
+
+        if self._timer:
+            self._timer.cancel()
+
+        if processes:
+            self.logger.info(f"{reason}，终止 {len(processes)} 个外部进程")
+        for process in processes:
+            kill_process_tree(process)
+        for child in children:
+            child.cancel(reason)
+
+    def set_timeout(self, seconds, reason=None):
+        """
+        设置超时：到期后自动取消（再次调用会替换之前的计时）
+
+        Args:
+            seconds (float): 剩余时间（秒），None 或 0 表示停止计时
+            reason (str): 超时后的取消原因
+        """
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if not seconds or self._event.is_set():
+                return
+            self._timer = threading.Timer(seconds, self.cancel, args=(reason or f"任务超时（超过 {seconds:g} 秒）",))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def raise_if_cancelled(self):
+        """已取消时抛出 JobCancelledError"""
+        if self._event.is_set():
+            raise JobCancelledError(self.reason)
+
+    def wait(self, seconds):
+        """
+        等待指定时间，期间被取消时立即抛出 JobCancelledError（用于重试间隔）
+
+        Args:
+            seconds (float): 等待时间（秒）
+        """
+        if self._event.wait(seconds):
+            raise JobCancelledError(self.reason)
+
+    def register_process(self, process):
+        """登记外部进程，令牌已取消时立即终止该进程"""
+        with self._lock:
+            if not self._event.is_set():
+                self._processes.add(process)
+                return
+        kill_process_tree(process)
+        raise JobCancelledError(self.reason)
+
+    def unregister_process(self, process):
+        """外部进程结束后取消登记"""
+        with self._lock:
+            self._processes.discard(process)
+
+    def close(self):
+        """任务结束后停止超时计时并与父令牌解除关联"""
+        self.set_timeout(None)
+        if self.parent:
+            self.parent._remove_child(self)
+
+    def _add_child(self, child):
+        with self._lock:
+            if not self._event.is_set():
+                self._children.add(child)
+                return
+        child.cancel(self.reason)
+
+    def _remove_child(self, child):
+        with self._lock:
+            self._children.discard(child)
+
+
+@contextlib.contextmanager
+def bind_token(token):
+    """
+    在当前线程（或协程）中绑定取消令牌
+
+    Args:
+        token (CancellationToken): 取消令牌，None 表示不可取消
+    """
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def current_token():
+    """
+    获取当前绑定的取消令牌
+
+    Returns:
+        CancellationToken: 取消令牌，未绑定时返回 None
+    """
+    return _current_token.get()
+
+
+def check_cancelled():
+    """当前任务已取消时抛出 JobCancelledError"""
+    token = _current_token.get()
+    if token:
+        token.raise_if_cancelled()
+
+
+def cancellable_sleep(seconds):
+    """可被取消打断的 time.sleep"""
+    token = _current_token.get()
+    if token:
+        token.wait(seconds)
+    else:
+        time.sleep(seconds)
+
+
+def popen_group_kwargs():
+    """
+    启动外部进程的附加参数：在 POSIX 上让子进程成为新进程组的组长，
+    终止时可以连同它启动的进程（例如 BBDown 调用的 ffmpeg）一起结束
+
+    Returns:
+        dict: 传给 subprocess.Popen / asyncio.create_subprocess_exec 的参数
+    """
+    if os.name == 'nt':
+        return {}
+    return {'start_new_session': True}
+
+
+@contextlib.contextmanager
+def track_process(process):
+    """
+    运行期间把外部进程登记到当前任务的令牌上
+
+    Args:
+        process: subprocess.Popen 或 asyncio 子进程
+
+    Raises:
+        JobCancelledError: 令牌已取消（进程会被立即终止）
+    """
+    token = _current_token.get()
+    with _running_lock:
+        _running_processes.add(process)
+    try:
+        if token:
+            token.register_process(process)
+        yield process
+    finally:
+        if token:
+            token.unregister_process(process)
+        with _running_lock:
+            _running_processes.discard(process)
+
+
+def kill_process_tree(process):
+    """
+    终止外部进程及其所有子进程
+
+    POSIX 上终止整个进程组（见 popen_group_kwargs）；否则用 psutil 遍历进程树，
+    未安装 psutil 时在 Windows 上使用 taskkill /T。
+    这里只发送终止信号，由调用方 wait() 回收进程，返回码保持为被信号终止的值。
+
+    Args:
+        process: subprocess.Popen 或 asyncio 子进程
+    """
+    if process.returncode is not None:
+        return
+
+    pid = process.pid
+    try:
+        if os.name != 'nt' and os.getpgid(pid) == pid:
+            os.killpg(pid, signal.SIGKILL)
+            return
+
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+
+        if psutil:
+            parent = psutil.Process(pid)
+            for proc in parent.children(recursive=True) + [parent]:
+                try:
+                    proc.kill()
+                except psutil.NoSuchProcess:
+                    pass
+        elif os.name == 'nt':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], capture_output=True, timeout=10)
+        else:
+            os.kill(pid, signal.SIGKILL)
+    except Exception as e:
+        # 进程已退出（ProcessLookupError / psutil.NoSuchProcess）或无权限
+        logging.getLogger(__name__).debug(f"终止进程 {pid} 失败: {e}")
+
+
+@atexit.register
+def _kill_running_processes():
+    """程序退出时终止仍在运行的外部进程（它们在独立的进程组中，不会收到终端的 Ctrl+C）"""
+    with _running_lock:
+        processes = list(_running_processes)
+    for process in processes:
+        kill_process_tree(process)
@@ -0,0 +1,185 @@
+"""
+长音频分段模块
+
+用 ffmpeg silencedetect 找出静音区间，在接近目标时长的静音处切分音频，
+各段转录完成后再按偏移量修正时间戳并拼接为一个文稿。
+"""
+
+import logging
+import os
+import re
+import subprocess
+from .media import FFMPEG_COMMANDS
+from .process import run_process
+
+SILENCE_START_PATTERN = re.compile(r'silence_start:\s*(-?\d+(?:\.\d+)?)')
+SILENCE_END_PATTERN = re.compile(r'silence_end:\s*(-?\d+(?:\.\d+)?)')
+SRT_TIME_PATTERN = re.compile(r'(\d+):(\d{2}):(\d{2})[,.](\d{3})')
+
+
+def detect_silences(audio_path, noise_db=-30, min_silence=0.5, timeout=1800):
+    """
+    检测音频中的静音区间
+
+    Args:
+        audio_path (str): 音频文件路径
+        noise_db (int): 静音阈值（dB）
+        min_silence (float): 最短静音时长（秒）
+
+    Returns:
+        list: (start, end) 列表，ffmpeg 不可用时返回 None
+    """
+    logger = logging.getLogger(__name__)
+
+    for ffmpeg_cmd in FFMPEG_COMMANDS:
+        command = [
+            ffmpeg_cmd,
+            '-hide_banner',
+            '-i', audio_path,
+            '-af', f'silencedetect=noise={noise_db}dB:d={min_silence}',
+            '-f', 'null',
+            '-'
+        ]
+
+        silences = []
+        pending = []
+
+        def collect(line):
+            match = SILENCE_START_PATTERN.search(line)
+            if match:
+                pending.append(max(0.0, float(match.group(1))))
+                return
+            match = SILENCE_END_PATTERN.search(line)
+            if match and pending:
+                silences.append((pending.pop(), float(match.group(1))))
+
+        try:
+            result = run_process(command, timeout=timeout, line_callback=collect)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            continue
+
+        if result.returncode == 0:
+            logger.info(f"检测到 {len(silences)} 个静音区间")
+            return silences
+
+    logger.warning("ffmpeg 不可用，无法检测静音区间")
+    return None
+
+
+def plan_chunks(duration, silences, chunk_seconds, search_window=None):
+    """
+    规划分段边界
+
+    每个目标切分点（chunk_seconds 的整数倍）优先移动到附近静音区间的中点，
+    附近没有静音时直接在目标点切分。
+
+    Args:
+        duration (float): 音频总时长（秒）
+        silences (list): (start, end) 静音区间列表
+        chunk_seconds (float): 每段目标时长（秒）
+        search_window (float): 在目标点前后搜索静音的范围（秒），默认为 chunk_seconds 的 20%
+
+    Returns:
+        list: (start, end) 分段列表
+    """
+    if search_window is None:
+        search_window = chunk_seconds * 0.2
+
+    midpoints = [(start + end) / 2 for start, end in silences or []]
+    boundaries = [0.0]
+
+    target = chunk_seconds
+    while target < duration - chunk_seconds / 2:
+        candidates = [m for m in midpoints if abs(m - target) <= search_window and m > boundaries[-1]]
+        cut = min(candidates, key=lambda m: abs(m - target)) if candidates else target
+        boundaries.append(cut)
+        target = cut + chunk_seconds
+
+    boundaries.append(duration)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def split_audio(audio_path, chunks, output_dir, timeout=1800):
+    """
+    按分段切出音频（转为 16kHz 单声道 wav，保证切分点精确）
+
+    Args:
+        audio_path (str): 音频文件路径
+        chunks (list): (start, end) 分段列表
+        output_dir (str): 分段文件输出目录
+
+    Returns:
+        list: 分段文件路径列表，ffmpeg 不可用或切分失败时返回 None
+    """
+    logger = logging.getLogger(__name__)
+
+    for ffmpeg_cmd in FFMPEG_COMMANDS:
+        chunk_files = []
+        try:
+            for i, (start, end) in enumerate(chunks):
+                chunk_file = os.path.join(output_dir, f"chunk_{i:03d}.wav")
+                command = [
+                    ffmpeg_cmd,
+                    '-hide_banner',
+                    '-ss', f'{start:.3f}',
+                    '-t', f'{end - start:.3f}',
+                    '-i', audio_path,
+                    '-vn',
+                    '-ac', '1',
+                    '-ar', '16000',
+                    '-y',
+                    chunk_file
+                ]
+                result = run_process(command, timeout=timeout)
+                if result.returncode != 0 or not os.path.exists(chunk_file):
+                    logger.warning(f"切分音频失败: {result.stderr[-500:]}")
+                    return None
+                chunk_files.append(chunk_file)
+            return chunk_files
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            continue
+
+    return None
+
+
+def _shift_srt_time(match, offset):
+    """平移单个 SRT 时间戳"""
+    hours, minutes, seconds, millis = (int(g) for g in match.groups())
+    total = hours * 3600000 + minutes * 60000 + seconds * 1000 + millis + int(round(offset * 1000))
+    total = max(0, total)
+    hours, total = divmod(total, 3600000)
+    minutes, total = divmod(total, 60000)
+    seconds, millis = divmod(total, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
+
+
+def merge_transcripts(parts, output_path, output_format):
+    """
+    拼接各段文稿
+
+    Args:
+        parts (list): (transcript_file, offset) 列表，按时间顺序排列
+        output_path (str): 输出文件路径
+        output_format (str): 'srt' 或 'txt'
+    """
+    index = 0
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for transcript_file, offset in parts:
+            with open(transcript_file, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            if not content:
+                continue
+
+            if output_format != 'srt':
+                out.write(content + '\n')
+                continue
+
+            # SRT：重新编号并按分段起点平移时间戳
+            for block in re.split(r'\n\s*\n', content.replace('\r\n', '\n')):
+                lines = block.strip().split('\n')
+                if len(lines) < 2 or '-->' not in lines[1]:
+                    continue
+                index += 1
+                timing = SRT_TIME_PATTERN.sub(lambda m: _shift_srt_time(m, offset), lines[1])
+                out.write(f"{index}\n{timing}\n")
+                out.write('\n'.join(lines[2:]) + '\n\n')
@@ -0,0 +1,348 @@
+"""
+命令行入口
+
+不依赖 CustomTkinter 的无界面入口，供没有显示器的服务器和脚本使用：
+
+    python -m core transcribe <链接|文件|目录> ... [--input list.txt] [--recursive] [--rescan-all]
+    python -m core watch [目录] [--recursive] [--workers 2]
+    python -m core serve [--host 127.0.0.1] [--port 8765]
+
+每个任务完成后向标准输出写一行 JSON，最后一行是汇总；
+工具命令、进度和日志全部写到标准错误，标准输出只包含 JSON 行。
+
+退出码：
+    0    全部成功
+    1    至少一个任务失败
+    2    参数错误或没有可处理的任务
+    130  被用户中断（Ctrl+C 会终止正在运行的外部进程，已完成的任务照常输出）
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from .cancel import CancellationToken
+from .config import get_config, load_config
+from .utils import setup_logging, validate_url
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+class JsonLinesWriter:
+    """线程安全的 JSON 行输出"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        """写出一条记录"""
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+def add_common_options(parser):
+    """添加各子命令通用的配置覆盖参数"""
+    parser.add_argument('-o', '--output-dir', help='文稿输出目录（覆盖配置文件中的 output_dir）')
+    parser.add_argument('-j', '--concurrency', type=int, help='同时处理的任务数（覆盖 max_concurrent_tasks）')
+    parser.add_argument('--force-transcribe', action='store_true', help='跳过字幕检测，直接使用 AI 转录')
+    parser.add_argument('--format', choices=['txt', 'srt'], help='Whisper 输出格式')
+
+
+def build_parser():
+    """
+    构建命令行参数解析器
+
+    Returns:
+        argparse.ArgumentParser: 参数解析器
+    """
+    parser = argparse.ArgumentParser(prog='python -m core', description='StreamScribe 命令行工具')
+    parser.add_argument('--config', help='配置文件路径（默认为当前目录下的 config.ini）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='在标准错误输出 INFO 级别日志')
+
+    subparsers = parser.add_subparsers(dest='command')
+
+    transcribe = subparsers.add_parser('transcribe', help='处理视频链接、本地文件或目录')
+    transcribe.add_argument('sources', nargs='*', help='视频链接、本地文件或目录')
+    transcribe.add_argument('-i', '--input', help='从文件读取来源列表（每行一个，- 表示标准输入）')
+    transcribe.add_argument('-r', '--recursive', action='store_true', help='递归扫描子目录')
+    transcribe.add_argument('--rescan-all', action='store_true', help='忽略已转录文件索引，重新处理目录中的所有文件')
+    add_common_options(transcribe)
+    transcribe.set_defaults(handler=command_transcribe)
+
+    watch = subparsers.add_parser('watch', help='监视文件夹，自动转录新加入的音视频文件')
+    watch.add_argument('directory', nargs='?', help='监视的文件夹（默认读取 [watch] directory）')
+    watch.add_argument('-r', '--recursive', action='store_true', default=None, help='同时监视子文件夹')
+    watch.add_argument('--workers', type=int, help='同时转录的文件数（覆盖 [watch] workers）')
+    watch.add_argument('--stable-seconds', type=float, help='文件保持不变多少秒后开始处理（覆盖 [watch] stable_seconds）')
+    watch.add_argument('--poll', action='store_true', help='不使用 inotify，定时扫描文件夹')
+    add_common_options(watch)
+    watch.set_defaults(handler=command_watch)
+
+    serve = subparsers.add_parser('serve', help='启动本机 HTTP 任务服务')
+    serve.add_argument('--host', help='监听地址（覆盖 [server] host）')
+    serve.add_argument('--port', type=int, help='端口（覆盖 [server] port）')
+    serve.add_argument('--workers', type=int, help='同时处理的任务数（覆盖 [server] workers）')
+    serve.add_argument('--queue-size', type=int, help='排队任务上限（覆盖 [server] queue_size）')
+    add_common_options(serve)
+    serve.set_defaults(handler=command_serve)
+
+    return parser
+
+
+def apply_overrides(args):
+    """把命令行参数写入配置（只在内存中生效）"""
+    config = get_config()
+    if getattr(args, 'output_dir', None):
+        config.set_override('paths', 'output_dir', os.path.abspath(args.output_dir))
+    if getattr(args, 'concurrency', None):
+        config.set_override('general', 'max_concurrent_tasks', max(1, args.concurrency))
+    if getattr(args, 'force_transcribe', False):
+        config.set_override('general', 'force_transcribe_mode', True)
+    if getattr(args, 'format', None):
+        config.set_override('whisper', 'output_format_srt', args.format == 'srt')
+
+
+def read_sources(args):
+    """
+    汇总命令行参数和 --input 文件中的来源
+
+    Returns:
+        list: 来源列表（去掉空行和 # 注释行）
+    """
+    sources = list(args.sources)
+
+    if args.input:
+        if args.input == '-':
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        sources.extend(line.strip() for line in lines)
+
+    return [source for source in sources if source and not source.startswith('#')]
+
+
+def classify_sources(sources):
+    """
+    把来源分为链接、本地文件和目录
+
+    Returns:
+        tuple: (urls, files, directories)
+    """
+    urls, files, directories = [], [], []
+    for source in sources:
+        if validate_url(source):
+            urls.append(source)
+        elif os.path.isdir(source):
+            directories.append(os.path.abspath(source))
+        else:
+            files.append(os.path.abspath(source))
+    return urls, files, directories
+
+
+def job_record(job, kind):
+    """把 Job 转换为输出的 JSON 记录"""
+    record = {'type': 'job', 'kind': kind}
+    record.update(job.to_dict())
+    record['success'] = job.success
+    record['error'] = job.error
+    return record
+
+
+def command_transcribe(args, writer):
+    """transcribe 子命令"""
+    from .manager import TaskManager
+
+    urls, files, directories = classify_sources(read_sources(args))
+    if not urls and not files and not directories:
+        print("❌ 没有可处理的链接或文件", file=sys.stderr)
+        return EXIT_USAGE
+
+    manager = TaskManager()
+    cancel_token = CancellationToken()
+    start_time = time.time()
+    jobs = []
+    skipped = []
+
+    def status_callback(message):
+        print(f"ℹ️ {message}", file=sys.stderr)
+
+    finished = threading.Event()
+
+    def run_batches():
+        try:
+            for kind, sources, process in (
+                ('url', urls, manager.process_batch_urls),
+                ('file', files, manager.process_batch_files)
+            ):
+                if not sources:
+                    continue
+                batch = process(
+                    sources, status_callback, lambda job, kind=kind: writer.write(job_record(job, kind)),
+                    cancel_token=cancel_token
+                )
+                jobs.extend(batch['jobs'])
+
+            # 目录中已转录且未变化的文件由索引跳过
+            for directory in directories:
+                if cancel_token.cancelled:
+                    break
+                batch = manager.process_directory(
+                    directory, status_callback, lambda job: writer.write(job_record(job, 'file')),
+                    recursive=args.recursive, rescan_all=args.rescan_all, cancel_token=cancel_token
+                )
+                jobs.extend(batch['jobs'])
+                skipped.extend(batch['skipped'])
+        finally:
+            finished.set()
+
+    # 批次在后台线程中执行，主线程收到 Ctrl+C 后取消批次并等待各任务结束
+    threading.Thread(target=run_batches, name='streamscribe-cli', daemon=True).start()
+    try:
+        while not finished.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        print("\n⚠️ 正在取消任务...", file=sys.stderr)
+        cancel_token.cancel("已被用户中断")
+        finished.wait()
+
+    success_count = sum(1 for job in jobs if job.success)
+    writer.write({
+        'type': 'summary',
+        'total_count': len(jobs),
+        'success_count': success_count,
+        'failed_count': len(jobs) - success_count,
+        'cancelled_count': sum(1 for job in jobs if job.status == 'cancelled'),
+        'skipped_count': len(skipped),
+        'elapsed': time.time() - start_time
+    })
+
+    if cancel_token.cancelled:
+        return EXIT_INTERRUPTED
+    return EXIT_OK if success_count == len(jobs) else EXIT_FAILED
+
+
+def command_watch(args, writer):
+    """watch 子命令"""
+    from .manager import TaskManager
+    from .watcher import FolderWatcher
+
+    directory = args.directory or get_config().watch_directory
+    if not directory:
+        print("❌ 请指定要监视的文件夹，或在配置文件 [watch] 节设置 directory", file=sys.stderr)
+        return EXIT_USAGE
+    if not os.path.isdir(directory):
+        print(f"❌ 目录不存在: {directory}", file=sys.stderr)
+        return EXIT_USAGE
+
+    def status_callback(message):
+        print(f"ℹ️ {message}", file=sys.stderr)
+
+    cancel_token = CancellationToken()
+    watcher = FolderWatcher(
+        TaskManager(), directory,
+        recursive=args.recursive,
+        workers=args.workers,
+        stable_seconds=args.stable_seconds,
+        use_inotify=False if args.poll else None,
+        status_callback=status_callback,
+        job_callback=lambda job: writer.write(job_record(job, 'file')),
+        cancel_token=cancel_token
+    )
+
+    # 监视在后台线程中运行，主线程收到 Ctrl+C 后停止监视并等待正在处理的任务结束
+    finished = threading.Event()
+
+    def run_watcher():
+        try:
+            watcher.run()
+        finally:
+            finished.set()
+
+    threading.Thread(target=run_watcher, name='streamscribe-watch', daemon=True).start()
+    try:
+        while not finished.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        print("\n⚠️ 正在停止监视...", file=sys.stderr)
+        watcher.stop("已被用户中断")
+        finished.wait()
+
+    counts = watcher.counts
+    writer.write({
+        'type': 'summary',
+        'total_count': counts['total'],
+        'success_count': counts['success'],
+        'failed_count': counts['total'] - counts['success'],
+        'cancelled_count': counts['cancelled']
+    })
+
+    return EXIT_INTERRUPTED if cancel_token.cancelled else EXIT_OK
+
+
+def command_serve(args, writer):
+    """serve 子命令"""
+    from .server import serve
+
+    try:
+        serve(args.host, args.port, args.workers, args.queue_size)
+    except OSError as e:
+        print(f"❌ 无法启动任务服务: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    except KeyboardInterrupt:
+        print("\n⚠️ 任务服务已停止", file=sys.stderr)
+
+    return EXIT_OK
+
+
+def main(argv=None):
+    """
+    命令行主函数
+
+    Args:
+        argv (list): 参数列表，默认读取 sys.argv
+
+    Returns:
+        int: 退出码
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not getattr(args, 'handler', None):
+        parser.print_help(sys.stderr)
+        return EXIT_USAGE
+
+    # 标准输出只保留 JSON 行，core 中的 print 全部转到标准错误
+    writer = JsonLinesWriter(sys.stdout)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.config:
+            if not os.path.exists(args.config):
+                print(f"❌ 配置文件不存在: {args.config}", file=sys.stderr)
+                return EXIT_USAGE
+            load_config(args.config)
+
+        setup_logging()
+        if not args.verbose:
+            for handler in logging.getLogger().handlers:
+                if not isinstance(handler, logging.FileHandler):
+                    handler.setLevel(logging.WARNING)
+
+        apply_overrides(args)
+
+        try:
+            return args.handler(args, writer)
+        except KeyboardInterrupt:
+            print("\n⚠️ 已中断", file=sys.stderr)
+            return EXIT_INTERRUPTED
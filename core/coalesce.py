@@ -0,0 +1,112 @@
+"""
+进行中任务合并
+
+同一视频被粘贴两次，或者多个调用方同时提交同一视频时，只有第一个提交者真正下载和转录，
+后来的提交者挂到第一个提交者的 Future 上，结束后拿到同一份结果：
+
+- 任务级（TaskManager）：按 (平台, 视频 ID) 或本地文件路径合并，省去重复的下载和转录
+- 转录级（WhisperTranscriber）：按音频内容哈希 + 转录参数（即文稿缓存键）合并，
+  内容相同但来源不同的音频只运行一次 Whisper，其余从文稿缓存取结果
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from .cancel import check_cancelled
+
+
+class InFlightTable:
+    """进行中请求表（键 -> Future），线程和协程共用"""
+
+    def __init__(self, name):
+        """
+        初始化进行中请求表
+
+        Args:
+            name (str): 名称，用于日志
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._futures)
+
+    def claim(self, key):
+        """
+        登记请求
+
+        Args:
+            key (str): 请求键
+
+        Returns:
+            tuple: (Future, 是否为第一个提交者)；第一个提交者处理结束后必须调用 release()
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                return future, False
+            future = concurrent.futures.Future()
+            self._futures[key] = future
+            return future, True
+
+    def release(self, key, future, result=None):
+        """
+        第一个提交者处理结束，唤醒所有等待者
+
+        Args:
+            key (str): 请求键
+            future (Future): claim() 返回的 Future
+            result: 共享给等待者的结果，None 表示没有可共享的结果（例如任务被取消），由等待者自己处理
+        """
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+        if not future.done():
+            future.set_result(result)
+
+    def wait(self, future, poll_interval=0.5):
+        """
+        等待第一个提交者的结果（可被当前任务的取消令牌中断）
+
+        Returns:
+            release() 传入的结果
+
+        Raises:
+            JobCancelledError: 等待期间本任务被取消
+        """
+        while True:
+            check_cancelled()
+            try:
+                return future.result(timeout=poll_interval)
+            except concurrent.futures.TimeoutError:
+                continue
+
+    async def wait_async(self, future, poll_interval=0.5):
+        """wait 的 asyncio 版本，不占用事件循环线程"""
+        while not future.done():
+            check_cancelled()
+            await asyncio.sleep(poll_interval)
+        return future.result()
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_in_flight_table(name):
+    """
+    获取全局进行中请求表（同一进程中的所有任务管理器共用）
+
+    Args:
+        name (str): 表名称（jobs / transcripts）
+
+    Returns:
+        InFlightTable: 进行中请求表
+    """
+    with _tables_lock:
+        table = _tables.get(name)
+        if table is None:
+            table = _tables[name] = InFlightTable(name)
+        return table
@@ -127,12 +127,38 @@ max_line_width = 1000
 max_line_count = 1
 # 是否高亮显示词汇
 highlight_words = false
+# 启用常驻 Whisper 引擎（模型只加载一次，需要虚拟环境中安装 faster-whisper）
+persistent_engine = false
+# 常驻引擎使用的 Python 路径（留空则使用 Whisper 虚拟环境中的 Python）
+engine_python =
+# 长音频分段并行转录（在静音处切分，多个进程同时转录后拼接）
+chunked_mode = false
+# 并行转录的进程数
+chunk_workers = 2
+# 每段的目标时长（秒），音频短于两段时不切分
+chunk_seconds = 600
 
 [download]
 # 最大重试次数
 max_retries = 3
 # 重试延迟（秒）
 retry_delay = 5
+# 重试延迟上限（秒），重试间隔从 retry_delay 开始指数增长并加入随机抖动
+max_retry_delay = 60
+# 每个平台每分钟最多发起的请求数（遇到 403/429 时自动降速，之后逐步恢复）
+youtube_requests_per_minute = 30
+bilibili_requests_per_minute = 20
+# 允许连续发起的突发请求数
+request_burst = 3
+# 转录用音频格式：native 保存平台原始音频流（m4a/opus），本地视频提取为 16kHz 单声道 FLAC，均不经过 mp3 编码；
+# mp3 沿用旧的 192k mp3 转码
+audio_format = native
+# 批量处理时把播放列表、频道和B站多P视频展开为单个视频
+expand_playlists = true
+# 每个播放列表或频道最多展开的视频数（0 表示不限制）
+playlist_max_entries = 500
+# 解析 b23.tv 等短链接时单次请求的超时时间（秒）
+short_link_timeout = 10
 # 超时时间（秒）
 timeout = 300
 # 代理设置（如需要）
@@ -173,6 +199,69 @@ log_level = INFO
 auto_cleanup = true
 # 保留临时文件（调试用）
 preserve_temp_files = false
+# 启用下载/转录流水线（转录当前视频时预先下载后续视频）
+pipeline_mode = true
+# 流水线转录阶段并发数（CPU 转录建议为 1）
+transcribe_workers = 1
+# 已下载待转录的最大任务数
+prefetch_count = 2
+# asyncio 批量接口同时进行中的任务数（获取信息和下载在同一个事件循环中并发执行）
+async_max_in_flight = 50
+# 记录批量任务进度（程序中断后再次处理这些链接或文件时从上次完成的阶段继续）
+job_journal = true
+# 未完成任务记录的保留时间（小时）
+job_journal_retention_hours = 168
+# 单个任务的最长处理时间（秒，不含排队等待），超时后终止其外部进程，0 表示不限制
+job_timeout = 0
+# 同一视频或文件同时提交多次时只处理一次，后提交的任务等待并共享先提交的任务的结果；
+# 内容相同的音频同时转录时也只运行一次 Whisper
+coalesce_jobs = true
+# 按估计的转录成本安排任务顺序：有字幕的任务最先，其次音频短的先处理；false 时按提交顺序处理
+cost_scheduling = true
+
+[cache]
+# 启用视频信息缓存（保存在临时目录，重复处理时不再联网获取）
+metadata_cache = true
+# 视频信息缓存有效期（小时）
+metadata_ttl_hours = 168
+# 视频信息缓存最大条目数
+metadata_max_entries = 5000
+# 启用文稿缓存（相同音频和转录参数直接返回已有文稿）
+transcript_cache = true
+# 文稿缓存最大条目数
+transcript_max_entries = 2000
+# 记录已转录的本地文件（重新扫描文件夹时只处理新增或修改过的文件）
+file_index = true
+# 缓存短链接跳转后的视频链接（同一短链接只联网解析一次）
+short_link_cache = true
+
+[server]
+# HTTP 任务服务监听地址（python -m core serve）
+host = 127.0.0.1
+# HTTP 任务服务端口
+port = 8765
+# 同时处理的任务数
+workers = 1
+# 排队任务上限（队列已满时新任务返回 503）
+queue_size = 100
+# 内存中保留的已结束任务数
+max_finished_jobs = 500
+
+[watch]
+# 监视模式默认监视的文件夹（python -m core watch 未指定目录时使用）
+directory =
+# 是否同时监视子文件夹
+recursive = false
+# 文件大小和修改时间保持不变多少秒后视为写入完成
+stable_seconds = 5
+# 检查文件是否写入完成的间隔（秒），不支持 inotify 时也是扫描间隔
+poll_interval = 2
+# 同时转录的文件数
+workers = 1
+# Linux 上使用 inotify 监听文件变化（网络共享目录等收不到事件时设为 false，改为定时扫描）
+use_inotify = true
+# 处理失败的文件自动重试的次数（等待 stable_seconds 秒后重新处理），用完后文件再次变化时才重新处理
+max_retries = 2
 
 """
 
@@ -259,12 +348,38 @@ max_line_width = 1000
 max_line_count = 1
 # 是否高亮显示词汇
 highlight_words = false
+# 启用常驻 Whisper 引擎（模型只加载一次，需要虚拟环境中安装 faster-whisper）
+persistent_engine = false
+# 常驻引擎使用的 Python 路径（留空则使用 Whisper 虚拟环境中的 Python）
+engine_python =
+# 长音频分段并行转录（在静音处切分，多个进程同时转录后拼接）
+chunked_mode = false
+# 并行转录的进程数
+chunk_workers = 2
+# 每段的目标时长（秒），音频短于两段时不切分
+chunk_seconds = 600
 
 [download]
 # 最大重试次数
 max_retries = 3
 # 重试延迟（秒）
 retry_delay = 5
+# 重试延迟上限（秒），重试间隔从 retry_delay 开始指数增长并加入随机抖动
+max_retry_delay = 60
+# 每个平台每分钟最多发起的请求数（遇到 403/429 时自动降速，之后逐步恢复）
+youtube_requests_per_minute = 30
+bilibili_requests_per_minute = 20
+# 允许连续发起的突发请求数
+request_burst = 3
+# 转录用音频格式：native 保存平台原始音频流（m4a/opus），本地视频提取为 16kHz 单声道 FLAC，均不经过 mp3 编码；
+# mp3 沿用旧的 192k mp3 转码
+audio_format = native
+# 批量处理时把播放列表、频道和B站多P视频展开为单个视频
+expand_playlists = true
+# 每个播放列表或频道最多展开的视频数（0 表示不限制）
+playlist_max_entries = 500
+# 解析 b23.tv 等短链接时单次请求的超时时间（秒）
+short_link_timeout = 10
 # 超时时间（秒）
 timeout = 300
 # 代理设置（如需要）
@@ -305,6 +420,69 @@ log_level = INFO
 auto_cleanup = true
 # 保留临时文件（调试用）
 preserve_temp_files = false
+# 启用下载/转录流水线（转录当前视频时预先下载后续视频）
+pipeline_mode = true
+# 流水线转录阶段并发数（CPU 转录建议为 1）
+transcribe_workers = 1
+# 已下载待转录的最大任务数
+prefetch_count = 2
+# asyncio 批量接口同时进行中的任务数（获取信息和下载在同一个事件循环中并发执行）
+async_max_in_flight = 50
+# 记录批量任务进度（程序中断后再次处理这些链接或文件时从上次完成的阶段继续）
+job_journal = true
+# 未完成任务记录的保留时间（小时）
+job_journal_retention_hours = 168
+# 单个任务的最长处理时间（秒，不含排队等待），超时后终止其外部进程，0 表示不限制
+job_timeout = 0
+# 同一视频或文件同时提交多次时只处理一次，后提交的任务等待并共享先提交的任务的结果；
+# 内容相同的音频同时转录时也只运行一次 Whisper
+coalesce_jobs = true
+# 按估计的转录成本安排任务顺序：有字幕的任务最先，其次音频短的先处理；false 时按提交顺序处理
+cost_scheduling = true
+
+[cache]
+# 启用视频信息缓存（保存在临时目录，重复处理时不再联网获取）
+metadata_cache = true
+# 视频信息缓存有效期（小时）
+metadata_ttl_hours = 168
+# 视频信息缓存最大条目数
+metadata_max_entries = 5000
+# 启用文稿缓存（相同音频和转录参数直接返回已有文稿）
+transcript_cache = true
+# 文稿缓存最大条目数
+transcript_max_entries = 2000
+# 记录已转录的本地文件（重新扫描文件夹时只处理新增或修改过的文件）
+file_index = true
+# 缓存短链接跳转后的视频链接（同一短链接只联网解析一次）
+short_link_cache = true
+
+[server]
+# HTTP 任务服务监听地址（python -m core serve）
+host = 127.0.0.1
+# HTTP 任务服务端口
+port = 8765
+# 同时处理的任务数
+workers = 1
+# 排队任务上限（队列已满时新任务返回 503）
+queue_size = 100
+# 内存中保留的已结束任务数
+max_finished_jobs = 500
+
+[watch]
+# 监视模式默认监视的文件夹（python -m core watch 未指定目录时使用）
+directory =
+# 是否同时监视子文件夹
+recursive = false
+# 文件大小和修改时间保持不变多少秒后视为写入完成
+stable_seconds = 5
+# 检查文件是否写入完成的间隔（秒），不支持 inotify 时也是扫描间隔
+poll_interval = 2
+# 同时转录的文件数
+workers = 1
+# Linux 上使用 inotify 监听文件变化（网络共享目录等收不到事件时设为 false，改为定时扫描）
+use_inotify = true
+# 处理失败的文件自动重试的次数（等待 stable_seconds 秒后重新处理），用完后文件再次变化时才重新处理
+max_retries = 2
 
 """
 
@@ -402,7 +580,66 @@ preserve_temp_files = false
     def proxy(self):
         """获取代理设置"""
         return self.get('network', 'proxy')
-    
+
+    @property
+    def download_max_retries(self):
+        """获取网络请求失败后的最大重试次数"""
+        return max(0, self.getint('download', 'max_retries', 3))
+
+    @property
+    def download_retry_delay(self):
+        """获取第一次重试前的等待时间（秒）"""
+        return max(0.0, self.config.getfloat('download', 'retry_delay', fallback=5.0))
+
+    @property
+    def download_max_retry_delay(self):
+        """获取重试等待时间的上限（秒）"""
+        return max(0.0, self.config.getfloat('download', 'max_retry_delay', fallback=60.0))
+
+    @property
+    def request_burst(self):
+        """获取每个平台允许连续发起的突发请求数"""
+        return max(1, self.getint('download', 'request_burst', 3))
+
+    @property
+    def download_audio_format(self):
+        """获取转录用音频格式（native 不重新编码，mp3 转码为 mp3）"""
+        value = (self.get('download', 'audio_format', 'native') or 'native').strip().lower()
+        return value if value in ('native', 'mp3') else 'native'
+
+    @property
+    def expand_playlists(self):
+        """获取批量处理时是否展开播放列表、频道和多P视频"""
+        return self.getboolean('download', 'expand_playlists', True)
+
+    @property
+    def playlist_max_entries(self):
+        """获取每个播放列表最多展开的视频数，0 表示不限制"""
+        return max(0, self.getint('download', 'playlist_max_entries', 500))
+
+    @property
+    def short_link_timeout(self):
+        """获取解析短链接时单次请求的超时时间（秒）"""
+        return max(1.0, self.config.getfloat('download', 'short_link_timeout', fallback=10.0))
+
+    @property
+    def user_agent(self):
+        """获取发起 HTTP 请求时使用的用户代理"""
+        return self.get('download', 'user_agent') or 'Mozilla/5.0'
+
+    def get_requests_per_minute(self, platform):
+        """
+        获取平台每分钟最多发起的请求数
+
+        Args:
+            platform (str): 平台名称（youtube / bilibili）
+
+        Returns:
+            float: 每分钟请求数，0 表示不限速
+        """
+        default = {'youtube': 30.0, 'bilibili': 20.0}.get(platform, 0.0)
+        return max(0.0, self.config.getfloat('download', f'{platform}_requests_per_minute', fallback=default))
+
     # 便捷方法：获取 Whisper 相关配置
     @property
     def whisper_model(self):
@@ -449,6 +686,31 @@ preserve_temp_files = false
         """获取 GPU 设备索引"""
         return self.getint('whisper', 'device_index', 0)
 
+    @property
+    def whisper_persistent_engine(self):
+        """获取是否启用常驻 Whisper 引擎（模型只加载一次）"""
+        return self.getboolean('whisper', 'persistent_engine', False)
+
+    @property
+    def whisper_engine_python(self):
+        """获取常驻引擎使用的 Python 路径（为空时使用 Whisper 虚拟环境中的 Python）"""
+        return (self.get('whisper', 'engine_python', '') or '').strip()
+
+    @property
+    def whisper_chunked_mode(self):
+        """获取是否启用长音频分段并行转录"""
+        return self.getboolean('whisper', 'chunked_mode', False)
+
+    @property
+    def whisper_chunk_workers(self):
+        """获取分段并行转录的进程数"""
+        return max(1, self.getint('whisper', 'chunk_workers', 2))
+
+    @property
+    def whisper_chunk_seconds(self):
+        """获取分段的目标时长（秒）"""
+        return max(60, self.getint('whisper', 'chunk_seconds', 600))
+
     def get_compute_type_for_model(self, model):
         """
         根据模型自动获取最佳量化类型
@@ -568,6 +830,21 @@ preserve_temp_files = false
         self.config.set('whisper', 'output_format_srt', str(enabled).lower())
         self.save()
 
+    def set_override(self, section, key, value):
+        """
+        临时修改配置（只在内存中生效，不写回配置文件，供命令行参数使用）
+
+        Args:
+            section (str): 配置节名
+            key (str): 配置键名
+            value: 配置值
+        """
+        if not self.config.has_section(section):
+            self.config.add_section(section)
+        if isinstance(value, bool):
+            value = str(value).lower()
+        self.config.set(section, key, str(value))
+
     def save(self):
         """保存配置到文件"""
         try:
@@ -602,6 +879,160 @@ preserve_temp_files = false
         """获取是否启用强制转录模式"""
         return self.getboolean('general', 'force_transcribe_mode', False)
 
+    # 并发相关配置
+    @property
+    def max_concurrent_tasks(self):
+        """获取最大并发任务数（同时处理的链接/文件数量）"""
+        return max(1, self.getint('general', 'max_concurrent_tasks', 2))
+
+    @property
+    def max_workers(self):
+        """获取最大工作线程数（所有后台线程池的上限）"""
+        return max(1, self.getint('advanced', 'max_workers', 4))
+
+    @property
+    def pipeline_mode(self):
+        """获取是否启用下载/转录流水线"""
+        return self.getboolean('advanced', 'pipeline_mode', True)
+
+    @property
+    def transcribe_workers(self):
+        """获取流水线转录阶段的并发数"""
+        return max(1, self.getint('advanced', 'transcribe_workers', 1))
+
+    @property
+    def prefetch_count(self):
+        """获取流水线中已下载待转录的最大任务数"""
+        return max(1, self.getint('advanced', 'prefetch_count', 2))
+
+    @property
+    def async_max_in_flight(self):
+        """获取 asyncio 批量接口同时进行中的任务数"""
+        return max(1, self.getint('advanced', 'async_max_in_flight', 50))
+
+    @property
+    def job_journal_enabled(self):
+        """获取是否记录批量任务进度（用于中断后恢复）"""
+        return self.getboolean('advanced', 'job_journal', True)
+
+    @property
+    def job_journal_retention_hours(self):
+        """获取未完成任务记录的保留时间（小时）"""
+        return self.config.getfloat('advanced', 'job_journal_retention_hours', fallback=168.0)
+
+    @property
+    def job_timeout(self):
+        """获取单个任务的最长处理时间（秒），0 表示不限制"""
+        return max(0.0, self.config.getfloat('advanced', 'job_timeout', fallback=0.0))
+
+    @property
+    def coalesce_jobs(self):
+        """获取是否合并同时提交的相同任务"""
+        return self.getboolean('advanced', 'coalesce_jobs', True)
+
+    @property
+    def cost_scheduling(self):
+        """获取是否按估计的转录成本安排任务顺序"""
+        return self.getboolean('advanced', 'cost_scheduling', True)
+
+    # 缓存相关配置
+    @property
+    def metadata_cache_enabled(self):
+        """获取是否启用视频信息缓存"""
+        return self.getboolean('cache', 'metadata_cache', True)
+
+    @property
+    def metadata_cache_ttl_hours(self):
+        """获取视频信息缓存有效期（小时）"""
+        return self.config.getfloat('cache', 'metadata_ttl_hours', fallback=168.0)
+
+    @property
+    def metadata_cache_max_entries(self):
+        """获取视频信息缓存最大条目数"""
+        return self.getint('cache', 'metadata_max_entries', 5000)
+
+    @property
+    def transcript_cache_enabled(self):
+        """获取是否启用文稿缓存（相同音频和参数直接返回已有文稿）"""
+        return self.getboolean('cache', 'transcript_cache', True)
+
+    @property
+    def transcript_cache_max_entries(self):
+        """获取文稿缓存最大条目数"""
+        return self.getint('cache', 'transcript_max_entries', 2000)
+
+    @property
+    def file_index_enabled(self):
+        """获取是否记录已转录的本地文件（扫描文件夹时跳过未变化的文件）"""
+        return self.getboolean('cache', 'file_index', True)
+
+    @property
+    def short_link_cache_enabled(self):
+        """获取是否缓存短链接跳转后的视频链接"""
+        return self.getboolean('cache', 'short_link_cache', True)
+
+    # HTTP 任务服务相关配置
+    @property
+    def server_host(self):
+        """获取 HTTP 任务服务监听地址"""
+        return self.get('server', 'host', '127.0.0.1')
+
+    @property
+    def server_port(self):
+        """获取 HTTP 任务服务端口"""
+        return self.getint('server', 'port', 8765)
+
+    @property
+    def server_workers(self):
+        """获取 HTTP 任务服务同时处理的任务数"""
+        return self.getint('server', 'workers', 1)
+
+    @property
+    def server_queue_size(self):
+        """获取 HTTP 任务服务排队任务上限"""
+        return self.getint('server', 'queue_size', 100)
+
+    @property
+    def server_max_finished_jobs(self):
+        """获取 HTTP 任务服务在内存中保留的已结束任务数"""
+        return self.getint('server', 'max_finished_jobs', 500)
+
+    # 监视模式相关配置
+    @property
+    def watch_directory(self):
+        """获取监视模式默认监视的文件夹"""
+        return self.get('watch', 'directory', '')
+
+    @property
+    def watch_recursive(self):
+        """获取监视模式是否监视子文件夹"""
+        return self.getboolean('watch', 'recursive', False)
+
+    @property
+    def watch_stable_seconds(self):
+        """获取文件保持不变多少秒后视为写入完成"""
+        return max(0.0, self.config.getfloat('watch', 'stable_seconds', fallback=5.0))
+
+    @property
+    def watch_poll_interval(self):
+        """获取监视模式的检查间隔（秒）"""
+        return max(0.2, self.config.getfloat('watch', 'poll_interval', fallback=2.0))
+
+    @property
+    def watch_workers(self):
+        """获取监视模式同时转录的文件数"""
+        return max(1, self.getint('watch', 'workers', 1))
+
+    @property
+    def watch_use_inotify(self):
+        """获取监视模式是否使用 inotify"""
+        return self.getboolean('watch', 'use_inotify', True)
+
+    @property
+    def watch_max_retries(self):
+        """获取监视模式处理失败的文件自动重试的次数"""
+        return max(0, self.getint('watch', 'max_retries', 2))
+
 
 # 全局配置实例
 _config_instance = None
@@ -617,3 +1048,18 @@ def get_config():
     if _config_instance is None:
         _config_instance = Config()
     return _config_instance
+
+
+def load_config(config_file):
+    """
+    加载指定的配置文件并替换全局配置实例（需在创建 TaskManager 之前调用）
+
+    Args:
+        config_file (str): 配置文件路径
+
+    Returns:
+        Config: 配置实例
+    """
+    global _config_instance
+    _config_instance = Config(config_file)
+    return _config_instance
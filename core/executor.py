@@ -0,0 +1,316 @@
+"""
+批量任务执行器
+
+使用有界线程池同时处理多个链接或文件，每个任务对应一个 Job 对象，
+结果按提交顺序收集，与完成顺序无关。
+
+每个任务持有一个取消令牌（批次令牌的子令牌），执行期间绑定到工作线程，
+取消批次或单个任务时会终止该任务正在运行的外部进程，尚未开始的任务直接结束。
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .cancel import CancellationToken, bind_token
+from .config import get_config
+from .scheduler import order_jobs
+
+
+class Job:
+    """批量处理中的单个任务"""
+
+    # 各阶段在任务整体进度中所占的区间
+    STAGE_RANGES = {
+        'download': (0.0, 0.3),
+        'extract': (0.0, 0.3),
+        'transcribe': (0.3, 1.0)
+    }
+
+    def __init__(self, index, source, total, cancel_token=None):
+        """
+        初始化任务
+
+        Args:
+            index (int): 任务序号（从 1 开始，与提交顺序一致）
+            source (str): 任务来源（URL 或文件路径）
+            total (int): 本批次任务总数
+            cancel_token (CancellationToken): 批次的取消令牌，任务令牌为其子令牌
+        """
+        self.index = index
+        self.source = source
+        self.total = total
+        self.status = 'queued'  # queued / running / downloading / ready / transcribing / done / failed / cancelled
+        self.result = None
+        self.progress = 0.0
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_token = CancellationToken(cancel_token)
+
+        # 调度信息（见 core/scheduler.py）
+        self.priority = 0      # 优先级，数值越大越先处理
+        self.submitter = None  # 提交者，同一优先级内各提交者轮流处理
+        self.cost = None       # 估计的转录成本（音频秒数），None 表示未知
+
+        self._timeout = 0
+        self._active_since = None  # 本阶段开始计时的时间，排队等待时为 None
+        self._active_time = 0.0    # 之前各阶段累计的处理时间
+
+    @property
+    def success(self):
+        """任务是否成功"""
+        return bool(self.result and self.result.get('success'))
+
+    @property
+    def error(self):
+        """任务错误信息"""
+        if self.result:
+            return self.result.get('error')
+        return None
+
+    @property
+    def cancelled(self):
+        """任务是否已被取消（包括超时）"""
+        return self.cancel_token.cancelled
+
+    @property
+    def elapsed(self):
+        """任务耗时（秒），未结束时返回 None"""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    @property
+    def label(self):
+        """状态前缀，例如 [3/40]"""
+        return f"[{self.index}/{self.total}]"
+
+    def bind_status_callback(self, status_callback):
+        """返回带任务序号前缀的状态回调函数"""
+        def job_status_callback(message):
+            if status_callback:
+                status_callback(f"{self.label} {message}")
+        return job_status_callback
+
+    def bind_progress_callback(self, on_change=None):
+        """
+        返回任务级进度回调函数
+
+        处理器以 progress_callback(stage, fraction, eta) 上报当前阶段进度，
+        这里按 STAGE_RANGES 换算为任务整体进度后调用 on_change()。
+        """
+        def job_progress_callback(stage, fraction, eta=None):
+            start, end = self.STAGE_RANGES.get(stage, (0.0, 1.0))
+            self.progress = max(self.progress, start + (end - start) * min(max(fraction, 0.0), 1.0))
+            if on_change:
+                on_change()
+        return job_progress_callback
+
+    def start(self, status='running', timeout=0):
+        """
+        标记任务开始
+
+        Args:
+            status (str): 任务状态
+            timeout (float): 最长处理时间（秒，不含排队等待），0 表示不限制
+        """
+        self.status = status
+        self.started_at = time.time()
+        self._timeout = timeout or 0
+        self.resume_timeout()
+
+    def pause_timeout(self):
+        """进入排队等待时暂停超时计时"""
+        if self._timeout and self._active_since is not None:
+            self._active_time += time.time() - self._active_since
+            self._active_since = None
+            self.cancel_token.set_timeout(None)
+
+    def resume_timeout(self):
+        """开始处理时继续超时计时"""
+        if self._timeout and self._active_since is None:
+            self._active_since = time.time()
+            self.cancel_token.set_timeout(
+                max(self._timeout - self._active_time, 0.001),
+                f"任务超时（超过 {self._timeout:g} 秒）"
+            )
+
+    def cancel(self, reason="任务已取消"):
+        """取消任务，终止其正在运行的外部进程"""
+        self.cancel_token.cancel(reason)
+
+    def finish(self, result):
+        """记录任务结果并标记结束"""
+        self.cancel_token.close()
+        if self.cancelled and not (result and result.get('success')):
+            result = dict(result or {})
+            result['error'] = self.cancel_token.reason
+            result['cancelled'] = True
+
+        self.result = result
+        self.progress = 1.0
+        self.finished_at = time.time()
+        if self.success:
+            self.status = 'done'
+        else:
+            self.status = 'cancelled' if self.cancelled else 'failed'
+
+    def fail(self, error):
+        """以异常信息结束任务"""
+        self.finish({
+            'success': False,
+            'transcript_file': None,
+            'error': str(error)
+        })
+
+    def to_dict(self):
+        """转换为字典，便于序列化"""
+        return {
+            'index': self.index,
+            'source': self.source,
+            'status': self.status,
+            'progress': self.progress,
+            'elapsed': self.elapsed,
+            'result': self.result
+        }
+
+
+def make_batch_progress_reporter(jobs, progress_callback):
+    """
+    生成批次整体进度上报函数
+
+    Args:
+        jobs (list): Job 列表
+        progress_callback (callable): 批次整体进度回调，参数为 0~1 之间的数值
+
+    Returns:
+        callable: 无参数函数，调用时按各任务进度的平均值上报
+    """
+    def report_progress():
+        if progress_callback:
+            try:
+                progress_callback(sum(job.progress for job in jobs) / len(jobs))
+            except Exception:
+                pass
+    return report_progress
+
+
+def schedule_jobs(jobs, estimate_cost=None):
+    """
+    估计各任务的成本并返回调度顺序
+
+    Args:
+        jobs (list): Job 列表
+        estimate_cost (callable): 签名为 estimate_cost(source) -> 秒数或 None，为 None 时保持提交顺序
+
+    Returns:
+        list: 按调度顺序排列的 Job 列表
+    """
+    if not estimate_cost:
+        return list(jobs)
+
+    for job in jobs:
+        try:
+            job.cost = estimate_cost(job.source)
+        except Exception as e:
+            logging.getLogger(__name__).debug(f"估计任务成本失败 {job.source}: {e}")
+    return order_jobs(jobs)
+
+
+class BatchExecutor:
+    """有界并发的批量任务执行器"""
+
+    def __init__(self, max_workers=None):
+        """
+        初始化执行器
+
+        Args:
+            max_workers (int): 最大并发数，默认取 max_concurrent_tasks 与 max_workers 中较小者
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        if max_workers is None:
+            max_workers = min(self.config.max_concurrent_tasks, self.config.max_workers)
+        self.max_workers = max(1, int(max_workers))
+
+    def run(self, sources, func, status_callback=None, job_callback=None, progress_callback=None, cancel_token=None,
+            estimate_cost=None):
+        """
+        并发执行批量任务
+
+        提供 estimate_cost 时按估计成本安排开始顺序（成本低的先开始），结果仍按提交顺序排列。
+
+        Args:
+            sources (list): 任务来源列表（URL 或文件路径）
+            func (callable): 处理函数，签名为 func(source, status_callback, progress_callback) -> dict
+            status_callback (callable): 状态回调函数，消息会带上任务序号前缀
+            job_callback (callable): 单个任务完成时的回调，参数为 Job 对象
+            progress_callback (callable): 批次整体进度回调，参数为 0~1 之间的数值
+            cancel_token (CancellationToken): 批次取消令牌，取消后尚未开始的任务直接结束
+            estimate_cost (callable): 估计任务成本的函数，签名为 estimate_cost(source) -> 秒数或 None
+
+        Returns:
+            list: 按提交顺序排列的 Job 列表
+        """
+        total = len(sources)
+        jobs = [Job(i, source, total, cancel_token) for i, source in enumerate(sources, 1)]
+
+        if not jobs:
+            return jobs
+
+        scheduled = schedule_jobs(jobs, estimate_cost)
+
+        report_progress = make_batch_progress_reporter(jobs, progress_callback)
+
+        workers = min(self.max_workers, total)
+        self.logger.info(f"开始批量处理 {total} 个任务，并发数: {workers}")
+
+        if workers == 1:
+            # 单线程时直接在当前线程顺序执行，避免线程池开销
+            for job in scheduled:
+                self._run_job(job, func, status_callback, report_progress)
+                report_progress()
+                self._notify(job, job_callback)
+            return jobs
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='streamscribe-job') as pool:
+            futures = {pool.submit(self._run_job, job, func, status_callback, report_progress): job for job in scheduled}
+
+            for future in as_completed(futures):
+                job = futures[future]
+                report_progress()
+                self._notify(job, job_callback)
+
+        return jobs
+
+    def _notify(self, job, job_callback):
+        """调用任务完成回调，回调出错不影响其余任务"""
+        if not job_callback:
+            return
+
+        try:
+            job_callback(job)
+        except Exception as e:
+            self.logger.warning(f"任务回调出错: {e}")
+
+    def _run_job(self, job, func, status_callback, report_progress=None):
+        """在工作线程中执行单个任务，异常统一转换为失败结果"""
+        if job.cancelled:
+            # 排队期间已被取消，不再占用并发槽位
+            job.fail(job.cancel_token.reason)
+            return job
+
+        job.start(timeout=self.config.job_timeout)
+
+        try:
+            with bind_token(job.cancel_token):
+                job.finish(func(
+                    job.source,
+                    job.bind_status_callback(status_callback),
+                    job.bind_progress_callback(report_progress)
+                ))
+        except Exception as e:
+            self.logger.error(f"任务 {job.label} 执行异常: {e}")
+            job.fail(e)
+
+        return job
@@ -0,0 +1,213 @@
+"""
+已转录文件索引
+
+把转录成功的本地文件记录到临时目录下的 SQLite 数据库（file_index.db）：
+路径、大小、修改时间、内容哈希和文稿路径。重新扫描文件夹时，
+大小和修改时间都没变的文件直接跳过；只有修改时间变化的文件再比较内容哈希，
+内容相同时只更新记录，因此大量归档录音的重复扫描基本不需要读取文件内容。
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from .config import get_config
+from .utils import compute_file_hash
+
+
+class FileIndex:
+    """已转录本地文件索引"""
+
+    # 每次查询的路径数（SQLite 默认最多 999 个参数）
+    QUERY_BATCH = 500
+
+    def __init__(self, db_path=None):
+        """
+        初始化文件索引
+
+        Args:
+            db_path (str): 数据库文件路径，默认为临时目录下的 file_index.db
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        if db_path is None:
+            db_path = os.path.join(self.config.temp_dir, 'file_index.db')
+
+        self.db_path = db_path
+        self.enabled = self.config.file_index_enabled
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                self._init_db()
+            except sqlite3.Error as e:
+                self.logger.warning(f"无法初始化已转录文件索引，已禁用: {e}")
+                self.enabled = False
+
+    def _connect(self):
+        """创建数据库连接"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """创建索引表"""
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    transcript_file TEXT,
+                    transcribed_at REAL NOT NULL
+                )
+            ''')
+            conn.commit()
+
+    def _load(self, paths):
+        """
+        批量读取索引记录
+
+        Returns:
+            dict: {路径: (大小, 修改时间, 内容哈希, 文稿路径)}
+        """
+        rows = {}
+        with self._lock, closing(self._connect()) as conn:
+            for start in range(0, len(paths), self.QUERY_BATCH):
+                batch = paths[start:start + self.QUERY_BATCH]
+                placeholders = ','.join('?' * len(batch))
+                for row in conn.execute(
+                    f'SELECT path, size, mtime_ns, content_hash, transcript_file FROM files WHERE path IN ({placeholders})',
+                    batch
+                ):
+                    rows[row[0]] = row[1:]
+        return rows
+
+    def filter_pending(self, paths):
+        """
+        筛选需要转录的文件（新增、修改过或文稿已被删除）
+
+        Args:
+            paths (list): 文件路径列表
+
+        Returns:
+            tuple: (待处理的路径列表, 已转录而跳过的路径列表)，均保持输入顺序
+        """
+        if not self.enabled or not paths:
+            return list(paths), []
+
+        try:
+            rows = self._load([os.path.abspath(path) for path in paths])
+        except sqlite3.Error as e:
+            self.logger.warning(f"读取已转录文件索引失败: {e}")
+            return list(paths), []
+
+        pending, skipped = [], []
+        for path in paths:
+            if self._is_current(os.path.abspath(path), rows):
+                skipped.append(path)
+            else:
+                pending.append(path)
+        return pending, skipped
+
+    def _is_current(self, path, rows):
+        """判断文件自上次转录以来是否未变化"""
+        row = rows.get(path)
+        if not row:
+            return False
+
+        size, mtime_ns, content_hash, transcript_file = row
+        if transcript_file and not os.path.exists(transcript_file):
+            return False
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime_ns == mtime_ns:
+            return True
+
+        # 只有修改时间变化（例如复制或同步工具改写了时间戳）：内容相同则更新记录
+        try:
+            if compute_file_hash(path) != content_hash:
+                return False
+        except OSError:
+            return False
+
+        self._update_mtime(path, stat.st_mtime_ns)
+        return True
+
+    def _update_mtime(self, path, mtime_ns):
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                conn.execute('UPDATE files SET mtime_ns = ? WHERE path = ?', (mtime_ns, path))
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.debug(f"更新已转录文件索引失败: {e}")
+
+    def record(self, path, transcript_file=None):
+        """
+        记录转录成功的文件
+
+        Args:
+            path (str): 文件路径
+            transcript_file (str): 文稿路径
+        """
+        if not self.enabled:
+            return
+
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+            content_hash = compute_file_hash(path)
+            with self._lock, closing(self._connect()) as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO files '
+                    '(path, size, mtime_ns, content_hash, transcript_file, transcribed_at) VALUES (?, ?, ?, ?, ?, ?)',
+                    (path, stat.st_size, stat.st_mtime_ns, content_hash, transcript_file, time.time())
+                )
+                conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"写入已转录文件索引失败: {e}")
+
+    def remove(self, path):
+        """删除一个文件的记录（下次扫描时重新转录）"""
+        if not self.enabled:
+            return
+
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('DELETE FROM files WHERE path = ?', (os.path.abspath(path),))
+            conn.commit()
+
+    def clear(self):
+        """清空索引"""
+        if not self.enabled:
+            return
+
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('DELETE FROM files')
+            conn.commit()
+
+
+_file_index = None
+_file_index_lock = threading.Lock()
+
+
+def get_file_index():
+    """
+    获取全局已转录文件索引实例
+
+    Returns:
+        FileIndex: 索引实例
+    """
+    global _file_index
+    with _file_index_lock:
+        if _file_index is None:
+            _file_index = FileIndex()
+    return _file_index
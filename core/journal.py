@@ -0,0 +1,392 @@
+"""
+任务日志模块
+
+把批量任务中每一项的处理阶段记录到临时目录下的 SQLite 数据库（job_journal.db）：
+
+    queued -> metadata -> downloaded -> transcribed -> written
+
+记录按来源（视频的平台 + 视频 ID，或本地文件的绝对路径）标识，与批次的组成无关：
+程序中断后再次处理这些链接/文件时（即使批次中的其他项有增减，例如播放列表新增了视频、
+文件夹扫描跳过了已完成的文件），已完成的项直接返回上次的结果，已下载音频的项复用工作目录中的音频继续转录。
+批次标识只用于归组，整批全部成功后该批次的记录会被清除。
+
+同一来源可能同时出现在多个批次中（例如界面和命令行同时处理、文件夹监视与 HTTP 服务同时提交），
+处理前先取得该记录的租约（temp_dir/jobs/.locks/ 下的文件锁，进程退出时由操作系统自动释放）：
+持有租约的任务才使用日志和固定的工作目录，其他任务使用独立的临时工作目录，
+不会读取或删除正在处理中的音频和文稿。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from .config import get_config
+from .utils import get_video_key
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class JobLease:
+    """任务记录的租约（非阻塞的文件锁），持有期间其他任务（包括其他进程）无法取得同一记录"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): 锁文件路径
+        """
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        """
+        尝试取得租约（不等待）
+
+        Returns:
+            bool: 是否取得
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock_file = open(self.path, 'a+b')
+        try:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._file = lock_file
+        # 记录最近一次使用的时间，prune() 据此清理长期不用的锁文件
+        os.utime(self.path)
+        return True
+
+    def release(self):
+        """释放租约"""
+        lock_file, self._file = self._file, None
+        if lock_file is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        finally:
+            lock_file.close()
+
+
+class JobJournal:
+    """批量任务日志"""
+
+    STATES = ('queued', 'metadata', 'downloaded', 'transcribed', 'written')
+
+    # 可以通过 update 写入的字段
+    FIELDS = ('video_title', 'audio_file', 'transcript_file', 'snapshot', 'error')
+
+    def __init__(self, db_path=None, retention_hours=None):
+        """
+        初始化任务日志
+
+        Args:
+            db_path (str): 数据库文件路径，默认为临时目录下的 job_journal.db
+            retention_hours (float): 未完成记录的保留时间（小时），默认读取 [advanced] job_journal_retention_hours
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        if db_path is None:
+            db_path = os.path.join(self.config.temp_dir, 'job_journal.db')
+        if retention_hours is None:
+            retention_hours = self.config.job_journal_retention_hours
+
+        self.db_path = db_path
+        self.retention = retention_hours * 3600
+        self.enabled = self.config.job_journal_enabled
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                self._init_db()
+                self.prune()
+            except sqlite3.Error as e:
+                self.logger.warning(f"无法初始化任务日志，已禁用: {e}")
+                self.enabled = False
+
+    def _connect(self):
+        """创建数据库连接"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        """创建日志表"""
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_key TEXT PRIMARY KEY,
+                    batch_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    state TEXT NOT NULL,
+                    video_title TEXT,
+                    audio_file TEXT,
+                    transcript_file TEXT,
+                    snapshot TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs (batch_id)')
+            conn.commit()
+
+    @staticmethod
+    def make_batch_id(kind, sources):
+        """
+        计算批次标识（同一类型、同样顺序的来源列表得到同一标识）
+
+        Args:
+            kind (str): 'url' 或 'file'
+            sources (list): URL 或文件路径列表
+
+        Returns:
+            str: 批次标识
+        """
+        payload = json.dumps([kind, list(sources)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def make_job_key(kind, source):
+        """
+        计算任务标识，同时用作任务工作目录名
+
+        同一视频（平台 + 视频 ID）或同一文件（规范化后的绝对路径）总是得到同一标识，与所在批次无关。
+
+        Args:
+            kind (str): 'url' 或 'file'
+            source (str): URL 或文件路径
+
+        Returns:
+            str: 任务标识
+        """
+        if kind == 'url':
+            normalized = get_video_key(source) or source.strip()
+        else:
+            normalized = os.path.normcase(os.path.realpath(source))
+        payload = f"{kind}\n{normalized}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def register(self, batch_id, kind, sources):
+        """
+        登记批次中的任务
+
+        已有记录的任务（例如上次中断的批次中的同一视频）保持原阶段，改为归入本批次。
+
+        Args:
+            batch_id (str): 批次标识
+            kind (str): 'url' 或 'file'
+            sources (list): URL 或文件路径列表
+
+        Returns:
+            list: 与 sources 对应的任务标识列表（批次中重复的来源对应同一标识）
+        """
+        keys = [self.make_job_key(kind, source) for source in sources]
+        if not self.enabled:
+            return keys
+
+        now = time.time()
+        rows = [(key, batch_id, kind, source, i, 'queued', now) for i, (key, source) in enumerate(zip(keys, sources))]
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                conn.executemany(
+                    'INSERT INTO jobs (job_key, batch_id, kind, source, position, state, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (job_key) DO UPDATE SET '
+                    'batch_id = excluded.batch_id, source = excluded.source, position = excluded.position, '
+                    'updated_at = excluded.updated_at',
+                    rows
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"登记任务日志失败: {e}")
+
+        return keys
+
+    def _lease_path(self, job_key):
+        """任务记录的锁文件路径"""
+        return os.path.join(self.config.temp_dir, 'jobs', '.locks', f'{job_key}.lock')
+
+    def acquire(self, job_key):
+        """
+        取得任务记录的租约，持有期间该记录和工作目录 temp_dir/jobs/<job_key> 归本任务独占
+
+        Args:
+            job_key (str): 任务标识
+
+        Returns:
+            JobLease: 租约，记录正被其他任务使用时返回 None
+        """
+        lease = JobLease(self._lease_path(job_key))
+        try:
+            if lease.acquire():
+                return lease
+        except OSError as e:
+            self.logger.warning(f"无法创建任务日志锁文件: {e}")
+        return None
+
+    def get(self, job_key):
+        """
+        读取任务记录
+
+        Args:
+            job_key (str): 任务标识
+
+        Returns:
+            dict: 任务记录（snapshot 已解析为字典），不存在时返回 None
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                conn.row_factory = sqlite3.Row
+                row = conn.execute('SELECT * FROM jobs WHERE job_key = ?', (job_key,)).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"读取任务日志失败: {e}")
+            return None
+
+        if not row:
+            return None
+
+        entry = dict(row)
+        try:
+            entry['snapshot'] = json.loads(entry['snapshot']) if entry['snapshot'] else {}
+        except ValueError:
+            entry['snapshot'] = {}
+        return entry
+
+    def update(self, job_key, state=None, **fields):
+        """
+        更新任务记录
+
+        Args:
+            job_key (str): 任务标识
+            state (str): 新的阶段，None 表示只更新字段
+            **fields: video_title / audio_file / transcript_file / snapshot（字典）/ error
+        """
+        if not self.enabled or not job_key:
+            return
+
+        if state is not None and state not in self.STATES:
+            raise ValueError(f"未知的任务阶段: {state}")
+
+        updates = {key: value for key, value in fields.items() if key in self.FIELDS}
+        if 'snapshot' in updates:
+            updates['snapshot'] = json.dumps(updates['snapshot'], ensure_ascii=False, default=str)
+        if state is not None:
+            updates['state'] = state
+        updates['updated_at'] = time.time()
+
+        assignments = ', '.join(f"{key} = ?" for key in updates)
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                conn.execute(f'UPDATE jobs SET {assignments} WHERE job_key = ?', (*updates.values(), job_key))
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"写入任务日志失败: {e}")
+
+    def clear_batch(self, batch_id):
+        """
+        删除批次的全部记录
+
+        Args:
+            batch_id (str): 批次标识
+        """
+        if not self.enabled:
+            return
+
+        try:
+            with self._lock, closing(self._connect()) as conn:
+                conn.execute('DELETE FROM jobs WHERE batch_id = ?', (batch_id,))
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"清除任务日志失败: {e}")
+
+    def prune(self):
+        """删除超过保留时间的记录及其遗留的工作目录"""
+        if not self.enabled:
+            return
+
+        cutoff = time.time() - self.retention
+        with self._lock, closing(self._connect()) as conn:
+            expired = [row[0] for row in conn.execute('SELECT job_key FROM jobs WHERE updated_at < ?', (cutoff,))]
+            conn.execute('DELETE FROM jobs WHERE updated_at < ?', (cutoff,))
+            conn.commit()
+
+        for job_key in expired:
+            # 仍在使用中的记录（其他进程持有租约）保留工作目录
+            lease = self.acquire(job_key)
+            if lease is None:
+                continue
+            try:
+                shutil.rmtree(os.path.join(self.config.temp_dir, 'jobs', job_key), ignore_errors=True)
+                os.remove(lease.path)
+            except OSError:
+                pass
+            finally:
+                lease.release()
+
+        # 记录已被清除（整批成功）后遗留的锁文件
+        locks_dir = os.path.dirname(self._lease_path(''))
+        try:
+            names = os.listdir(locks_dir)
+        except OSError:
+            names = []
+        for name in names:
+            path = os.path.join(locks_dir, name)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+            except OSError:
+                continue
+            lease = JobLease(path)
+            try:
+                if lease.acquire():
+                    os.remove(path)
+            except OSError:
+                pass
+            finally:
+                lease.release()
+
+
+# 全局任务日志实例
+_journal = None
+_journal_lock = threading.Lock()
+
+def get_job_journal():
+    """
+    获取全局任务日志实例
+
+    Returns:
+        JobJournal: 任务日志实例
+    """
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = JobJournal()
+    return _journal
@@ -4,14 +4,25 @@
 顶层调度器，接收UI层的请求，识别URL平台，并将任务分发给具体的平台处理器。
 """
 
+import asyncio
+import contextvars
+import functools
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from .cancel import JobCancelledError, bind_token, check_cancelled, current_token
+from .coalesce import get_in_flight_table
 from .config import get_config
-from .utils import extract_video_id_from_url, validate_url, generate_output_filename
-from .platform.youtube import YouTubeHandler
-from .platform.local import LocalFileHandler
-from .platform.bilibili import BilibiliHandler
+from .utils import get_video_key, validate_url, generate_output_filename
+from .executor import BatchExecutor, Job, make_batch_progress_reporter, schedule_jobs
+from .media import get_media_duration
+from .pipeline import TranscriptionPipeline
+from .journal import get_job_journal
+from .index import get_file_index
+from .workspace import JobWorkspace
+from .registry import get_registry
+from .resolver import ShortLinkResolver
 
 
 class TaskManager:
@@ -23,12 +34,12 @@ class TaskManager:
         self.logger = logging.getLogger(__name__)
         self.debug_callback = None  # 调试回调函数
 
-        # 初始化平台处理器
-        self.platform_handlers = {
-            'youtube': YouTubeHandler(),
-            'bilibili': BilibiliHandler(),
-            'local': LocalFileHandler()
-        }
+        # 初始化平台处理器（各平台在 core/platform 中注册，见 core/registry.py）
+        self.registry = get_registry()
+        self.platform_handlers = self.registry.create_handlers()
+        self.resolver = ShortLinkResolver(self.registry)
+        # 进行中的任务（同一视频或文件同时提交多次时只处理一次）
+        self.in_flight_jobs = get_in_flight_table('jobs')
 
         # 设置调试回调到所有处理器
         for handler in self.platform_handlers.values():
@@ -48,17 +59,56 @@ class TaskManager:
         if self.debug_callback:
             self.debug_callback(message)
     
-    def process_url(self, url, status_callback=None):
+    def process_url(self, url, status_callback=None, progress_callback=None, cancel_token=None):
         """
         处理视频 URL，生成文稿
         
         Args:
             url (str): 视频 URL
             status_callback (callable): 状态回调函数，用于更新 UI
+            progress_callback (callable): 进度回调函数，签名为 progress_callback(stage, fraction, eta)，
+                stage 为 download / extract / transcribe，eta 为预计剩余秒数（可能为 None）
+            cancel_token (CancellationToken): 取消令牌，取消时终止正在运行的外部进程，
+                默认使用当前线程绑定的令牌
             
         Returns:
             dict: 处理结果，包含成功状态、文稿文件路径、错误信息等
         """
+        with bind_token(cancel_token or current_token()):
+            prepared = self.prepare_url(url, status_callback, progress_callback)
+            return self.complete_prepared(prepared, status_callback, progress_callback)
+
+    def prepare_url(self, url, status_callback=None, progress_callback=None, workspace=None):
+        """
+        第一阶段：识别平台，获取视频信息并下载字幕或音频
+
+        Args:
+            url (str): 视频 URL
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            workspace (JobWorkspace): 任务工作目录，默认由平台处理器新建
+
+        Returns:
+            dict: 阶段结果，供 complete_prepared 使用
+        """
+        prepared = self._new_url_prepared(url)
+
+        try:
+            check_cancelled()
+            handler = self._select_url_handler(prepared, status_callback)
+            if not self._claim_job(prepared, status_callback, workspace):
+                return prepared
+
+            # 调用平台处理器执行第一阶段（短链接已替换为视频页面链接）
+            prepared['stage'] = handler.prepare_transcript(prepared['url'], status_callback, progress_callback, workspace)
+            
+        except Exception as e:
+            self._handle_failure(prepared, e, status_callback)
+        
+        return prepared
+
+    def _new_url_prepared(self, url):
+        """创建 URL 任务的空阶段结果"""
         result = {
             'success': False,
             'transcript_file': None,
@@ -66,57 +116,288 @@ class TaskManager:
             'platform': None,
             'video_title': None
         }
-        
+        return {'kind': 'url', 'source': url, 'url': url, 'result': result, 'handler': None, 'stage': None}
+
+    def _select_url_handler(self, prepared, status_callback=None):
+        """
+        校验 URL 并选择平台处理器
+
+        短链接先解析为视频页面链接，写入 prepared['url']；解析失败时仍使用原链接，交给平台处理器处理。
+
+        Args:
+            prepared (dict): URL 任务的阶段结果，会写入 platform、handler 和 url
+            status_callback (callable): 状态回调函数
+
+        Returns:
+            平台处理器实例
+
+        Raises:
+            ValueError: URL 无效或平台不支持
+        """
+        url = prepared['source']
+
+        # 更新状态：开始处理
+        if status_callback:
+            status_callback("开始处理视频链接...")
+
+        # 验证 URL 格式
+        if not validate_url(url):
+            raise ValueError("无效的 URL 格式")
+
+        # 识别平台、视频 ID 和链接类型
+        match = self.registry.classify(url)
+
+        if not match:
+            raise ValueError("不支持的视频平台或无效的 URL")
+        if match.kind == 'short':
+            match = self._resolve_short_url(prepared, match)
+        if match.kind in ('playlist', 'channel'):
+            raise ValueError("播放列表或频道链接需要先展开为视频列表（批量处理时自动展开）")
+
+        platform = match.platform
+        prepared['result']['platform'] = platform
+
+        # 更新状态：识别平台
+        if status_callback:
+            status_callback(f"识别到平台: {platform.upper()}")
+
+        # 获取对应的平台处理器
+        handler = self.platform_handlers.get(platform)
+        if not handler:
+            raise ValueError(f"暂不支持 {platform} 平台")
+
+        prepared['handler'] = handler
+        return handler
+
+    def _resolve_short_url(self, prepared, match):
+        """
+        解析短链接，成功时把视频页面链接写入 prepared['url']
+
+        Returns:
+            UrlMatch: 视频页面链接的识别结果，解析失败时返回原短链接的识别结果
+        """
+        url = prepared['source']
         try:
-            # 更新状态：开始处理
-            if status_callback:
-                status_callback("开始处理视频链接...")
-            
-            # 验证 URL 格式
-            if not validate_url(url):
-                raise ValueError("无效的 URL 格式")
-            
-            # 识别平台和视频 ID
-            platform, video_id = extract_video_id_from_url(url)
-            
-            if not platform:
-                raise ValueError("不支持的视频平台或无效的 URL")
-            
-            result['platform'] = platform
-            
-            # 更新状态：识别平台
-            if status_callback:
-                status_callback(f"识别到平台: {platform.upper()}")
-            
-            # 获取对应的平台处理器
-            handler = self.platform_handlers.get(platform)
-            if not handler:
-                raise ValueError(f"暂不支持 {platform} 平台")
-            
-            # 调用平台处理器获取文稿
-            transcript_result = handler.get_transcript(url, status_callback)
-            
+            resolved = self.resolver.resolve(url)
+        except JobCancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"解析短链接失败，使用原链接 {url}: {e}")
+            return match
+
+        resolved_match = self.registry.classify(resolved)
+        if not resolved_match or resolved_match.platform != match.platform:
+            return match
+
+        prepared['url'] = resolved
+        return resolved_match
+
+    def complete_prepared(self, prepared, status_callback=None, progress_callback=None):
+        """
+        第二阶段：对第一阶段准备好的音频执行转录并汇总结果
+
+        Args:
+            prepared (dict): prepare_url 或 prepare_local_file 的返回值
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+
+        Returns:
+            dict: 处理结果
+        """
+        if prepared.get('coalesced'):
+            return self._complete_coalesced(prepared, status_callback, progress_callback)
+
+        try:
+            return self._complete_stage(prepared, status_callback, progress_callback)
+        finally:
+            self._release_job(prepared)
+
+    def _complete_stage(self, prepared, status_callback=None, progress_callback=None):
+        """执行第二阶段（complete_prepared 的主体）"""
+        result = prepared['result']
+        handler = prepared['handler']
+        stage = prepared['stage']
+
+        if stage is None:
+            return result
+
+        try:
+            check_cancelled()
+            transcript_result = handler.complete_transcript(stage, status_callback, progress_callback)
+
             if not transcript_result['success']:
+                if prepared['kind'] == 'file':
+                    # 本地文件处理器已经通过状态回调报告了错误，这里只记录结果
+                    self._handle_failure(prepared, transcript_result['error'])
+                    self._discard_if_cancelled(stage)
+                    return result
                 raise Exception(transcript_result['error'])
-            
+
             result.update(transcript_result)
             result['success'] = True
-            
-            # 更新状态：处理完成
-            if status_callback:
-                status_callback("文稿生成完成！")
-            
-            self.logger.info(f"成功处理视频: {url}")
-            
+
+            if prepared['kind'] == 'url':
+                # 更新状态：处理完成
+                if status_callback:
+                    status_callback("文稿生成完成！")
+
+                self.logger.info(f"成功处理视频: {prepared['source']}")
+            else:
+                self.logger.info(f"成功处理本地文件: {prepared['source']}")
+                get_file_index().record(prepared['source'], result.get('transcript_file'))
+
         except Exception as e:
-            error_msg = str(e)
-            result['error'] = error_msg
-            self.logger.error(f"处理视频失败: {error_msg}")
-            
+            self._handle_failure(prepared, e, status_callback)
+            self._discard_if_cancelled(stage)
+
+        return result
+
+    def _job_key(self, prepared):
+        """
+        任务合并键：视频为 (平台, 视频 ID)，B站多P视频包括分P序号；本地文件为规范化后的绝对路径
+
+        Returns:
+            str: 合并键，未启用任务合并或无法识别时返回 None
+        """
+        if not self.config.coalesce_jobs:
+            return None
+        if prepared['kind'] == 'url':
+            video_key = get_video_key(prepared['url'])
+            return f"url:{video_key}" if video_key else None
+        return f"file:{os.path.normcase(os.path.realpath(prepared['source']))}"
+
+    def _claim_job(self, prepared, status_callback=None, workspace=None):
+        """
+        登记进行中的任务；同一视频或文件已经在处理时，本任务改为等待先提交的任务的结果
+
+        Args:
+            prepared (dict): 阶段结果，第一个提交者写入 in_flight，后来者写入 coalesced
+            status_callback (callable): 状态回调函数
+            workspace (JobWorkspace): 任务工作目录，后来者不需要时删除
+
+        Returns:
+            bool: 本任务是否需要自己执行第一阶段
+        """
+        key = self._job_key(prepared)
+        if not key:
+            return True
+
+        future, owner = self.in_flight_jobs.claim(key)
+        if owner:
+            prepared['in_flight'] = (key, future)
+            return True
+
+        prepared['coalesced'] = future
+        if workspace:
+            workspace.cleanup()
+
+        self.logger.info(f"相同的任务正在处理，等待其结果: {prepared['source']}")
+        if status_callback:
+            status_callback("相同的视频正在由其他任务处理，等待其结果...")
+        return False
+
+    def _release_job(self, prepared, cancelled=False):
+        """
+        第一个提交者结束：把结果共享给等待的任务
+
+        任务被取消时不共享结果，等待的任务会自己重新处理。
+        """
+        in_flight = prepared.pop('in_flight', None)
+        if not in_flight:
+            return
+
+        key, future = in_flight
+        result = prepared['result']
+        if not result.get('success'):
+            token = current_token()
+            cancelled = cancelled or bool(token and token.cancelled)
+        self.in_flight_jobs.release(key, future, None if cancelled else dict(result))
+
+    def abort_prepared(self, prepared, error):
+        """
+        第一阶段完成后、进入第二阶段之前出错时结束任务
+
+        以失败结果释放进行中任务的登记（否则等待同一视频的任务会一直等待），
+        没有任务日志记录的任务同时删除其工作目录。
+
+        Args:
+            prepared (dict): prepare_url 或 prepare_local_file 的返回值
+            error: 错误信息或异常
+        """
+        self._handle_failure(prepared, error)
+        self._release_job(prepared)
+
+        stage = prepared.get('stage') or {}
+        workspace = stage.get('workspace')
+        if workspace and not prepared.get('job_key'):
+            workspace.cleanup()
+
+    def _apply_coalesced_result(self, prepared, shared, status_callback=None):
+        """把先提交的任务的结果复制到本任务，标记为 coalesced"""
+        result = prepared['result']
+        own_fields = {key: result[key] for key in ('file_name',) if key in result}
+        result.update(shared)
+        result.update(own_fields)
+        result['coalesced'] = True
+
+        if result.get('success'):
+            self.logger.info(f"与进行中的相同任务合并: {prepared['source']}")
             if status_callback:
-                status_callback(f"处理失败: {error_msg}")
-        
+                status_callback("文稿生成完成！")
         return result
+
+    def _prepare_again(self, prepared, status_callback=None, progress_callback=None):
+        """先提交的任务被取消：重新执行第一阶段"""
+        if prepared['kind'] == 'url':
+            return self.prepare_url(prepared['source'], status_callback, progress_callback)
+        return self.prepare_local_file(prepared['source'], status_callback, progress_callback)
+
+    def _complete_coalesced(self, prepared, status_callback=None, progress_callback=None):
+        """等待先提交的相同任务结束并返回其结果"""
+        try:
+            shared = self.in_flight_jobs.wait(prepared.pop('coalesced'))
+        except JobCancelledError as e:
+            self._handle_failure(prepared, e, status_callback)
+            return prepared['result']
+
+        if shared is None:
+            prepared = self._prepare_again(prepared, status_callback, progress_callback)
+            return self.complete_prepared(prepared, status_callback, progress_callback)
+        return self._apply_coalesced_result(prepared, shared, status_callback)
+
+    def _discard_if_cancelled(self, stage):
+        """任务被取消时删除其工作目录（已下载的音频和 Whisper 的中间文件）"""
+        token = current_token()
+        workspace = stage.get('workspace')
+        if token and token.cancelled and workspace:
+            workspace.cleanup()
+
+    def needs_transcription(self, prepared):
+        """
+        判断第一阶段结果是否还需要 Whisper 转录
+
+        Args:
+            prepared (dict): prepare_url 或 prepare_local_file 的返回值
+
+        Returns:
+            bool: 是否有待转录的音频
+        """
+        stage = prepared.get('stage')
+        return bool(stage and stage.get('audio_file') and not stage['result'].get('error'))
+
+    def _handle_failure(self, prepared, error, status_callback=None):
+        """记录任务失败信息"""
+        error_msg = str(error)
+        prepared['result']['success'] = False
+        prepared['result']['error'] = error_msg
+
+        if prepared['kind'] == 'url':
+            self.logger.error(f"处理视频失败: {error_msg}")
+        else:
+            self.logger.error(f"处理本地文件失败: {error_msg}")
+
+        if status_callback:
+            status_callback(f"处理失败: {error_msg}")
     
     def get_supported_platforms(self):
         """
@@ -133,8 +414,12 @@ class TaskManager:
         
         Args:
             platform_name (str): 平台名称
-            handler: 平台处理器实例
+            handler: 平台处理器实例，声明了 URL_PATTERNS 的处理器会同时注册其 URL 模式
         """
+        patterns = getattr(handler, 'URL_PATTERNS', None)
+        if patterns and platform_name not in self.registry.platforms():
+            self.registry.register(platform_name, patterns=patterns)
+
         self.platform_handlers[platform_name] = handler
         self.logger.info(f"添加平台处理器: {platform_name}")
     
@@ -157,118 +442,748 @@ class TaskManager:
             url (str): 视频 URL
             
         Returns:
-            dict: 平台信息，包含平台名称、视频ID等
+            dict: 平台信息，包含平台名称、视频ID（播放列表和频道为列表或频道 ID）、链接类型等
         """
-        platform, video_id = extract_video_id_from_url(url)
-        
+        match = self.registry.classify(url)
+        platform = match.platform if match else None
+
         return {
             'platform': platform,
-            'video_id': video_id,
+            'video_id': match.id if match else None,
+            'kind': match.kind if match else None,
             'supported': platform in self.platform_handlers
         }
 
-    def process_local_file(self, file_path, status_callback=None):
+    def process_local_file(self, file_path, status_callback=None, progress_callback=None, cancel_token=None,
+                           output_dir=None):
         """
         处理本地文件
 
         Args:
             file_path (str): 本地文件路径
             status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            cancel_token (CancellationToken): 取消令牌，默认使用当前线程绑定的令牌
+            output_dir (str): 文稿输出目录，默认使用配置中的输出目录
 
         Returns:
             dict: 处理结果
         """
+        with bind_token(cancel_token or current_token()):
+            prepared = self.prepare_local_file(file_path, status_callback, progress_callback, output_dir=output_dir)
+            return self.complete_prepared(prepared, status_callback, progress_callback)
+
+    def prepare_local_file(self, file_path, status_callback=None, progress_callback=None, workspace=None,
+                           output_dir=None):
+        """
+        第一阶段：校验本地文件，视频文件先提取音频
+
+        Args:
+            file_path (str): 本地文件路径
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            workspace (JobWorkspace): 任务工作目录，默认由平台处理器新建
+            output_dir (str): 文稿输出目录，默认使用配置中的输出目录
+
+        Returns:
+            dict: 阶段结果，供 complete_prepared 使用
+        """
+        prepared = self._new_file_prepared(file_path)
+
         try:
+            check_cancelled()
             self.logger.info(f"开始处理本地文件: {file_path}")
 
             # 使用本地文件处理器
             handler = self.platform_handlers['local']
-            result = handler.get_transcript(file_path, status_callback)
+            prepared['handler'] = handler
+            if not self._claim_job(prepared, status_callback, workspace):
+                return prepared
 
-            if result['success']:
-                self.logger.info(f"成功处理本地文件: {file_path}")
-            else:
-                self.logger.error(f"处理本地文件失败: {result['error']}")
-
-            return result
+            prepared['stage'] = handler.prepare_transcript(
+                file_path, status_callback, progress_callback, workspace, output_dir
+            )
 
         except Exception as e:
-            error_msg = f"处理本地文件时发生错误: {str(e)}"
-            self.logger.error(error_msg)
-            return {
-                'success': False,
-                'error': error_msg,
-                'file_name': os.path.basename(file_path),
-                'transcript_file': None
-            }
+            self._handle_failure(prepared, f"处理本地文件时发生错误: {str(e)}", status_callback)
+
+        return prepared
 
-    def process_batch_urls(self, urls, status_callback=None):
+    def _new_file_prepared(self, file_path):
+        """创建本地文件任务的空阶段结果"""
+        result = {
+            'success': False,
+            'error': None,
+            'file_name': os.path.basename(file_path),
+            'transcript_file': None
+        }
+        return {'kind': 'file', 'source': file_path, 'result': result, 'handler': None, 'stage': None}
+
+    def process_batch_urls(self, urls, status_callback=None, job_callback=None, progress_callback=None,
+                           cancel_token=None):
         """
-        批量处理 URL 列表
+        批量处理 URL 列表（并发数由 max_concurrent_tasks 控制）
 
         Args:
             urls (list): URL 列表
             status_callback (callable): 状态回调函数
+            job_callback (callable): 单个任务完成时的回调，参数为 Job 对象
+            progress_callback (callable): 批次整体进度回调，参数为 0~1 之间的数值
+            cancel_token (CancellationToken): 批次取消令牌，取消后终止进行中的任务并跳过尚未开始的任务
 
         Returns:
-            dict: 批量处理结果
+            dict: 批量处理结果，results 按输入顺序排列（播放列表展开后的顺序）
         """
-        results = []
-        total_count = len(urls)
-        success_count = 0
+        urls = self.expand_urls(urls, status_callback, cancel_token)
+        jobs = self._run_batch(
+            'url', urls, self.prepare_url, status_callback, job_callback, progress_callback, cancel_token
+        )
+        return self._summarize_jobs(jobs)
 
-        for i, url in enumerate(urls, 1):
-            if status_callback:
-                status_callback(f"处理第 {i}/{total_count} 个链接: {url}")
+    def expand_urls(self, urls, status_callback=None, cancel_token=None):
+        """
+        解析短链接，展开播放列表、频道和多P视频，并按视频 ID 去重
 
-            result = self.process_url(url, status_callback)
-            results.append(result)
+        短链接先并发解析为视频页面链接（见 ShortLinkResolver），通过不同形式的链接提交的同一视频只处理一次。
+        各链接由对应的平台处理器并发展开（请求速率由平台请求调度器控制），结果保持输入顺序。
+        解析或展开失败的链接原样保留，由后续任务报告错误。
 
-            if result['success']:
-                success_count += 1
+        Args:
+            urls (list): URL 列表
+            status_callback (callable): 状态回调函数
+            cancel_token (CancellationToken): 取消令牌
 
-        return {
-            'success': success_count > 0,
-            'total_count': total_count,
-            'success_count': success_count,
-            'failed_count': total_count - success_count,
-            'results': results
-        }
+        Returns:
+            list: 去重后的视频 URL 列表
+        """
+        urls = self.resolver.resolve_many(urls, status_callback, cancel_token)
+
+        if self.config.expand_playlists and urls:
+            def expand(url, match):
+                handler = self.platform_handlers.get(match.platform) if match else None
+                if not handler or not hasattr(handler, 'expand_url'):
+                    return [url]
+                try:
+                    with bind_token(cancel_token or current_token()):
+                        entries = handler.expand_url(url)
+                except JobCancelledError:
+                    # 批次已取消，后续任务会直接以取消结束
+                    return [url]
+                except Exception as e:
+                    self.logger.warning(f"展开链接失败 {url}: {e}")
+                    return [url]
+                if len(entries) != 1 or entries[0] != url:
+                    message = f"{url} 展开为 {len(entries)} 个视频"
+                    print(f"📃 {message}")
+                    if status_callback:
+                        status_callback(message)
+                return entries or [url]
+
+            workers = max(1, min(self.config.max_concurrent_tasks, len(urls)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='streamscribe-expand') as pool:
+                matches = self.registry.classify_many(urls)
+                expanded = [entry for entries in pool.map(expand, urls, matches) for entry in entries]
+        else:
+            expanded = list(urls)
 
-    def process_batch_files(self, file_paths, status_callback=None):
+        unique_urls, seen = [], set()
+        for url in expanded:
+            key = get_video_key(url) or url
+            if key not in seen:
+                seen.add(key)
+                unique_urls.append(url)
+
+        duplicate_count = len(expanded) - len(unique_urls)
+        if duplicate_count:
+            message = f"共 {len(unique_urls)} 个视频，跳过 {duplicate_count} 个重复链接"
+            print(f"📃 {message}")
+            if status_callback:
+                status_callback(message)
+
+        return unique_urls
+
+    def process_batch_files(self, file_paths, status_callback=None, job_callback=None, progress_callback=None,
+                            cancel_token=None, source_root=None):
         """
-        批量处理本地文件列表
+        批量处理本地文件列表（并发数由 max_concurrent_tasks 控制）
 
         Args:
             file_paths (list): 文件路径列表
             status_callback (callable): 状态回调函数
+            job_callback (callable): 单个任务完成时的回调，参数为 Job 对象
+            progress_callback (callable): 批次整体进度回调，参数为 0~1 之间的数值
+            cancel_token (CancellationToken): 批次取消令牌
+            source_root (str): 文件所在的根文件夹，设置后文稿按文件相对于它的子文件夹保存到输出目录，
+                不同子文件夹中的同名文件不会互相覆盖
 
         Returns:
-            dict: 批量处理结果
+            dict: 批量处理结果，results 按输入顺序排列
+        """
+        prepare_func = self.prepare_local_file
+        if source_root:
+            def prepare_func(file_path, status_callback=None, progress_callback=None, workspace=None):
+                return self.prepare_local_file(
+                    file_path, status_callback, progress_callback, workspace,
+                    self.mirrored_output_dir(source_root, file_path)
+                )
+
+        jobs = self._run_batch(
+            'file', file_paths, prepare_func, status_callback, job_callback, progress_callback, cancel_token
+        )
+        return self._summarize_jobs(jobs)
+
+    def mirrored_output_dir(self, source_root, file_path):
+        """
+        文件夹中的文件对应的文稿输出目录：输出目录下与文件相对于根文件夹相同的子文件夹
+
+        Args:
+            source_root (str): 根文件夹
+            file_path (str): 根文件夹中的文件
+
+        Returns:
+            str: 文稿输出目录，文件直接位于根文件夹中（或不在根文件夹中）时为 None（使用配置中的输出目录）
+        """
+        relative = os.path.relpath(os.path.dirname(os.path.abspath(file_path)), os.path.abspath(source_root))
+        if relative == os.curdir or relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        return os.path.join(self.config.output_dir, relative)
+
+    def process_directory(self, directory, status_callback=None, job_callback=None, progress_callback=None,
+                          recursive=True, rescan_all=False, cancel_token=None):
+        """
+        处理文件夹中的音视频文件
+
+        已转录文件索引中记录过且未变化的文件会被跳过，重新扫描同一文件夹时只处理新增或修改过的文件。
+
+        Args:
+            directory (str): 文件夹路径
+            status_callback (callable): 状态回调函数
+            job_callback (callable): 单个任务完成时的回调，参数为 Job 对象
+            progress_callback (callable): 批次整体进度回调，参数为 0~1 之间的数值
+            recursive (bool): 是否递归扫描子文件夹
+            rescan_all (bool): 忽略已转录文件索引，重新处理所有文件
+            cancel_token (CancellationToken): 批次取消令牌
+
+        Returns:
+            dict: 批量处理结果，另外包含 scanned_count（扫描到的文件数）和 skipped（跳过的文件列表）
+        """
+        files = self.platform_handlers['local'].scan_directory(directory, recursive)
+
+        if rescan_all:
+            pending, skipped = files, []
+        else:
+            pending, skipped = get_file_index().filter_pending(files)
+
+        message = f"扫描到 {len(files)} 个音视频文件，{len(pending)} 个待处理，{len(skipped)} 个已转录"
+        print(f"📂 {directory}: {message}")
+        self.logger.info(f"扫描文件夹 {directory}: {message}")
+        if status_callback:
+            status_callback(message)
+
+        summary = self.process_batch_files(
+            pending, status_callback, job_callback, progress_callback, cancel_token, source_root=directory
+        )
+        summary.update({
+            'directory': os.path.abspath(directory),
+            'scanned_count': len(files),
+            'skipped_count': len(skipped),
+            'skipped': skipped
+        })
+        return summary
+
+    def _run_batch(self, kind, sources, prepare_func, status_callback=None, job_callback=None, progress_callback=None,
+                   cancel_token=None):
+        """
+        执行批量任务
+
+        启用流水线模式时，下载阶段与转录阶段重叠执行；否则每个任务完整执行后再释放并发槽位。
+        启用任务日志时，每个任务的处理阶段都会按来源记录，中断后再次处理这些来源（批次组成可以不同）会从上次完成的阶段继续。
+
+        Args:
+            kind (str): 'url' 或 'file'
+            sources (list): URL 或文件路径列表
+            prepare_func (callable): 第一阶段函数（prepare_url 或 prepare_local_file）
+            status_callback (callable): 状态回调函数
+            job_callback (callable): 单个任务完成时的回调
+            progress_callback (callable): 批次整体进度回调
+            cancel_token (CancellationToken): 批次取消令牌
+
+        Returns:
+            list: 按输入顺序排列的 Job 列表
+        """
+        prepare, complete, abort = prepare_func, self.complete_prepared, self.abort_prepared
+
+        journal = get_job_journal()
+        batch_id = None
+        if journal.enabled and sources:
+            batch_id = journal.make_batch_id(kind, sources)
+            journal.register(batch_id, kind, sources)
+            prepare, complete, abort = self._make_journaled_stages(journal, kind, prepare_func)
+
+        estimate_cost = self._cost_estimator(kind)
+
+        if self.config.pipeline_mode:
+            transcription_cost = self.transcription_cost if self.config.cost_scheduling else None
+            pipeline = TranscriptionPipeline(
+                prepare, complete, self.needs_transcription, transcription_cost=transcription_cost, abort_func=abort
+            )
+            jobs = pipeline.run(sources, status_callback, job_callback, progress_callback, cancel_token, estimate_cost)
+        else:
+            def process(source, callback, job_progress):
+                return complete(prepare(source, callback, job_progress), callback, job_progress)
+
+            jobs = BatchExecutor().run(
+                sources, process, status_callback, job_callback, progress_callback, cancel_token, estimate_cost
+            )
+
+        # 整批成功后不再需要恢复记录；有失败的任务时保留，再次处理时跳过已完成的任务
+        if batch_id and all(job.success for job in jobs):
+            journal.clear_batch(batch_id)
+
+        return jobs
+
+    def estimate_cost(self, kind, source):
+        """
+        估计任务的转录成本，用于安排任务顺序（见 core/scheduler.py）
+
+        视频只读取视频信息缓存，不联网；本地文件运行 ffprobe 读取时长（结果会被后续处理复用）。
+
+        Args:
+            kind (str): 'url' 或 'file'
+            source (str): URL 或文件路径
+
+        Returns:
+            float: 需要转录的音频秒数，有可用字幕时为 0；无法估计时返回 None
+        """
+        try:
+            if kind == 'file':
+                return get_media_duration(source) or None
+
+            match = self.registry.classify(source)
+            handler = self.platform_handlers.get(match.platform) if match else None
+            if handler and hasattr(handler, 'estimate_cost'):
+                return handler.estimate_cost(source)
+        except Exception as e:
+            self.logger.debug(f"估计任务成本失败 {source}: {e}")
+        return None
+
+    def transcription_cost(self, prepared):
+        """
+        第一阶段完成后需要转录的音频时长（秒），用于安排等待转录的任务顺序
+
+        Returns:
+            float: 音频时长，无法获取时返回 None
+        """
+        stage = prepared.get('stage') or {}
+        audio_file = stage.get('audio_file')
+        if not audio_file:
+            return None
+        try:
+            return get_media_duration(audio_file) or None
+        except Exception as e:
+            self.logger.debug(f"读取音频时长失败 {audio_file}: {e}")
+            return None
+
+    def _cost_estimator(self, kind):
+        """
+        批量任务开始前估计成本的函数
+
+        本地文件批次不预先探测（逐个运行 ffprobe 会推迟第一个任务开始的时间），
+        由流水线在音频准备好后按实际时长安排转录顺序。
+
+        Returns:
+            callable: estimate_cost(source)，未启用按成本调度或为本地文件批次时返回 None
+        """
+        if not self.config.cost_scheduling or kind != 'url':
+            return None
+        return functools.partial(self.estimate_cost, kind)
+
+    def _make_journaled_stages(self, journal, kind, prepare_func):
+        """
+        生成带任务日志的两阶段函数
+
+        Args:
+            journal (JobJournal): 任务日志
+            kind (str): 'url' 或 'file'
+            prepare_func (callable): 第一阶段函数
+
+        Returns:
+            tuple: (prepare, complete, abort)，签名与 prepare_url / complete_prepared / abort_prepared 相同
+        """
+        def prepare(source, status_callback=None, progress_callback=None):
+            job_key = journal.make_job_key(kind, source)
+
+            # 同一来源正在由其他任务（本批次中重复的来源、其他批次或其他进程）处理时，
+            # 本任务不使用日志，在独立的临时工作目录中处理
+            lease = journal.acquire(job_key)
+            if lease is None:
+                self.logger.info(f"任务日志记录正被其他任务使用，本次不记录进度: {source}")
+                return prepare_func(source, status_callback, progress_callback)
+
+            try:
+                prepared = self._prepare_journaled(journal, job_key, kind, source, prepare_func,
+                                                   status_callback, progress_callback)
+            except BaseException:
+                lease.release()
+                raise
+
+            prepared['journal_lease'] = lease
+            return prepared
+
+        def complete(prepared, status_callback=None, progress_callback=None):
+            try:
+                result = self.complete_prepared(prepared, status_callback, progress_callback)
+
+                job_key = prepared.get('job_key')
+                if job_key and result.get('success') and not result.get('resumed'):
+                    journal.update(
+                        job_key, 'written',
+                        transcript_file=result.get('transcript_file'),
+                        snapshot={'result': result},
+                        error=None
+                    )
+                elif job_key and not result.get('success'):
+                    journal.update(job_key, error=result.get('error'))
+            finally:
+                lease = prepared.pop('journal_lease', None)
+                if lease:
+                    lease.release()
+
+            return result
+
+        def abort(prepared, error):
+            try:
+                self.abort_prepared(prepared, error)
+            finally:
+                lease = prepared.pop('journal_lease', None)
+                if lease:
+                    lease.release()
+
+        return prepare, complete, abort
+
+    def _prepare_journaled(self, journal, job_key, kind, source, prepare_func, status_callback=None,
+                           progress_callback=None):
+        """
+        持有租约时执行第一阶段：能从任务日志恢复时直接恢复，否则在固定的工作目录中处理并记录进度
+
+        Returns:
+            dict: 阶段结果
+        """
+        entry = journal.get(job_key) or {}
+        resumed = self._resume_prepared(entry, job_key, kind, source, journal, status_callback)
+        if resumed:
+            return resumed
+
+        prepared = prepare_func(source, status_callback, progress_callback, JobWorkspace(job_key, journal=journal))
+        prepared['job_key'] = job_key
+
+        try:
+            if self.needs_transcription(prepared):
+                stage = prepared['stage']
+                journal.update(
+                    job_key, 'downloaded',
+                    audio_file=stage['audio_file'],
+                    snapshot={
+                        'platform': prepared['result'].get('platform') or 'local',
+                        'result': prepared['result'],
+                        'stage_result': stage['result'],
+                        'source_file': stage.get('source_file'),
+                        'output_dir': stage.get('output_dir')
+                    }
+                )
+        except BaseException as e:
+            self.abort_prepared(prepared, e)
+            raise
+
+        return prepared
+
+    def _resume_prepared(self, entry, job_key, kind, source, journal, status_callback=None):
+        """
+        根据任务日志恢复第一阶段结果
+
+        Args:
+            entry (dict): 任务记录
+            job_key (str): 任务标识
+            kind (str): 'url' 或 'file'
+            source (str): URL 或文件路径
+            journal (JobJournal): 任务日志
+            status_callback (callable): 状态回调函数
+
+        Returns:
+            dict: 与 prepare_url 相同格式的阶段结果，无法恢复时返回 None
         """
-        results = []
-        total_count = len(file_paths)
-        success_count = 0
+        state = entry.get('state')
+        snapshot = entry.get('snapshot') or {}
+        transcript_file = entry.get('transcript_file')
+        audio_file = entry.get('audio_file')
+
+        # 已生成文稿：直接返回上次的结果
+        if state in ('transcribed', 'written') and transcript_file and os.path.exists(transcript_file):
+            result = {}
+            result.update(snapshot.get('result') or {})
+            result.update(snapshot.get('stage_result') or {})
+            result.update({'success': True, 'error': None, 'transcript_file': transcript_file, 'resumed': True})
 
-        for i, file_path in enumerate(file_paths, 1):
             if status_callback:
-                status_callback(f"处理第 {i}/{total_count} 个文件: {os.path.basename(file_path)}")
+                status_callback(f"📂 从任务日志恢复：已完成 {os.path.basename(transcript_file)}")
+            self.logger.info(f"从任务日志恢复已完成的任务: {source}")
+
+            return {'kind': kind, 'source': source, 'result': result, 'handler': None, 'stage': None, 'job_key': job_key}
+
+        # 已下载音频：复用工作目录中的音频，直接进入转录阶段
+        if state in ('downloaded', 'transcribed') and audio_file and os.path.exists(audio_file) and snapshot.get('result'):
+            handler = self.platform_handlers.get(snapshot.get('platform'))
+            if handler:
+                if status_callback:
+                    status_callback("📂 从任务日志恢复：复用已下载的音频")
+                self.logger.info(f"从任务日志恢复已下载的音频: {audio_file}")
 
-            result = self.process_local_file(file_path, status_callback)
-            results.append(result)
+                stage = {
+                    'result': snapshot.get('stage_result') or {'error': None},
+                    'audio_file': audio_file,
+                    'source_file': snapshot.get('source_file'),
+                    'output_dir': snapshot.get('output_dir'),
+                    'workspace': JobWorkspace(job_key, journal=journal)
+                }
+                return {
+                    'kind': kind, 'source': source, 'result': snapshot['result'],
+                    'handler': handler, 'stage': stage, 'job_key': job_key
+                }
+
+        return None
+
+    def _summarize_jobs(self, jobs):
+        """
+        汇总批量任务结果
 
-            if result['success']:
-                success_count += 1
+        Args:
+            jobs (list): Job 列表
+
+        Returns:
+            dict: 批量处理结果
+        """
+        total_count = len(jobs)
+        success_count = sum(1 for job in jobs if job.success)
 
         return {
             'success': success_count > 0,
             'total_count': total_count,
             'success_count': success_count,
             'failed_count': total_count - success_count,
-            'results': results
+            'cancelled_count': sum(1 for job in jobs if job.status == 'cancelled'),
+            'results': [job.result for job in jobs],
+            'jobs': jobs
         }
 
 
+    # asyncio 接口：获取信息、下载字幕和音频在事件循环中执行，转录在线程池中执行
+
+    async def prepare_url_async(self, url, status_callback=None, progress_callback=None, workspace=None):
+        """prepare_url 的 asyncio 版本，返回值相同"""
+        prepared = self._new_url_prepared(url)
+
+        try:
+            handler = await self._select_url_handler_async(prepared, status_callback)
+            if self._claim_job(prepared, status_callback, workspace):
+                prepared['stage'] = await handler.prepare_transcript_async(
+                    prepared['url'], status_callback, progress_callback, workspace
+                )
+        except asyncio.CancelledError:
+            self._release_job(prepared, cancelled=True)
+            raise
+        except Exception as e:
+            self._handle_failure(prepared, e, status_callback)
+
+        return prepared
+
+    async def _select_url_handler_async(self, prepared, status_callback=None):
+        """
+        _select_url_handler 的 asyncio 版本
+
+        短链接解析使用阻塞的网络请求和退避等待，在线程池中执行（继承当前协程的取消令牌），不阻塞事件循环。
+        """
+        match = self.registry.classify(prepared['source'])
+        if not match or match.kind != 'short':
+            return self._select_url_handler(prepared, status_callback)
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            None, functools.partial(context.run, self._select_url_handler, prepared, status_callback)
+        )
+
+    async def prepare_local_file_async(self, file_path, status_callback=None, progress_callback=None, workspace=None):
+        """prepare_local_file 的 asyncio 版本，返回值相同"""
+        prepared = self._new_file_prepared(file_path)
+
+        try:
+            self.logger.info(f"开始处理本地文件: {file_path}")
+
+            handler = self.platform_handlers['local']
+            prepared['handler'] = handler
+            if self._claim_job(prepared, status_callback, workspace):
+                prepared['stage'] = await handler.prepare_transcript_async(
+                    file_path, status_callback, progress_callback, workspace
+                )
+        except asyncio.CancelledError:
+            self._release_job(prepared, cancelled=True)
+            raise
+        except Exception as e:
+            self._handle_failure(prepared, f"处理本地文件时发生错误: {str(e)}", status_callback)
+
+        return prepared
+
+    async def complete_prepared_async(self, prepared, status_callback=None, progress_callback=None, executor=None):
+        """
+        complete_prepared 的 asyncio 版本，转录在 executor 线程池中执行
+
+        Args:
+            prepared (dict): prepare_url_async 或 prepare_local_file_async 的返回值
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            executor (Executor): 转录使用的线程池，默认为事件循环的默认线程池
+
+        Returns:
+            dict: 处理结果
+        """
+        if prepared.get('coalesced'):
+            return await self._complete_coalesced_async(prepared, status_callback, progress_callback, executor)
+        if not self.needs_transcription(prepared):
+            return self.complete_prepared(prepared, status_callback, progress_callback)
+
+        # 转录线程继承当前协程的取消令牌
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            executor, functools.partial(context.run, self.complete_prepared, prepared, status_callback, progress_callback)
+        )
+
+    async def _complete_coalesced_async(self, prepared, status_callback=None, progress_callback=None, executor=None):
+        """_complete_coalesced 的 asyncio 版本"""
+        try:
+            shared = await self.in_flight_jobs.wait_async(prepared.pop('coalesced'))
+        except JobCancelledError as e:
+            self._handle_failure(prepared, e, status_callback)
+            return prepared['result']
+
+        if shared is None:
+            if prepared['kind'] == 'url':
+                prepared = await self.prepare_url_async(prepared['source'], status_callback, progress_callback)
+            else:
+                prepared = await self.prepare_local_file_async(prepared['source'], status_callback, progress_callback)
+            return await self.complete_prepared_async(prepared, status_callback, progress_callback, executor)
+        return self._apply_coalesced_result(prepared, shared, status_callback)
+
+    async def process_url_async(self, url, status_callback=None, progress_callback=None, executor=None):
+        """process_url 的 asyncio 版本"""
+        prepared = await self.prepare_url_async(url, status_callback, progress_callback)
+        return await self.complete_prepared_async(prepared, status_callback, progress_callback, executor)
+
+    async def process_local_file_async(self, file_path, status_callback=None, progress_callback=None, executor=None):
+        """process_local_file 的 asyncio 版本"""
+        prepared = await self.prepare_local_file_async(file_path, status_callback, progress_callback)
+        return await self.complete_prepared_async(prepared, status_callback, progress_callback, executor)
+
+    async def process_batch_urls_async(self, urls, status_callback=None, job_callback=None, progress_callback=None):
+        """
+        process_batch_urls 的 asyncio 版本
+
+        最多 async_max_in_flight 个任务同时获取信息和下载，全部在同一个事件循环中执行，
+        不为每个任务占用一个线程；转录并发数由 transcribe_workers 控制。
+
+        Returns:
+            dict: 批量处理结果，results 按输入顺序排列（播放列表展开后的顺序）
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        urls = await loop.run_in_executor(None, functools.partial(context.run, self.expand_urls, urls, status_callback))
+        jobs = await self._run_batch_async(
+            urls, self.prepare_url_async, status_callback, job_callback, progress_callback, self._cost_estimator('url')
+        )
+        return self._summarize_jobs(jobs)
+
+    async def process_batch_files_async(self, file_paths, status_callback=None, job_callback=None, progress_callback=None):
+        """
+        process_batch_files 的 asyncio 版本
+
+        Returns:
+            dict: 批量处理结果，results 按输入顺序排列
+        """
+        jobs = await self._run_batch_async(file_paths, self.prepare_local_file_async, status_callback, job_callback, progress_callback)
+        return self._summarize_jobs(jobs)
+
+    async def _run_batch_async(self, sources, prepare_func, status_callback=None, job_callback=None, progress_callback=None,
+                               estimate_cost=None):
+        """
+        在事件循环中执行批量任务
+
+        每个任务从开始下载到转录结束一直占用一个并发名额，已下载待转录的音频最多 async_max_in_flight 个，
+        转录跟不上时下载会自然放缓。协程被取消时，正在运行的下载和转录进程会被终止。
+
+        Args:
+            sources (list): URL 或文件路径列表
+            prepare_func (callable): 第一阶段协程函数（prepare_url_async 或 prepare_local_file_async）
+            status_callback (callable): 状态回调函数
+            job_callback (callable): 单个任务完成时的回调
+            progress_callback (callable): 批次整体进度回调
+            estimate_cost (callable): 签名为 estimate_cost(source) -> 秒数或 None，用于安排任务的开始顺序
+
+        Returns:
+            list: 按输入顺序排列的 Job 列表
+        """
+        total = len(sources)
+        jobs = [Job(i, source, total) for i, source in enumerate(sources, 1)]
+
+        if not jobs:
+            return jobs
+
+        max_in_flight = self.config.async_max_in_flight
+        self.logger.info(
+            f"异步批量处理 {total} 个任务，同时进行: {max_in_flight}，转录并发: {self.config.transcribe_workers}"
+        )
+
+        slots = asyncio.Semaphore(max_in_flight)
+        report_progress = make_batch_progress_reporter(jobs, progress_callback)
+        executor = ThreadPoolExecutor(
+            max_workers=self.config.transcribe_workers, thread_name_prefix='streamscribe-transcribe'
+        )
+
+        async def run_job(job):
+            callback = job.bind_status_callback(status_callback)
+            job_progress = job.bind_progress_callback(report_progress)
+
+            async with slots:
+                job.start('downloading', timeout=self.config.job_timeout)
+                try:
+                    with bind_token(job.cancel_token):
+                        prepared = await prepare_func(job.source, callback, job_progress)
+                        if self.needs_transcription(prepared):
+                            job.status = 'transcribing'
+                        job.finish(await self.complete_prepared_async(prepared, callback, job_progress, executor))
+                except asyncio.CancelledError:
+                    # 同时终止在线程池中运行的转录进程
+                    job.cancel()
+                    job.fail("任务已取消")
+                    raise
+                except Exception as e:
+                    self.logger.error(f"任务 {job.label} 执行异常: {e}")
+                    job.fail(e)
+
+            report_progress()
+            if job_callback:
+                try:
+                    job_callback(job)
+                except Exception as e:
+                    self.logger.warning(f"任务回调出错: {e}")
+
+        try:
+            # 信号量按请求顺序分配名额，按调度顺序启动即按调度顺序开始处理
+            await asyncio.gather(*(run_job(job) for job in schedule_jobs(jobs, estimate_cost)))
+        finally:
+            executor.shutdown(wait=False)
+
+        return jobs
+
 # 便捷函数
 def process_video_url(url, status_callback=None):
     """
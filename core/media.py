@@ -0,0 +1,287 @@
+"""
+媒体信息模块
+
+每个输入文件只运行一次 ffprobe，读取时长、各条流的编码、声道数和采样率，
+结果按 (路径, 修改时间, 大小) 缓存在内存中，转录时长统计、音轨复制判断和分段规划共用同一份记录。
+ffmpeg / ffprobe 的查找顺序也集中在这里。
+"""
+
+import json
+import logging
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from .process import run_process, run_process_async
+
+
+# ffmpeg 查找顺序
+FFMPEG_COMMANDS = [
+    'ffmpeg',  # 系统 PATH 中的 ffmpeg
+    'J:\\app\\ffmpeg\\bin\\ffmpeg.exe',  # 常见的 ffmpeg 位置
+]
+
+# ffprobe 查找顺序
+FFPROBE_COMMANDS = [
+    'ffprobe',  # 系统 PATH 中的 ffprobe
+    'J:\\app\\ffmpeg\\bin\\ffprobe.exe',  # 常见的 ffprobe 位置
+]
+
+# 内存中保留的探测结果数
+MAX_CACHE_ENTRIES = 1024
+
+
+class StreamInfo:
+    """单条媒体流的信息"""
+
+    def __init__(self, index, codec_type, codec_name=None, channels=None, sample_rate=None,
+                 duration=None, attached_pic=False):
+        self.index = index
+        self.codec_type = codec_type
+        self.codec_name = codec_name
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.attached_pic = attached_pic
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'index': self.index,
+            'codec_type': self.codec_type,
+            'codec_name': self.codec_name,
+            'channels': self.channels,
+            'sample_rate': self.sample_rate,
+            'duration': self.duration,
+            'attached_pic': self.attached_pic
+        }
+
+
+class MediaInfo:
+    """一个媒体文件的探测结果"""
+
+    def __init__(self, path, duration, format_name, streams):
+        """
+        Args:
+            path (str): 文件路径
+            duration (float): 时长（秒），未知时为 0
+            format_name (str): 容器格式（ffprobe 的 format_name）
+            streams (list): StreamInfo 列表
+        """
+        self.path = path
+        self.duration = duration
+        self.format_name = format_name
+        self.streams = streams
+
+    @property
+    def audio_streams(self):
+        """音频流列表"""
+        return [stream for stream in self.streams if stream.codec_type == 'audio']
+
+    @property
+    def video_streams(self):
+        """视频流列表（不含音频文件中内嵌的封面图片）"""
+        return [stream for stream in self.streams if stream.codec_type == 'video' and not stream.attached_pic]
+
+    @property
+    def has_audio(self):
+        """是否包含音轨"""
+        return bool(self.audio_streams)
+
+    @property
+    def has_video(self):
+        """是否包含视频画面"""
+        return bool(self.video_streams)
+
+    @property
+    def audio(self):
+        """第一条音轨（ffmpeg 的 0:a:0），没有音轨时为 None"""
+        streams = self.audio_streams
+        return streams[0] if streams else None
+
+    @property
+    def audio_codec(self):
+        """第一条音轨的编码"""
+        return self.audio.codec_name if self.audio else None
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'path': self.path,
+            'duration': self.duration,
+            'format_name': self.format_name,
+            'streams': [stream.to_dict() for stream in self.streams]
+        }
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_key(path):
+    """按 (绝对路径, 修改时间, 大小) 生成缓存键，文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def _cache_get(key):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return True, _cache[key]
+    return False, None
+
+
+def _cache_set(key, info):
+    with _cache_lock:
+        _cache[key] = info
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def clear_media_cache():
+    """清空内存中的探测结果"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _build_probe_command(ffprobe_cmd, path):
+    """构建读取容器和各条流信息的 ffprobe 命令（只输出需要的字段）"""
+    return [
+        ffprobe_cmd,
+        '-v', 'error',
+        '-show_entries',
+        'format=duration,format_name'
+        ':stream=index,codec_type,codec_name,channels,sample_rate,duration'
+        ':stream_disposition=attached_pic',
+        '-of', 'json',
+        path
+    ]
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_probe_output(path, output):
+    """
+    解析 ffprobe 的 JSON 输出
+
+    Args:
+        path (str): 文件路径
+        output (str): ffprobe 输出
+
+    Returns:
+        MediaInfo: 探测结果，输出无法解析时返回 None
+    """
+    try:
+        data = json.loads(output or '{}')
+    except json.JSONDecodeError:
+        return None
+
+    streams = []
+    for stream in data.get('streams') or []:
+        streams.append(StreamInfo(
+            index=stream.get('index'),
+            codec_type=stream.get('codec_type'),
+            codec_name=stream.get('codec_name'),
+            channels=_to_int(stream.get('channels')),
+            sample_rate=_to_int(stream.get('sample_rate')),
+            duration=_to_float(stream.get('duration')),
+            attached_pic=bool((stream.get('disposition') or {}).get('attached_pic'))
+        ))
+
+    fmt = data.get('format') or {}
+    duration = _to_float(fmt.get('duration'))
+    if not duration:
+        # 部分容器（例如 mkv 中的音轨）只在流上记录时长
+        duration = max((stream.duration or 0 for stream in streams), default=0)
+
+    return MediaInfo(path, duration or 0.0, fmt.get('format_name'), streams)
+
+
+def probe_media(path):
+    """
+    探测媒体文件（同一文件只运行一次 ffprobe）
+
+    Args:
+        path (str): 文件路径
+
+    Returns:
+        MediaInfo: 探测结果，文件不存在、无法识别或 ffprobe 不可用时返回 None
+    """
+    key = _cache_key(path)
+    if key is None:
+        return None
+
+    found, info = _cache_get(key)
+    if found:
+        return info
+
+    for ffprobe_cmd in FFPROBE_COMMANDS:
+        try:
+            result = run_process(_build_probe_command(ffprobe_cmd, path), timeout=60, tail_lines=2000)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            continue
+        return _store_result(key, path, result)
+
+    logging.getLogger(__name__).warning("ffprobe 不可用，无法读取媒体信息")
+    return None
+
+
+async def probe_media_async(path):
+    """probe_media 的 asyncio 版本（与同步版本共用缓存）"""
+    key = _cache_key(path)
+    if key is None:
+        return None
+
+    found, info = _cache_get(key)
+    if found:
+        return info
+
+    for ffprobe_cmd in FFPROBE_COMMANDS:
+        try:
+            result = await run_process_async(_build_probe_command(ffprobe_cmd, path), timeout=60, tail_lines=2000)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            continue
+        return _store_result(key, path, result)
+
+    logging.getLogger(__name__).warning("ffprobe 不可用，无法读取媒体信息")
+    return None
+
+
+def _store_result(key, path, result):
+    """解析 ffprobe 结果并写入缓存（ffprobe 无法识别的文件也会记录，不再重复探测）"""
+    info = parse_probe_output(path, result.stdout) if result.returncode == 0 else None
+    if info is None:
+        logging.getLogger(__name__).warning(f"无法读取媒体信息: {path}")
+    _cache_set(key, info)
+    return info
+
+
+def get_media_duration(path):
+    """
+    获取媒体时长
+
+    Args:
+        path (str): 文件路径
+
+    Returns:
+        float: 时长（秒），无法获取时返回 0
+    """
+    info = probe_media(path)
+    return info.duration if info else 0.0
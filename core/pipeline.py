@@ -0,0 +1,192 @@
+"""
+下载/转录流水线
+
+将批量任务拆分为两个阶段：
+- 下载阶段：获取视频信息、字幕或音频（网络 I/O 密集）
+- 转录阶段：Whisper 转录（CPU/GPU 密集）
+
+两个阶段之间用有界队列连接，Whisper 处理第 N 个视频时，
+第 N+1、N+2 个视频的音频已经在后台下载。
+提供成本函数时，下载阶段按估计成本安排开始顺序，等待转录的任务按实际音频时长短的先转录。
+任务的取消令牌在两个阶段分别绑定到执行线程，排队等待转录的时间不计入任务超时。
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .cancel import bind_token
+from .config import get_config
+from .executor import Job, make_batch_progress_reporter, schedule_jobs
+from .scheduler import PriorityJobQueue
+
+
+class TranscriptionPipeline:
+    """两阶段转录流水线"""
+
+    def __init__(self, prepare_func, complete_func, needs_transcription,
+                 download_workers=None, transcribe_workers=None, prefetch_count=None, transcription_cost=None,
+                 abort_func=None):
+        """
+        初始化流水线
+
+        Args:
+            prepare_func (callable): 下载阶段函数，签名为 prepare_func(source, status_callback, progress_callback) -> prepared
+            complete_func (callable): 转录阶段函数，签名为 complete_func(prepared, status_callback, progress_callback) -> dict
+            needs_transcription (callable): 判断 prepared 是否需要进入转录阶段
+            download_workers (int): 下载阶段并发数，默认取 max_concurrent_tasks 与 max_workers 中较小者
+            transcribe_workers (int): 转录阶段并发数，默认读取 [advanced] transcribe_workers
+            prefetch_count (int): 已下载待转录的任务队列上限，默认读取 [advanced] prefetch_count
+            transcription_cost (callable): 签名为 transcription_cost(prepared) -> 音频秒数或 None，
+                用于安排等待转录的任务顺序，为 None 时按下载完成的顺序转录
+            abort_func (callable): 签名为 abort_func(prepared, error)，第一阶段已完成但任务没能交给第二阶段时调用，
+                释放任务占用的资源（进行中任务登记、任务日志租约等）
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        self.prepare_func = prepare_func
+        self.complete_func = complete_func
+        self.needs_transcription = needs_transcription
+        self.transcription_cost = transcription_cost
+        self.abort_func = abort_func
+
+        if download_workers is None:
+            download_workers = min(self.config.max_concurrent_tasks, self.config.max_workers)
+        if transcribe_workers is None:
+            transcribe_workers = self.config.transcribe_workers
+        if prefetch_count is None:
+            prefetch_count = self.config.prefetch_count
+
+        self.download_workers = max(1, int(download_workers))
+        self.transcribe_workers = max(1, int(transcribe_workers))
+        self.prefetch_count = max(1, int(prefetch_count))
+
+    def run(self, sources, status_callback=None, job_callback=None, progress_callback=None, cancel_token=None,
+            estimate_cost=None):
+        """
+        执行流水线
+
+        Args:
+            sources (list): URL 或文件路径列表
+            status_callback (callable): 状态回调函数，消息会带上任务序号前缀
+            job_callback (callable): 单个任务完成时的回调，参数为 Job 对象
+            progress_callback (callable): 批次整体进度回调，参数为 0~1 之间的数值
+            cancel_token (CancellationToken): 批次取消令牌
+            estimate_cost (callable): 签名为 estimate_cost(source) -> 秒数或 None，用于安排下载阶段的开始顺序
+
+        Returns:
+            list: 按输入顺序排列的 Job 列表
+        """
+        total = len(sources)
+        jobs = [Job(i, source, total, cancel_token) for i, source in enumerate(sources, 1)]
+
+        if not jobs:
+            return jobs
+
+        self.logger.info(
+            f"流水线处理 {total} 个任务，下载并发: {self.download_workers}，"
+            f"转录并发: {self.transcribe_workers}，预取队列: {self.prefetch_count}"
+        )
+
+        scheduled = schedule_jobs(jobs, estimate_cost)
+        ready_queue = PriorityJobQueue(maxsize=self.prefetch_count)
+        callback_lock = threading.Lock()
+        report_progress = make_batch_progress_reporter(jobs, progress_callback)
+
+        def finish_job(job, result):
+            job.finish(result)
+            report_progress()
+            self._notify(job, job_callback, callback_lock)
+
+        def download_stage(job):
+            if job.cancelled:
+                # 排队期间已被取消，不再占用下载槽位
+                job.fail(job.cancel_token.reason)
+                report_progress()
+                self._notify(job, job_callback, callback_lock)
+                return
+
+            callback = job.bind_status_callback(status_callback)
+            job_progress = job.bind_progress_callback(report_progress)
+            job.start('downloading', timeout=self.config.job_timeout)
+
+            prepared = None
+            try:
+                with bind_token(job.cancel_token):
+                    prepared = self.prepare_func(job.source, callback, job_progress)
+
+                    if self.needs_transcription(prepared):
+                        job.status = 'ready'
+                        job.pause_timeout()
+                        if self.transcription_cost:
+                            job.cost = self.transcription_cost(prepared)
+                        # 队列已满时阻塞，避免下载远远领先于转录而占满磁盘
+                        ready_queue.put((job, prepared), job.priority, job.cost, job.submitter)
+                    else:
+                        # 字幕或失败的任务无需进入转录阶段，直接完成（交给 complete_func 后由它负责释放资源）
+                        handed_off, prepared = prepared, None
+                        finish_job(job, self.complete_func(handed_off, callback, job_progress))
+
+            except Exception as e:
+                self.logger.error(f"任务 {job.label} 下载阶段异常: {e}")
+                if prepared is not None and self.abort_func:
+                    try:
+                        self.abort_func(prepared, e)
+                    except Exception as abort_error:
+                        self.logger.warning(f"任务 {job.label} 释放资源出错: {abort_error}")
+                job.fail(e)
+                report_progress()
+                self._notify(job, job_callback, callback_lock)
+
+        def transcribe_stage():
+            while True:
+                item = ready_queue.get()
+                if item is None:
+                    break
+
+                job, prepared = item
+                job.status = 'transcribing'
+                job.resume_timeout()
+
+                try:
+                    # 已取消的任务由 complete_func 立即结束并清理工作目录
+                    with bind_token(job.cancel_token):
+                        finish_job(job, self.complete_func(
+                            prepared,
+                            job.bind_status_callback(status_callback),
+                            job.bind_progress_callback(report_progress)
+                        ))
+                except Exception as e:
+                    self.logger.error(f"任务 {job.label} 转录阶段异常: {e}")
+                    job.fail(e)
+                    report_progress()
+                    self._notify(job, job_callback, callback_lock)
+
+        consumers = [
+            threading.Thread(target=transcribe_stage, name=f'streamscribe-transcribe-{i}', daemon=True)
+            for i in range(self.transcribe_workers)
+        ]
+        for consumer in consumers:
+            consumer.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.download_workers, thread_name_prefix='streamscribe-download') as pool:
+                list(pool.map(download_stage, scheduled))
+        finally:
+            # 所有下载完成后通知转录线程：取完剩余的任务后退出
+            ready_queue.close()
+            for consumer in consumers:
+                consumer.join()
+
+        return jobs
+
+    def _notify(self, job, job_callback, lock):
+        """串行调用任务完成回调"""
+        if not job_callback:
+            return
+
+        with lock:
+            try:
+                job_callback(job)
+            except Exception as e:
+                self.logger.warning(f"任务回调出错: {e}")
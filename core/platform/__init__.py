@@ -1,16 +1,16 @@
 """
 StreamScribe Platform Package
 
-这个包包含了各个视频平台的特定处理逻辑。
+这个包包含了各个视频平台的特定处理逻辑，各处理器在导入时注册到平台注册表（core/registry.py）。
 
 当前支持的平台:
 - YouTube (youtube.py)
-
-未来计划支持:
-- Bilibili
-- 其他视频平台
+- Bilibili (bilibili.py)
+- 本地文件 (local.py)
 """
 
 from .youtube import YouTubeHandler
+from .bilibili import BilibiliHandler
+from .local import LocalFileHandler
 
-__all__ = ['YouTubeHandler']
+__all__ = ['YouTubeHandler', 'BilibiliHandler', 'LocalFileHandler']
@@ -4,6 +4,9 @@ B站（Bilibili）视频处理器
 使用 BBDown 下载 B站视频并提取文稿。
 """
 
+import asyncio
+import contextvars
+import functools
 import os
 import subprocess
 import logging
@@ -11,60 +14,96 @@ import re
 from pathlib import Path
 from ..config import get_config
 from ..transcriber import WhisperTranscriber
-from ..utils import sanitize_filename
+from ..utils import (
+    sanitize_filename, extract_video_id_from_url, extract_collection_from_url, extract_part_number, parse_duration
+)
+from ..cache import get_metadata_cache
+from ..cancel import JobCancelledError
+from ..process import ProgressParser, make_progress_handler, run_process, run_process_async
+from ..ratelimit import RetryableError, get_scheduler
+from ..workspace import JobWorkspace
+from ..registry import register_handler
+from .playlist import build_flat_playlist_command, list_playlist_ids
 
 
 class BilibiliHandler:
     """B站视频处理器类"""
+
+    PLATFORM = 'bilibili'
+
+    # URL 模式（见 core/registry.py），合集排在个人空间前面
+    URL_PATTERNS = [
+        ('video', r'bilibili\.com/(?:s/)?video/(?P<id>BV[0-9A-Za-z]+|av\d+)'),
+        ('short', r'b23\.tv/(?P<id>[0-9A-Za-z]+)'),
+        ('playlist', r'space\.bilibili\.com/\d+/(?:channel/(?:collectiondetail|seriesdetail)\?(?:\S*?&)?sid=|lists/)(?P<id>\d+)'),
+        ('channel', r'space\.bilibili\.com/(?P<id>\d+)'),
+    ]
+
+    # --only-show-info 输出保留的行数：标题在最前面，其后每个分P一行，需要完整保留（B站单个视频最多 1000 个分P）
+    INFO_TAIL_LINES = 5000
     
     def __init__(self):
         """初始化B站处理器"""
         self.config = get_config()
         self.logger = logging.getLogger(__name__)
         self.transcriber = WhisperTranscriber()
+        self.metadata_cache = get_metadata_cache()
+        self.scheduler = get_scheduler('bilibili')
     
-    def get_transcript(self, url, status_callback=None):
+    def get_transcript(self, url, status_callback=None, progress_callback=None):
         """
         获取B站视频的文稿
 
         Args:
             url (str): B站视频链接
             status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数，签名为 progress_callback(stage, fraction, eta)
 
         Returns:
             dict: 处理结果
         """
-        result = {
-            'success': False,
-            'transcript_file': None,
-            'error': None,
-            'video_title': None,
-            'method': 'whisper',  # B站视频总是使用 whisper 转录
-            'processing_time': None,
-            'audio_duration': None,
-            'speed_ratio': None
-        }
-        
+        prepared = self.prepare_transcript(url, status_callback, progress_callback)
+        return self.complete_transcript(prepared, status_callback, progress_callback)
+
+    def prepare_transcript(self, url, status_callback=None, progress_callback=None, workspace=None):
+        """
+        第一阶段：获取视频信息，有字幕时直接生成文稿，否则下载音频
+
+        Args:
+            url (str): B站视频链接
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            workspace (JobWorkspace): 任务工作目录，默认新建
+
+        Returns:
+            dict: 阶段结果，包含 result（处理结果）、audio_file（待转录音频，无需转录时为 None）
+                和 workspace（任务工作目录）
+        """
+        result = self._new_result()
+        audio_file = None
+        workspace = workspace or JobWorkspace()
+
         try:
             # 更新状态
             if status_callback:
                 status_callback("正在获取B站视频信息...")
-            
+
             # 获取视频信息
             video_info = self._get_video_info(url)
             if not video_info:
                 raise Exception("无法获取视频信息")
-            
+
             result['video_title'] = video_info.get('title', 'Unknown')
-            
+            workspace.mark('metadata', video_title=result['video_title'])
+
             if status_callback:
                 status_callback(f"视频标题: {result['video_title']}")
-            
+
             # 检查是否有现成的字幕
             if status_callback:
                 status_callback("检查是否有现成字幕...")
 
-            subtitle_file = self._try_download_subtitle(url, video_info)
+            subtitle_file = self._try_download_subtitle(url, video_info, workspace)
             if subtitle_file:
                 result['transcript_file'] = subtitle_file
                 result['success'] = True
@@ -74,266 +113,702 @@ class BilibiliHandler:
                     status_callback("找到现成字幕，处理完成！")
 
                 self.logger.info(f"成功获取B站字幕: {url}")
-                return result
+                workspace.cleanup()
+                return {'result': result, 'audio_file': None, 'workspace': workspace}
 
             # 如果没有找到字幕，给出提示
             if status_callback:
                 status_callback("未找到现成字幕（可能需要B站账号登录），将使用AI转录...")
-            
+
             # 没有字幕，下载音频进行转录
             if status_callback:
                 status_callback("未找到字幕，正在下载音频...")
-            
-            audio_file = self._download_audio(url, video_info)
+
+            audio_file = self._download_audio(url, video_info, workspace, status_callback, progress_callback)
             if not audio_file:
                 raise Exception("音频下载失败")
-            
+
+        except Exception as e:
+            self._handle_error(result, e, status_callback)
+
+        # 没有待转录的音频时工作目录已经没有用处
+        if not audio_file:
+            workspace.cleanup()
+
+        return {'result': result, 'audio_file': audio_file, 'workspace': workspace}
+
+    def complete_transcript(self, prepared, status_callback=None, progress_callback=None):
+        """
+        第二阶段：转录第一阶段下载的音频
+
+        Args:
+            prepared (dict): prepare_transcript 的返回值
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+
+        Returns:
+            dict: 处理结果
+        """
+        result = prepared['result']
+        audio_file = prepared.get('audio_file')
+
+        if not audio_file or result['error']:
+            return result
+
+        try:
             # 使用 Whisper 转录
             if status_callback:
                 status_callback("正在使用 AI 转录音频...")
 
-            transcribe_result = self.transcriber.run_whisper(audio_file, self.config.output_dir)
+            workspace = prepared.get('workspace')
+            transcribe_result = self.transcriber.run_whisper(
+                audio_file, self.config.output_dir, status_callback, progress_callback, workspace
+            )
             transcript_file = transcribe_result['transcript_file']
+            if workspace:
+                workspace.mark('transcribed', transcript_file=transcript_file)
 
             # 记录处理信息
             self.logger.info(f"处理时间: {transcribe_result['processing_time']:.2f}秒, 加速倍率: {transcribe_result['speed_ratio']:.2f}x")
 
-            # 清理临时音频文件
-            try:
-                os.remove(audio_file)
-            except:
-                pass
+            # 清理工作目录（含临时音频文件）
+            if workspace:
+                workspace.cleanup()
 
             result['transcript_file'] = transcript_file
             result['processing_time'] = transcribe_result['processing_time']
             result['audio_duration'] = transcribe_result['audio_duration']
             result['speed_ratio'] = transcribe_result['speed_ratio']
             result['success'] = True
-            
+
             if status_callback:
                 status_callback("文稿生成完成！")
-            
-            self.logger.info(f"成功处理B站视频: {url}")
-            
+
+            self.logger.info(f"成功处理B站视频: {result['video_title']}")
+
         except Exception as e:
-            error_msg = str(e)
-            result['error'] = error_msg
-            self.logger.error(f"处理B站视频失败: {error_msg}")
-            
-            if status_callback:
-                status_callback(f"处理失败: {error_msg}")
-        
+            self._handle_error(result, e, status_callback)
+
         return result
-    
-    def _get_video_info(self, url):
-        """获取视频信息"""
+
+    async def get_transcript_async(self, url, status_callback=None, progress_callback=None, executor=None):
+        """
+        get_transcript 的 asyncio 版本
+
+        BBDown 以异步子进程在事件循环中执行，Whisper 转录放到 executor 线程池中执行。
+
+        Args:
+            url (str): B站视频链接
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            executor (Executor): 转录使用的线程池，默认为事件循环的默认线程池
+
+        Returns:
+            dict: 处理结果
+        """
+        prepared = await self.prepare_transcript_async(url, status_callback, progress_callback)
+        return await self.complete_transcript_async(prepared, status_callback, progress_callback, executor)
+
+    async def prepare_transcript_async(self, url, status_callback=None, progress_callback=None, workspace=None):
+        """
+        prepare_transcript 的 asyncio 版本，返回值相同
+
+        协程被取消时会终止正在运行的 BBDown 并清理工作目录。
+        """
+        result = self._new_result()
+        audio_file = None
+        workspace = workspace or JobWorkspace()
+
         try:
-            # BBDown 的正确命令格式：BBDown <url> --only-show-info
-            command = [
-                self.config.bbdown_path,
-                url,
-                '--only-show-info'
-            ]
-
-            print(f"\n🔍 获取B站视频信息:")
-            print(f"📋 {' '.join(command)}")
-            print()
+            if status_callback:
+                status_callback("正在获取B站视频信息...")
+
+            video_info = await self._get_video_info_async(url)
+            result['video_title'] = video_info.get('title', 'Unknown')
+            workspace.mark('metadata', video_title=result['video_title'])
+
+            if status_callback:
+                status_callback(f"视频标题: {result['video_title']}")
+                status_callback("检查是否有现成字幕...")
+
+            subtitle_file = await self._try_download_subtitle_async(url, video_info, workspace)
+            if subtitle_file:
+                result['transcript_file'] = subtitle_file
+                result['success'] = True
+                result['method'] = 'subtitle'
+
+                if status_callback:
+                    status_callback("找到现成字幕，处理完成！")
+
+                self.logger.info(f"成功获取B站字幕: {url}")
+            else:
+                if status_callback:
+                    status_callback("未找到字幕，正在下载音频...")
+
+                audio_file = await self._download_audio_async(url, video_info, workspace, status_callback, progress_callback)
+
+        except asyncio.CancelledError:
+            workspace.cleanup()
+            raise
+        except Exception as e:
+            self._handle_error(result, e, status_callback)
+
+        if not audio_file:
+            workspace.cleanup()
+
+        return {'result': result, 'audio_file': audio_file, 'workspace': workspace}
+
+    async def complete_transcript_async(self, prepared, status_callback=None, progress_callback=None, executor=None):
+        """
+        complete_transcript 的 asyncio 版本，转录在 executor 线程池中执行
+
+        转录开始后取消协程不会中断 Whisper 进程，只是不再等待结果；
+        转录线程继承当前协程的取消令牌，取消令牌时 Whisper 进程随之终止。
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            executor, functools.partial(context.run, self.complete_transcript, prepared, status_callback, progress_callback)
+        )
+
+    def _new_result(self):
+        """创建空的处理结果"""
+        return {
+            'success': False,
+            'transcript_file': None,
+            'error': None,
+            'video_title': None,
+            'method': 'whisper',  # B站视频总是使用 whisper 转录
+            'processing_time': None,
+            'audio_duration': None,
+            'speed_ratio': None
+        }
+
+    def _handle_error(self, result, error, status_callback=None):
+        """记录处理失败信息"""
+        error_msg = str(error)
+        result['error'] = error_msg
+        self.logger.error(f"处理B站视频失败: {error_msg}")
+
+        if status_callback:
+            status_callback(f"处理失败: {error_msg}")
+
+    def _get_video_info(self, url):
+        """获取视频信息（优先读取本地缓存）"""
+        cache_key, cached_info = self._get_cached_video_info(url)
+        if cached_info:
+            return cached_info
+
+        video_info = self._fetch_video_info(url)
+        if video_info:
+            video_info = self._apply_part(video_info, url)
+            self.metadata_cache.set('bilibili', cache_key, video_info)
+            return video_info
+
+        return self._fallback_video_info(url)
+
+    def _get_cached_video_info(self, url):
+        """
+        读取缓存的视频信息
+
+        Returns:
+            tuple: (缓存键, 视频信息)，未命中时视频信息为 None
+        """
+        platform, video_id = extract_video_id_from_url(url)
+        cache_key = self._cache_key(video_id, extract_part_number(url)) if platform == 'bilibili' else None
+
+        cached_info = self.metadata_cache.get('bilibili', cache_key)
+        if cached_info:
+            print(f"📦 使用缓存的视频信息: {cached_info.get('title', video_id)}")
+
+        return cache_key, cached_info
+
+    def _cache_key(self, video_id, part=None):
+        """视频信息的缓存键，多P视频的各分P分别缓存"""
+        return f"{video_id}_p{part}" if part else video_id
+
+    def _fallback_video_info(self, url):
+        """获取视频信息失败时，尝试从URL提取BV号作为标题（不写入缓存）"""
+        bv_match = re.search(r'(BV[a-zA-Z0-9]+)', url)
+        if bv_match:
+            part = extract_part_number(url)
+            return {'title': f"{bv_match.group(1)}_P{part}" if part else bv_match.group(1)}
+
+        return {'title': 'B站视频'}
+
+    def _build_info_command(self, url):
+        """构建获取视频信息的 BBDown 命令"""
+        # BBDown 的正确命令格式：BBDown <url> --only-show-info
+        return [
+            self.config.bbdown_path,
+            url,
+            '--only-show-info'
+        ]
+
+    def _parse_video_info(self, output):
+        """
+        解析 BBDown --only-show-info 的输出
+
+        Returns:
+            dict: 视频信息，解析失败时返回 None
+        """
+        # 解析视频标题 - BBDown 输出格式：视频标题: xxx
+        title_match = re.search(r'视频标题[:：]\s*(.+)', output)
+        if title_match:
+            title = title_match.group(1).strip()
+            return {'title': title, 'pages': self._parse_pages(output)}
+        return None
+
+    def _parse_pages(self, output):
+        """
+        解析 BBDown 列出的分P信息，格式：P1: [cid] [分P标题] [时长]
+
+        Returns:
+            list: [{'page': 序号, 'title': 分P标题, 'duration': 时长（秒）}]，按序号排列，无法解析的时长不记录
+        """
+        pages = {}
+        for match in re.finditer(r'P(\d+)[:：]\s*\[(\d+)\]\s*\[(.*?)\](?:\s*\[([^\]]*)\])?', output):
+            page = int(match.group(1))
+            if page in pages:
+                continue
+            pages[page] = {'page': page, 'title': match.group(3).strip()}
+            duration = parse_duration(match.group(4))
+            if duration:
+                pages[page]['duration'] = duration
+        return [pages[page] for page in sorted(pages)]
+
+    def _apply_part(self, video_info, url):
+        """多P视频的分P链接：标题加上分P序号和分P标题，避免各分P的文稿同名"""
+        part = extract_part_number(url)
+        pages = video_info.get('pages') or []
+        if not part or len(pages) <= 1:
+            return video_info
+
+        page = next((page for page in pages if page['page'] == part), {})
+        return dict(video_info, title=self._part_title(video_info['title'], part, page.get('title')), part=part)
+
+    def _part_title(self, title, part, page_title=None):
+        """分P的标题，例如：课程名 P3 第三讲"""
+        if page_title and page_title != title:
+            return f"{title} P{part} {page_title}"
+        return f"{title} P{part}"
+
+    def _page_args(self, url):
+        """分P链接对应的 BBDown 分P参数"""
+        part = extract_part_number(url)
+        return ['-p', str(part)] if part else []
+
+    def estimate_cost(self, url):
+        """
+        估计任务的转录成本（只读取视频信息缓存，不联网）
+
+        BBDown 的视频信息中没有字幕列表，成本按分P时长估计。
+
+        Args:
+            url (str): B站视频链接
 
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=False,
-                timeout=60
+        Returns:
+            float: 需要转录的音频时长（秒），没有缓存的视频信息或时长时返回 None
+        """
+        platform, video_id = extract_video_id_from_url(url)
+        if platform != 'bilibili':
+            return None
+
+        part = extract_part_number(url)
+        video_info = self.metadata_cache.get('bilibili', self._cache_key(video_id, part))
+        pages = (video_info or {}).get('pages') or []
+        page = next((page for page in pages if page['page'] == (part or 1)), None)
+        return page.get('duration') if page else None
+
+    def expand_url(self, url):
+        """
+        展开合集、个人空间和多P视频
+
+        合集和个人空间通过 yt-dlp --flat-playlist 列出视频；多P视频按 BBDown 列出的分P展开为带 ?p=N 的链接，
+        各分P的标题同时写入视频信息缓存，分P任务不再重复获取视频信息。
+        已指定分P（?p=N）的链接只处理该分P。
+
+        Args:
+            url (str): B站链接
+
+        Returns:
+            list: 视频链接列表，单个视频的链接原样返回
+
+        Raises:
+            Exception: yt-dlp 执行失败
+        """
+        platform, kind = extract_collection_from_url(url)
+        if platform == 'bilibili':
+            command = build_flat_playlist_command(
+                self.config.yt_dlp_path, url, self.config.playlist_max_entries,
+                ['--referer', 'https://www.bilibili.com/']
             )
+            print(f"\n🔍 执行 yt-dlp 展开B站合集:")
+            print(f"📋 {' '.join(command)}")
+
+            video_ids = list_playlist_ids(self.scheduler, command, r'BV[0-9A-Za-z]{10}|av\d+', "展开B站合集")
+            return [f"https://www.bilibili.com/video/{video_id}" for video_id in video_ids]
 
-            # 尝试解码输出
-            output = ""
-            for encoding in ['utf-8', 'gbk', 'cp936']:
-                try:
-                    output = result.stdout.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-
-            if result.returncode == 0 and output:
-                # 解析视频标题 - BBDown 输出格式：视频标题: xxx
-                title_match = re.search(r'视频标题[:：]\s*(.+)', output)
-                if title_match:
-                    title = title_match.group(1).strip()
-                    return {'title': title}
-
-            # 如果解析失败，尝试从URL提取BV号作为标题
-            bv_match = re.search(r'(BV[a-zA-Z0-9]+)', url)
-            if bv_match:
-                return {'title': bv_match.group(1)}
-
-            return {'title': 'B站视频'}
+        platform, video_id = extract_video_id_from_url(url)
+        if platform != 'bilibili' or not video_id.startswith(('BV', 'av')) or extract_part_number(url):
+            return [url]
+
+        cache_key, video_info = self._get_cached_video_info(url)
+        if not video_info or 'pages' not in video_info:
+            # 未缓存，或旧版本缓存的视频信息没有分P列表
+            video_info = self._fetch_video_info(url)
+            if not video_info:
+                return [url]
+            self.metadata_cache.set('bilibili', cache_key, video_info)
+
+        pages = video_info.get('pages') or []
+        max_entries = self.config.playlist_max_entries
+        if max_entries:
+            pages = pages[:max_entries]
+        if len(pages) <= 1:
+            return [url]
+
+        urls = []
+        for page in pages:
+            part = page['page']
+            part_info = dict(video_info, title=self._part_title(video_info['title'], part, page['title']), part=part)
+            self.metadata_cache.set('bilibili', self._cache_key(video_id, part), part_info)
+            urls.append(f"https://www.bilibili.com/video/{video_id}?p={part}")
+
+        print(f"📑 {video_info['title']} 共 {len(urls)} 个分P")
+        return urls
+
+    def _fetch_video_info(self, url):
+        """
+        通过 BBDown --only-show-info 获取视频信息（经平台请求调度器限速和重试）
 
+        Returns:
+            dict: 视频信息，获取或解析失败时返回 None
+        """
+        command = self._build_info_command(url)
+
+        print(f"\n🔍 获取B站视频信息:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+        def fetch(attempt):
+            try:
+                result = run_process(command, timeout=60, tail_lines=self.INFO_TAIL_LINES)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("获取B站视频信息超时")
+            return self._parse_info_result(result)
+
+        try:
+            return self.scheduler.call(fetch, "获取B站视频信息")
+        except JobCancelledError:
+            raise
         except Exception as e:
             self.logger.warning(f"获取B站视频信息失败: {e}")
-            return {'title': 'B站视频'}
-    
-    def _try_download_subtitle(self, url, video_info):
-        """尝试下载现成的字幕"""
-        if not self.config.bbdown_download_subtitle:
             return None
 
-        try:
-            title = video_info.get('title', 'bilibili_video')
-            safe_title = sanitize_filename(title)
+    def _parse_info_result(self, result):
+        """
+        解析 BBDown --only-show-info 的执行结果
 
-            # 确保临时目录存在
-            os.makedirs(self.config.temp_dir, exist_ok=True)
+        Returns:
+            dict: 视频信息，输出中没有标题时返回 None
 
-            # BBDown 的正确命令格式：BBDown <url> --sub-only --work-dir <dir>
-            command = [
-                self.config.bbdown_path,
-                url,
-                '--sub-only',
-                '--work-dir', self.config.temp_dir
-            ]
+        Raises:
+            Exception: BBDown 执行失败（是否重试由调度器根据输出判断）
+        """
+        if result.returncode != 0:
+            raise Exception(self._describe_failure(result))
+        return self._parse_video_info(result.stdout) if result.stdout else None
 
-            print(f"\n🔍 尝试下载B站字幕:")
-            print(f"📋 {' '.join(command)}")
-            print()
+    def _describe_failure(self, result):
+        """
+        BBDown 执行失败时的错误信息
 
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=False,
-                timeout=300
-            )
+        BBDown 把错误写到标准输出，取两个输出流的最后几行，调度器据此判断是否被限流
 
-            # 打印输出用于调试
-            output = ""
-            for encoding in ['utf-8', 'gbk', 'cp936']:
-                try:
-                    output = result.stdout.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-
-            print(f"BBDown 返回码: {result.returncode}")
-            if output:
-                print(f"BBDown 输出: {output[:200]}...")
-
-            if result.returncode == 0:
-                # 查找下载的字幕文件 - 扩大搜索范围
-                subtitle_extensions = ['*.srt', '*.ass', '*.vtt', '*.xml']
-                subtitle_files = []
-
-                for ext in subtitle_extensions:
-                    subtitle_files.extend(list(Path(self.config.temp_dir).glob(ext)))
-
-                print(f"找到的字幕文件: {[f.name for f in subtitle_files]}")
-
-                if subtitle_files:
-                    # 选择第一个字幕文件
-                    subtitle_file = subtitle_files[0]
-                    output_file = os.path.join(self.config.output_dir, f"{safe_title}.txt")
-
-                    # 根据文件类型转换
-                    if subtitle_file.suffix.lower() == '.srt':
-                        self._convert_srt_to_txt(str(subtitle_file), output_file)
-                    elif subtitle_file.suffix.lower() == '.ass':
-                        self._convert_ass_to_txt(str(subtitle_file), output_file)
-                    elif subtitle_file.suffix.lower() == '.vtt':
-                        self._convert_vtt_to_txt(str(subtitle_file), output_file)
-                    else:
-                        # 其他格式直接复制内容
-                        with open(subtitle_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        with open(output_file, 'w', encoding='utf-8') as f:
-                            f.write(content)
-
-                    # 清理临时文件
-                    try:
-                        subtitle_file.unlink()
-                    except:
-                        pass
-
-                    print(f"✅ 字幕转换完成: {output_file}")
-                    return output_file
-                else:
-                    print("❌ 未找到字幕文件")
-            else:
-                print(f"❌ BBDown 执行失败，返回码: {result.returncode}")
+        Args:
+            result (ProcessResult): 执行结果
 
+        Returns:
+            str: 错误信息
+        """
+        output = '\n'.join(text for text in (result.stdout, result.stderr) if text)
+        tail = '\n'.join(output.strip().splitlines()[-5:])
+        message = f"BBDown 执行失败，返回码: {result.returncode}"
+        return f"{message}\n{tail}" if tail else message
+    
+    def _try_download_subtitle(self, url, video_info, workspace):
+        """尝试下载现成的字幕（输出到任务独占的字幕目录）"""
+        if not self.config.bbdown_download_subtitle:
             return None
 
+        title = video_info.get('title', 'bilibili_video')
+        safe_title = sanitize_filename(title)
+
+        command = self._build_subtitle_command(url, workspace)
+
+        print(f"\n🔍 尝试下载B站字幕:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+        def download(attempt):
+            try:
+                result = run_process(command, timeout=300)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("下载B站字幕超时")
+            self._check_result(result)
+
+        try:
+            self.scheduler.call(download, "下载B站字幕")
+            return self._convert_downloaded_subtitle(workspace, safe_title)
+
+        except JobCancelledError:
+            raise
         except Exception as e:
             self.logger.warning(f"下载B站字幕失败: {e}")
             print(f"❌ 字幕下载异常: {e}")
             return None
+
+    def _check_result(self, result):
+        """
+        打印 BBDown 的返回码和输出开头（用于调试），执行失败时抛出异常
+
+        Raises:
+            Exception: BBDown 执行失败
+        """
+        output = result.stdout
+
+        print(f"BBDown 返回码: {result.returncode}")
+        if output:
+            print(f"BBDown 输出: {output[:200]}...")
+
+        if result.returncode != 0:
+            print(f"❌ BBDown 执行失败，返回码: {result.returncode}")
+            raise Exception(self._describe_failure(result))
     
-    def _download_audio(self, url, video_info):
-        """下载音频文件"""
+    def _build_subtitle_command(self, url, workspace):
+        """构建下载字幕的 BBDown 命令（输出到任务独占的字幕目录）"""
+        # BBDown 的正确命令格式：BBDown <url> --sub-only --work-dir <dir>
+        return [
+            self.config.bbdown_path,
+            url,
+            '--sub-only',
+            '--work-dir', workspace.subdir('subtitles')
+        ] + self._page_args(url)
+
+    def _convert_downloaded_subtitle(self, workspace, safe_title):
+        """
+        把下载的字幕文件转换为文稿
+
+        Returns:
+            str: 文稿文件路径，未找到字幕文件时返回 None
+        """
+        # 字幕目录中只有本任务下载的文件
+        found = workspace.find_file('subtitles', ['.srt', '.ass', '.vtt', '.xml'])
+
+        print(f"找到的字幕文件: {found}")
+
+        if not found:
+            print("❌ 未找到字幕文件")
+            return None
+
+        subtitle_file = Path(found)
+        output_file = os.path.join(self.config.output_dir, f"{safe_title}.txt")
+
+        # 根据文件类型转换
+        if subtitle_file.suffix.lower() == '.srt':
+            self._convert_srt_to_txt(str(subtitle_file), output_file)
+        elif subtitle_file.suffix.lower() == '.ass':
+            self._convert_ass_to_txt(str(subtitle_file), output_file)
+        elif subtitle_file.suffix.lower() == '.vtt':
+            self._convert_vtt_to_txt(str(subtitle_file), output_file)
+        else:
+            # 其他格式直接复制内容
+            with open(subtitle_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+
+        # 清理临时文件
         try:
-            title = video_info.get('title', 'bilibili_video')
-            safe_title = sanitize_filename(title)
+            subtitle_file.unlink()
+        except:
+            pass
+
+        print(f"✅ 字幕转换完成: {output_file}")
+        return output_file
+
+    def _build_audio_command(self, url, workspace, safe_title):
+        """构建下载音频的 BBDown 命令"""
+        # BBDown 的正确命令格式：BBDown <url> --audio-only --work-dir <dir>
+        # 输出到任务独占的音频目录，并用 --file-pattern 固定文件名
+        return [
+            self.config.bbdown_path,
+            url,
+            '--audio-only',
+            '--work-dir', workspace.subdir('audio'),
+            '--file-pattern', safe_title
+        ] + self._page_args(url)
+
+    def _find_downloaded_audio(self, workspace, safe_title):
+        """按固定文件名查找下载的音频，音频目录中只有本任务下载的文件"""
+        audio_file = workspace.find_file('audio', ['.m4a', '.mp3', '.aac', '.flac', '.wav'], safe_title)
+
+        print(f"找到的音频文件: {audio_file}")
+
+        if audio_file:
+            print(f"✅ 音频下载完成: {audio_file}")
+        else:
+            print("❌ 未找到音频文件")
+        return audio_file
+
+    def _download_audio(self, url, video_info, workspace, status_callback=None, progress_callback=None):
+        """下载音频文件（实时解析 BBDown 输出的下载百分比，经平台请求调度器限速和重试）"""
+        title = video_info.get('title', 'bilibili_video')
+        safe_title = sanitize_filename(title)
+
+        command = self._build_audio_command(url, workspace, safe_title)
+
+        print(f"\n🔍 下载B站音频:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+        def download(attempt):
+            if attempt:
+                print(f"🔄 重试第 {attempt} 次下载音频...")
+            try:
+                result = run_process(
+                    command,
+                    timeout=1800,  # 30分钟超时
+                    progress_parser=ProgressParser('download'),
+                    progress_handler=make_progress_handler(
+                        'download', "正在下载音频", status_callback, progress_callback
+                    )
+                )
+            except subprocess.TimeoutExpired:
+                raise RetryableError("音频下载超时")
+            return self._check_audio_result(result, workspace, safe_title)
 
-            # 确保临时目录存在
-            os.makedirs(self.config.temp_dir, exist_ok=True)
+        try:
+            return self.scheduler.call(download, "下载B站音频")
+        except JobCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"音频下载失败: {str(e)}")
 
-            # BBDown 的正确命令格式：BBDown <url> --audio-only --work-dir <dir>
-            command = [
-                self.config.bbdown_path,
-                url,
-                '--audio-only',
-                '--work-dir', self.config.temp_dir
-            ]
+    def _check_audio_result(self, result, workspace, safe_title):
+        """
+        检查 BBDown 下载音频的执行结果
 
-            print(f"\n🔍 下载B站音频:")
-            print(f"📋 {' '.join(command)}")
-            print()
+        Returns:
+            str: 音频文件路径
 
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=False,
-                timeout=1800  # 30分钟超时
-            )
+        Raises:
+            RetryableError: 下载结束但没有找到音频文件
+            Exception: BBDown 执行失败
+        """
+        self._check_result(result)
 
-            # 打印输出用于调试
-            output = ""
-            for encoding in ['utf-8', 'gbk', 'cp936']:
-                try:
-                    output = result.stdout.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-
-            print(f"BBDown 返回码: {result.returncode}")
-            if output:
-                print(f"BBDown 输出: {output[:200]}...")
-
-            if result.returncode == 0:
-                # 查找下载的音频文件 - 扩大搜索范围
-                audio_extensions = ['*.mp3', '*.aac', '*.flac', '*.m4a', '*.wav']
-                audio_files = []
-
-                for ext in audio_extensions:
-                    audio_files.extend(list(Path(self.config.temp_dir).glob(ext)))
-
-                print(f"找到的音频文件: {[f.name for f in audio_files]}")
-
-                if audio_files:
-                    # 选择第一个音频文件
-                    audio_file = audio_files[0]
-                    print(f"✅ 音频下载完成: {audio_file}")
-                    return str(audio_file)
-                else:
-                    print("❌ 未找到音频文件")
-            else:
-                print(f"❌ BBDown 执行失败，返回码: {result.returncode}")
+        audio_file = self._find_downloaded_audio(workspace, safe_title)
+        if not audio_file:
+            raise RetryableError("音频文件下载失败")
+        return audio_file
+    
+    async def _get_video_info_async(self, url):
+        """_get_video_info 的 asyncio 版本"""
+        cache_key, cached_info = self._get_cached_video_info(url)
+        if cached_info:
+            return cached_info
+
+        command = self._build_info_command(url)
+        print(f"\n🔍 获取B站视频信息:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+        async def fetch(attempt):
+            try:
+                result = await run_process_async(command, timeout=60, tail_lines=self.INFO_TAIL_LINES)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("获取B站视频信息超时")
+            return self._parse_info_result(result)
 
-            raise Exception("音频文件下载失败")
+        video_info = None
+        try:
+            video_info = await self.scheduler.call_async(fetch, "获取B站视频信息")
+        except JobCancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"获取B站视频信息失败: {e}")
+
+        if video_info:
+            video_info = self._apply_part(video_info, url)
+            self.metadata_cache.set('bilibili', cache_key, video_info)
+            return video_info
+
+        return self._fallback_video_info(url)
+
+    async def _try_download_subtitle_async(self, url, video_info, workspace):
+        """_try_download_subtitle 的 asyncio 版本"""
+        if not self.config.bbdown_download_subtitle:
+            return None
+
+        safe_title = sanitize_filename(video_info.get('title', 'bilibili_video'))
+        command = self._build_subtitle_command(url, workspace)
+
+        print(f"\n🔍 尝试下载B站字幕:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+        async def download(attempt):
+            try:
+                result = await run_process_async(command, timeout=300)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("下载B站字幕超时")
+            self._check_result(result)
+
+        try:
+            await self.scheduler.call_async(download, "下载B站字幕")
+            return self._convert_downloaded_subtitle(workspace, safe_title)
+
+        except JobCancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"下载B站字幕失败: {e}")
+            print(f"❌ 字幕下载异常: {e}")
+            return None
+
+    async def _download_audio_async(self, url, video_info, workspace, status_callback=None, progress_callback=None):
+        """_download_audio 的 asyncio 版本"""
+        safe_title = sanitize_filename(video_info.get('title', 'bilibili_video'))
+        command = self._build_audio_command(url, workspace, safe_title)
 
-        except subprocess.TimeoutExpired:
-            raise Exception("音频下载超时")
+        print(f"\n🔍 下载B站音频:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+        async def download(attempt):
+            if attempt:
+                print(f"🔄 重试第 {attempt} 次下载音频...")
+            try:
+                result = await run_process_async(
+                    command,
+                    timeout=1800,  # 30分钟超时
+                    progress_parser=ProgressParser('download'),
+                    progress_handler=make_progress_handler(
+                        'download', "正在下载音频", status_callback, progress_callback
+                    )
+                )
+            except subprocess.TimeoutExpired:
+                raise RetryableError("音频下载超时")
+            return self._check_audio_result(result, workspace, safe_title)
+
+        try:
+            return await self.scheduler.call_async(download, "下载B站音频")
+        except JobCancelledError:
+            raise
         except Exception as e:
             raise Exception(f"音频下载失败: {str(e)}")
-    
+
     def _convert_srt_to_txt(self, srt_file, txt_file):
         """将 SRT 字幕转换为纯文本"""
         try:
@@ -417,6 +892,9 @@ class BilibiliHandler:
             raise
 
 
+register_handler(BilibiliHandler)
+
+
 # 便捷函数
 def process_bilibili_url(url, status_callback=None):
     """
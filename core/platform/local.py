@@ -4,6 +4,9 @@
 处理本地音频和视频文件的转录。
 """
 
+import asyncio
+import contextvars
+import functools
 import os
 import subprocess
 import logging
@@ -11,82 +14,245 @@ from pathlib import Path
 from ..config import get_config
 from ..transcriber import WhisperTranscriber
 from ..utils import sanitize_filename
+from ..media import FFMPEG_COMMANDS, probe_media, probe_media_async
+from ..process import ProgressParser, make_progress_handler, run_process, run_process_async
+from ..workspace import JobWorkspace
+from ..registry import register_handler
 
 
 class LocalFileHandler:
     """本地文件处理器类"""
-    
+
+    PLATFORM = 'local'
+    URL_PATTERNS = []
+
+    # Whisper 可以直接解码、提取时只需复制的音频编码及对应的容器扩展名
+    STREAM_COPY_CONTAINERS = {
+        'aac': 'm4a',
+        'alac': 'm4a',
+        'mp3': 'mp3',
+        'opus': 'opus',
+        'vorbis': 'ogg',
+        'flac': 'flac',
+    }
+
     def __init__(self):
         """初始化本地文件处理器"""
         self.config = get_config()
         self.logger = logging.getLogger(__name__)
         self.transcriber = WhisperTranscriber()
     
-    def get_transcript(self, file_path, status_callback=None):
+    def get_transcript(self, file_path, status_callback=None, progress_callback=None):
         """
         获取本地文件的文稿
         
         Args:
             file_path (str): 本地文件路径
             status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数，签名为 progress_callback(stage, fraction, eta)
             
         Returns:
             dict: 处理结果
         """
-        result = {
-            'success': False,
-            'transcript_file': None,
-            'error': None,
-            'file_name': None,
-            'method': 'whisper'  # 本地文件总是使用 whisper 转录
-        }
-        
+        prepared = self.prepare_transcript(file_path, status_callback, progress_callback)
+        return self.complete_transcript(prepared, status_callback, progress_callback)
+
+    def prepare_transcript(self, file_path, status_callback=None, progress_callback=None, workspace=None,
+                           output_dir=None):
+        """
+        第一阶段：校验文件，视频文件先提取音频
+
+        Args:
+            file_path (str): 本地文件路径
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            workspace (JobWorkspace): 任务工作目录，默认新建
+            output_dir (str): 文稿输出目录，默认使用配置中的输出目录
+
+        Returns:
+            dict: 阶段结果，包含 result（处理结果）、audio_file（待转录音频）、source_file（原始文件）、
+                output_dir（文稿输出目录）和 workspace（任务工作目录）
+        """
+        result = self._new_result()
+        audio_file = None
+        workspace = workspace or JobWorkspace()
+
         try:
-            # 验证文件存在
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"文件不存在: {file_path}")
-            
-            file_path = os.path.abspath(file_path)
-            file_name = Path(file_path).name
-            result['file_name'] = file_name
-            
-            # 更新状态
-            if status_callback:
-                status_callback(f"开始处理文件: {file_name}")
-            
-            # 验证文件格式
-            if not self._is_supported_format(file_path):
-                supported_formats = ', '.join(self.config.get_all_supported_formats())
-                raise ValueError(f"不支持的文件格式。支持的格式: {supported_formats}")
-            
+            file_path = self._validate_file(file_path, result, workspace, status_callback)
+            media_info = self._check_media(probe_media(file_path))
+
             # 检查是否需要提取音频
-            if self._is_video_file(file_path):
+            if self._is_video_file(file_path, media_info):
                 if status_callback:
                     status_callback("检测到视频文件，正在提取音频...")
                 
-                audio_file = self._extract_audio_from_video(file_path)
+                audio_file = self._extract_audio_from_video(file_path, workspace, status_callback, progress_callback)
             else:
                 if status_callback:
                     status_callback("检测到音频文件，准备转录...")
                 
                 audio_file = file_path
-            
+
+        except Exception as e:
+            audio_file = None
+            self._handle_error(result, e, status_callback)
+
+        if not audio_file:
+            workspace.cleanup()
+
+        return {
+            'result': result, 'audio_file': audio_file, 'source_file': file_path,
+            'output_dir': output_dir, 'workspace': workspace
+        }
+
+    async def get_transcript_async(self, file_path, status_callback=None, progress_callback=None, executor=None):
+        """
+        get_transcript 的 asyncio 版本
+
+        ffmpeg 提取音频以异步子进程在事件循环中执行，Whisper 转录放到 executor 线程池中执行。
+
+        Args:
+            file_path (str): 本地文件路径
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            executor (Executor): 转录使用的线程池，默认为事件循环的默认线程池
+
+        Returns:
+            dict: 处理结果
+        """
+        prepared = await self.prepare_transcript_async(file_path, status_callback, progress_callback)
+        return await self.complete_transcript_async(prepared, status_callback, progress_callback, executor)
+
+    async def prepare_transcript_async(self, file_path, status_callback=None, progress_callback=None, workspace=None,
+                                       output_dir=None):
+        """
+        prepare_transcript 的 asyncio 版本，返回值相同
+
+        协程被取消时会终止正在运行的 ffmpeg 并清理工作目录。
+        """
+        result = self._new_result()
+        audio_file = None
+        workspace = workspace or JobWorkspace()
+
+        try:
+            file_path = self._validate_file(file_path, result, workspace, status_callback)
+            media_info = self._check_media(await probe_media_async(file_path))
+
+            if self._is_video_file(file_path, media_info):
+                if status_callback:
+                    status_callback("检测到视频文件，正在提取音频...")
+
+                audio_file = await self._extract_audio_from_video_async(file_path, workspace, status_callback, progress_callback)
+            else:
+                if status_callback:
+                    status_callback("检测到音频文件，准备转录...")
+
+                audio_file = file_path
+
+        except asyncio.CancelledError:
+            workspace.cleanup()
+            raise
+        except Exception as e:
+            audio_file = None
+            self._handle_error(result, e, status_callback)
+
+        if not audio_file:
+            workspace.cleanup()
+
+        return {
+            'result': result, 'audio_file': audio_file, 'source_file': file_path,
+            'output_dir': output_dir, 'workspace': workspace
+        }
+
+    async def complete_transcript_async(self, prepared, status_callback=None, progress_callback=None, executor=None):
+        """
+        complete_transcript 的 asyncio 版本，转录在 executor 线程池中执行
+
+        转录开始后取消协程不会中断 Whisper 进程，只是不再等待结果；
+        转录线程继承当前协程的取消令牌，取消令牌时 Whisper 进程随之终止。
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            executor, functools.partial(context.run, self.complete_transcript, prepared, status_callback, progress_callback)
+        )
+
+    def _new_result(self):
+        """创建空的处理结果"""
+        return {
+            'success': False,
+            'transcript_file': None,
+            'error': None,
+            'file_name': None,
+            'method': 'whisper'  # 本地文件总是使用 whisper 转录
+        }
+
+    def _validate_file(self, file_path, result, workspace, status_callback=None):
+        """
+        校验文件存在且格式受支持
+
+        Returns:
+            str: 文件的绝对路径
+        """
+        # 验证文件存在
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+
+        file_path = os.path.abspath(file_path)
+        file_name = Path(file_path).name
+        result['file_name'] = file_name
+        workspace.mark('metadata', video_title=file_name)
+
+        # 更新状态
+        if status_callback:
+            status_callback(f"开始处理文件: {file_name}")
+
+        # 验证文件格式
+        if not self._is_supported_format(file_path):
+            supported_formats = ', '.join(self.config.get_all_supported_formats())
+            raise ValueError(f"不支持的文件格式。支持的格式: {supported_formats}")
+
+        return file_path
+
+    def complete_transcript(self, prepared, status_callback=None, progress_callback=None):
+        """
+        第二阶段：转录音频
+
+        Args:
+            prepared (dict): prepare_transcript 的返回值
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+
+        Returns:
+            dict: 处理结果
+        """
+        result = prepared['result']
+        audio_file = prepared.get('audio_file')
+        file_path = prepared.get('source_file')
+
+        if not audio_file or result['error']:
+            return result
+
+        try:
             # 使用 Whisper 转录
             if status_callback:
                 status_callback("正在使用 AI 转录音频...")
 
-            transcribe_result = self.transcriber.run_whisper(audio_file, self.config.output_dir)
+            workspace = prepared.get('workspace')
+            transcribe_result = self.transcriber.run_whisper(
+                audio_file, prepared.get('output_dir') or self.config.output_dir,
+                status_callback, progress_callback, workspace
+            )
             transcript_file = transcribe_result['transcript_file']
+            if workspace:
+                workspace.mark('transcribed', transcript_file=transcript_file)
 
             # 记录处理信息
             self.logger.info(f"处理时间: {transcribe_result['processing_time']:.2f}秒, 加速倍率: {transcribe_result['speed_ratio']:.2f}x")
 
-            # 如果提取了临时音频文件，清理它
-            if audio_file != file_path:
-                try:
-                    os.remove(audio_file)
-                except:
-                    pass
+            # 清理工作目录（含提取的临时音频文件，原始文件不在其中）
+            if workspace:
+                workspace.cleanup()
 
             result['transcript_file'] = transcript_file
             result['processing_time'] = transcribe_result['processing_time']
@@ -100,14 +266,18 @@ class LocalFileHandler:
             self.logger.info(f"成功处理本地文件: {file_path}")
             
         except Exception as e:
-            error_msg = str(e)
-            result['error'] = error_msg
-            self.logger.error(f"处理本地文件失败: {error_msg}")
-            
-            if status_callback:
-                status_callback(f"处理失败: {error_msg}")
+            self._handle_error(result, e, status_callback)
         
         return result
+
+    def _handle_error(self, result, error, status_callback=None):
+        """记录处理失败信息"""
+        error_msg = str(error)
+        result['error'] = error_msg
+        self.logger.error(f"处理本地文件失败: {error_msg}")
+
+        if status_callback:
+            status_callback(f"处理失败: {error_msg}")
     
     def _is_supported_format(self, file_path):
         """检查文件格式是否支持"""
@@ -115,60 +285,198 @@ class LocalFileHandler:
         supported_formats = self.config.get_all_supported_formats()
         return file_ext in supported_formats
     
-    def _is_video_file(self, file_path):
-        """检查是否为视频文件"""
+    def scan_directory(self, directory, recursive=False):
+        """
+        列出目录中支持的音视频文件（跳过以 . 开头的隐藏文件和目录）
+
+        Args:
+            directory (str): 目录路径
+            recursive (bool): 是否递归扫描子目录
+
+        Returns:
+            list: 按路径排序的文件绝对路径列表
+
+        Raises:
+            NotADirectoryError: 目录不存在
+        """
+        if not os.path.isdir(directory):
+            raise NotADirectoryError(f"目录不存在: {directory}")
+
+        supported = set(self.config.get_all_supported_formats())
+        files = []
+        for root, dirs, names in os.walk(os.path.abspath(directory)):
+            dirs[:] = [name for name in dirs if not name.startswith('.')] if recursive else []
+            for name in names:
+                if not name.startswith('.') and Path(name).suffix.lower().lstrip('.') in supported:
+                    files.append(os.path.join(root, name))
+
+        return sorted(files)
+
+    def _is_video_file(self, file_path, media_info=None):
+        """
+        检查是否为视频文件
+
+        能读取媒体信息时按是否包含视频画面判断（只有音轨的 mp4/webm 直接转录，
+        带封面图片的音频文件不算视频），否则按扩展名判断
+        """
+        if media_info is not None:
+            return media_info.has_video
         file_ext = Path(file_path).suffix.lower().lstrip('.')
         return file_ext in self.config.supported_video_formats
+
+    def _check_media(self, media_info):
+        """
+        检查文件中是否有可转录的音轨
+
+        Returns:
+            MediaInfo: 原样返回探测结果（ffprobe 不可用时为 None）
+        """
+        if media_info is not None and not media_info.has_audio:
+            raise ValueError("文件中没有音轨，无法转录")
+        return media_info
     
-    def _extract_audio_from_video(self, video_path):
-        """从视频文件中提取音频"""
-        video_name = Path(video_path).stem
-        safe_name = sanitize_filename(video_name)
-        audio_file = os.path.join(self.config.temp_dir, f"{safe_name}_extracted.mp3")
-        
-        # 使用 ffmpeg 提取音频（如果可用）
-        # 首先尝试使用系统的 ffmpeg
-        ffmpeg_commands = [
-            'ffmpeg',  # 系统 PATH 中的 ffmpeg
-            'J:\\app\\ffmpeg\\bin\\ffmpeg.exe',  # 常见的 ffmpeg 位置
+    def _stream_copy_container(self, codec):
+        """
+        音轨可以原样复制时使用的容器扩展名
+
+        Args:
+            codec (str): ffprobe 报告的音频编码名称
+
+        Returns:
+            str: 扩展名，该编码需要转码时返回 None
+        """
+        if not codec:
+            return None
+        if codec in self.STREAM_COPY_CONTAINERS:
+            return self.STREAM_COPY_CONTAINERS[codec]
+        if codec in ('pcm_s16le', 'pcm_s24le', 'pcm_s32le', 'pcm_f32le', 'pcm_u8'):
+            return 'wav'
+        return None
+
+    def _extraction_plans(self, video_path, workspace, codec):
+        """
+        按顺序尝试的音频提取方式
+
+        Whisper 能直接解码的音轨用 -c:a copy 复制到对应容器，耗时只取决于磁盘读写速度；
+        其他编码（或复制失败时）转码为 Whisper 使用的 16kHz 单声道 FLAC。
+        audio_format = mp3 时沿用 192k mp3 转码。
+
+        Args:
+            video_path (str): 视频文件路径
+            workspace (JobWorkspace): 任务工作目录
+            codec (str): 第一条音轨的编码，未知时为 None
+
+        Returns:
+            list: [(输出文件路径, ffmpeg 编码参数), ...]
+        """
+        safe_name = sanitize_filename(Path(video_path).stem)
+        audio_dir = workspace.subdir('audio')
+
+        def output(ext):
+            return os.path.join(audio_dir, f"{safe_name}_extracted.{ext}")
+
+        if self.config.download_audio_format == 'mp3':
+            return [(output('mp3'), ['-acodec', 'mp3', '-ab', '192k', '-ar', '44100'])]
+
+        plans = []
+        container = self._stream_copy_container(codec)
+        if container:
+            plans.append((output(container), ['-map', '0:a:0', '-c:a', 'copy']))
+        plans.append((output('flac'), ['-ac', '1', '-ar', '16000', '-c:a', 'flac']))
+        return plans
+
+    def _build_extract_command(self, ffmpeg_cmd, video_path, audio_file, codec_args):
+        """构建提取音频的 ffmpeg 命令"""
+        return [
+            ffmpeg_cmd,
+            '-i', video_path,
+            '-vn',  # 不包含视频
+            *codec_args,
+            '-y',  # 覆盖输出文件
+            audio_file
         ]
-        
-        for ffmpeg_cmd in ffmpeg_commands:
-            try:
-                command = [
-                    ffmpeg_cmd,
-                    '-i', video_path,
-                    '-vn',  # 不包含视频
-                    '-acodec', 'mp3',
-                    '-ab', '192k',
-                    '-ar', '44100',
-                    '-y',  # 覆盖输出文件
-                    audio_file
-                ]
-                
-                print(f"\n🔍 执行 ffmpeg 音频提取:")
-                print(f"📋 {' '.join(command)}")
-                print()
-                
-                result = subprocess.run(
-                    command,
-                    capture_output=True,
-                    text=False,
-                    timeout=1800  # 30分钟超时
-                )
-                
+
+    def _announce_extraction(self, command, codec_args, codec):
+        """打印提取音频的命令"""
+        if 'copy' in codec_args:
+            print(f"\n🔍 执行 ffmpeg 音频提取（直接复制 {codec} 音轨，不重新编码）:")
+        else:
+            print(f"\n🔍 执行 ffmpeg 音频提取:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+    def _extract_audio_from_video(self, video_path, workspace, status_callback=None, progress_callback=None):
+        """从视频文件中提取音频（根据 ffmpeg 输出的 time= 显示进度）"""
+        media_info = probe_media(video_path)
+        codec = media_info.audio_codec if media_info else None
+        plans = self._extraction_plans(video_path, workspace, codec)
+
+        # 使用 ffmpeg 提取音频（如果可用）
+        for ffmpeg_cmd in FFMPEG_COMMANDS:
+            for audio_file, codec_args in plans:
+                command = self._build_extract_command(ffmpeg_cmd, video_path, audio_file, codec_args)
+                self._announce_extraction(command, codec_args, codec)
+
+                try:
+                    result = run_process(
+                        command,
+                        timeout=1800,  # 30分钟超时
+                        progress_parser=ProgressParser('ffmpeg'),
+                        progress_handler=make_progress_handler(
+                            'extract', "正在提取音频", status_callback, progress_callback
+                        )
+                    )
+                except FileNotFoundError:
+                    # 该 ffmpeg 不存在，换下一个位置
+                    break
+                except subprocess.TimeoutExpired:
+                    continue
+
                 if result.returncode == 0 and os.path.exists(audio_file):
                     self.logger.info(f"成功提取音频: {audio_file}")
                     return audio_file
-                
-            except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError):
-                continue
-        
+
+                self.logger.warning(f"ffmpeg 提取音频失败（返回码 {result.returncode}），尝试下一种方式")
+
         # 如果 ffmpeg 不可用，尝试直接使用视频文件
         # Whisper 可能能够直接处理某些视频格式
         self.logger.warning("ffmpeg 不可用，尝试直接处理视频文件")
         return video_path
-    
+
+    async def _extract_audio_from_video_async(self, video_path, workspace, status_callback=None, progress_callback=None):
+        """_extract_audio_from_video 的 asyncio 版本"""
+        media_info = await probe_media_async(video_path)
+        codec = media_info.audio_codec if media_info else None
+        plans = self._extraction_plans(video_path, workspace, codec)
+
+        for ffmpeg_cmd in FFMPEG_COMMANDS:
+            for audio_file, codec_args in plans:
+                command = self._build_extract_command(ffmpeg_cmd, video_path, audio_file, codec_args)
+                self._announce_extraction(command, codec_args, codec)
+
+                try:
+                    result = await run_process_async(
+                        command,
+                        timeout=1800,  # 30分钟超时
+                        progress_parser=ProgressParser('ffmpeg'),
+                        progress_handler=make_progress_handler(
+                            'extract', "正在提取音频", status_callback, progress_callback
+                        )
+                    )
+                except FileNotFoundError:
+                    break
+                except subprocess.TimeoutExpired:
+                    continue
+
+                if result.returncode == 0 and os.path.exists(audio_file):
+                    self.logger.info(f"成功提取音频: {audio_file}")
+                    return audio_file
+
+                self.logger.warning(f"ffmpeg 提取音频失败（返回码 {result.returncode}），尝试下一种方式")
+
+        self.logger.warning("ffmpeg 不可用，尝试直接处理视频文件")
+        return video_path
+
     def get_supported_formats_display(self):
         """获取支持格式的显示字符串"""
         audio_formats = ', '.join(self.config.supported_audio_formats)
@@ -176,6 +484,9 @@ class LocalFileHandler:
         return f"音频: {audio_formats}\n视频: {video_formats}"
 
 
+register_handler(LocalFileHandler)
+
+
 # 便捷函数
 def process_local_file(file_path, status_callback=None):
     """
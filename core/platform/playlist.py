@@ -0,0 +1,69 @@
+"""
+播放列表展开
+
+通过 yt-dlp --flat-playlist 列出播放列表、频道或合集中的视频 ID。
+只读取列表本身，不获取每个视频的详细信息，几百个视频的播放列表也只需要一次请求。
+"""
+
+import re
+import subprocess
+from ..process import run_process
+from ..ratelimit import RetryableError
+
+
+def build_flat_playlist_command(yt_dlp_path, url, limit=0, extra_args=None):
+    """
+    构建列出播放列表视频 ID 的 yt-dlp 命令
+
+    Args:
+        yt_dlp_path (str): yt-dlp 路径
+        url (str): 播放列表、频道或合集链接
+        limit (int): 最多列出的视频数，0 表示不限制
+        extra_args (list): 代理、请求头等附加参数
+
+    Returns:
+        list: 命令参数列表
+    """
+    command = [yt_dlp_path, '--flat-playlist', '--print', 'id', '--no-warnings']
+    if limit:
+        command.extend(['--playlist-end', str(limit)])
+    command.extend(extra_args or [])
+    command.append(url)
+    return command
+
+
+def list_playlist_ids(scheduler, command, id_pattern, description="展开播放列表"):
+    """
+    执行 yt-dlp --flat-playlist，返回视频 ID 列表（经平台请求调度器限速和重试）
+
+    Args:
+        scheduler (RequestScheduler): 平台请求调度器
+        command (list): build_flat_playlist_command 构建的命令
+        id_pattern (str): 视频 ID 的正则表达式，不匹配的条目（例如频道的子页面）被忽略
+        description (str): 请求描述，用于提示信息
+
+    Returns:
+        list: 按列表顺序排列、去重后的视频 ID
+
+    Raises:
+        Exception: yt-dlp 执行失败
+    """
+    id_regex = re.compile(id_pattern)
+
+    def fetch(attempt):
+        ids = []
+        # 逐行收集输出，不受 run_process 只保留最后若干行的限制
+        try:
+            result = run_process(command, timeout=300, line_callback=ids.append)
+        except subprocess.TimeoutExpired:
+            raise RetryableError(f"{description}超时")
+        if result.returncode != 0:
+            raise Exception(f"{description}失败: {result.stderr or result.stdout}")
+        return ids
+
+    ids = []
+    for line in scheduler.call(fetch, description):
+        video_id = line.strip()
+        if id_regex.fullmatch(video_id) and video_id not in ids:
+            ids.append(video_id)
+    return ids
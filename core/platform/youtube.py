@@ -4,24 +4,60 @@ YouTube 平台处理器
 包含所有与 YouTube 相关的操作逻辑，如检查字幕、调用 yt-dlp 下载等。
 """
 
+import asyncio
+import contextvars
+import functools
 import os
 import subprocess
 import json
 import logging
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 from ..config import get_config
-from ..utils import parse_vtt, generate_output_filename, sanitize_filename
+from ..utils import (
+    parse_vtt, generate_output_filename, sanitize_filename, extract_video_id_from_url, extract_collection_from_url
+)
 from ..transcriber import WhisperTranscriber
+from ..cache import get_metadata_cache
+from ..cancel import JobCancelledError
+from ..process import ProgressParser, make_progress_handler, run_process, run_process_async
+from ..ratelimit import RetryableError, classify_error, get_scheduler
+from ..workspace import JobWorkspace
+from ..registry import register_handler
+from .playlist import build_flat_playlist_command, list_playlist_ids
+
+
+# 模拟浏览器访问的请求头参数
+BROWSER_ARGS = [
+    '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    '--referer', 'https://www.youtube.com/'
+]
+
+# 下载的音频文件可能的扩展名（原始音频流为 m4a 或 webm/opus，mp3 为转码后的格式）
+AUDIO_EXTENSIONS = ['.m4a', '.webm', '.opus', '.mp3', '.ogg', '.aac', '.mp4']
 
 
 class YouTubeHandler:
     """YouTube 平台处理器类"""
-    
+
+    PLATFORM = 'youtube'
+
+    # URL 模式（见 core/registry.py），视频链接排在播放列表前面，watch?v=...&list=... 按单个视频处理
+    URL_PATTERNS = [
+        ('video', r'youtube\.com/watch\?(?:\S*?&)?v=(?P<id>[\w-]{11})'),
+        ('video', r'youtu\.be/(?P<id>[\w-]{11})'),
+        ('video', r'youtube\.com/(?:embed|v|shorts|live)/(?P<id>[\w-]{11})'),
+        ('playlist', r'youtube\.com/playlist\?(?:\S*?&)?list=(?P<id>[\w-]+)'),
+        ('channel', r'youtube\.com/(?P<id>@[\w.%-]+|channel/UC[\w-]+|c/[\w.%-]+|user/[\w.%-]+)'),
+    ]
+
     def __init__(self):
         """初始化 YouTube 处理器"""
         self.config = get_config()
         self.logger = logging.getLogger(__name__)
         self.transcriber = WhisperTranscriber()
+        self.metadata_cache = get_metadata_cache()
+        self.scheduler = get_scheduler('youtube')
         self.debug_callback = None
 
     def set_debug_callback(self, callback):
@@ -35,37 +71,49 @@ class YouTubeHandler:
         if self.debug_callback:
             self.debug_callback(message)
     
-    def get_transcript(self, url, status_callback=None):
+    def get_transcript(self, url, status_callback=None, progress_callback=None):
         """
         获取 YouTube 视频的文稿
 
         Args:
             url (str): YouTube 视频 URL
             status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数，签名为 progress_callback(stage, fraction, eta)
 
         Returns:
             dict: 处理结果
         """
-        result = {
-            'success': False,
-            'transcript_file': None,
-            'error': None,
-            'video_title': None,
-            'method': None,  # 'subtitle' 或 'whisper'
-            'processing_time': None,
-            'audio_duration': None,
-            'speed_ratio': None
-        }
-        
+        prepared = self.prepare_transcript(url, status_callback, progress_callback)
+        return self.complete_transcript(prepared, status_callback, progress_callback)
+
+    def prepare_transcript(self, url, status_callback=None, progress_callback=None, workspace=None):
+        """
+        第一阶段：获取视频信息，有字幕时直接生成文稿，否则下载音频
+
+        Args:
+            url (str): YouTube 视频 URL
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            workspace (JobWorkspace): 任务工作目录，默认新建
+
+        Returns:
+            dict: 阶段结果，包含 result（处理结果）、audio_file（待转录音频，无需转录时为 None）
+                和 workspace（任务工作目录）
+        """
+        result = self._new_result()
+        audio_file = None
+        workspace = workspace or JobWorkspace()
+
         try:
             # 更新状态
             if status_callback:
                 status_callback("获取视频信息...")
-            
+
             # 获取视频信息
             video_info = self._get_video_info(url)
             result['video_title'] = video_info.get('title', 'Unknown')
-            
+            workspace.mark('metadata', video_title=result['video_title'])
+
             # 检查是否启用强制转录模式
             force_transcribe = self.config.getboolean('general', 'force_transcribe_mode', False)
 
@@ -76,24 +124,14 @@ class YouTubeHandler:
                     status_callback("强制转录模式：跳过字幕检测，直接使用AI转录...")
 
                 # 下载音频文件
-                audio_file = self._download_audio(url, video_info)
-
-                # 使用 Whisper 转录
-                if status_callback:
-                    status_callback("正在使用 AI 转录音频...")
-
-                transcribe_result = self._transcribe_audio(audio_file)
-                transcript_file = transcribe_result['transcript_file']
-                result['processing_time'] = transcribe_result['processing_time']
-                result['audio_duration'] = transcribe_result['audio_duration']
-                result['speed_ratio'] = transcribe_result['speed_ratio']
+                audio_file = self._download_audio(url, video_info, workspace, status_callback, progress_callback)
             else:
                 # 正常模式：先检查字幕
                 if status_callback:
                     status_callback("检查字幕可用性...")
 
-                # 检查是否有字幕
-                best_subtitle_lang = self._check_subtitles(url)
+                # 检查是否有字幕（优先使用视频信息中的字幕列表）
+                best_subtitle_lang = self._check_subtitles(url, video_info)
 
                 if best_subtitle_lang:
                     # 使用字幕方式
@@ -101,49 +139,241 @@ class YouTubeHandler:
                     if status_callback:
                         status_callback(f"发现字幕 ({best_subtitle_lang})，正在下载...")
 
-                    transcript_file = self._download_subtitles(url, video_info, best_subtitle_lang)
+                    result['transcript_file'] = self._download_subtitles(url, video_info, best_subtitle_lang, workspace)
+                    result['success'] = True
                 else:
                     # 使用 Whisper 转录方式
                     result['method'] = 'whisper'
                     if status_callback:
                         status_callback("未发现字幕，正在下载音频...")
 
-                    audio_file = self._download_audio(url, video_info)
+                    audio_file = self._download_audio(url, video_info, workspace, status_callback, progress_callback)
 
-                    if status_callback:
-                        status_callback("正在使用 AI 转录音频...")
+        except Exception as e:
+            result['error'] = str(e)
+            self.logger.error(f"YouTube 处理失败: {str(e)}")
 
-                    transcribe_result = self._transcribe_audio(audio_file)
-                    transcript_file = transcribe_result['transcript_file']
-                    result['processing_time'] = transcribe_result['processing_time']
-                    result['audio_duration'] = transcribe_result['audio_duration']
-                    result['speed_ratio'] = transcribe_result['speed_ratio']
+        # 没有待转录的音频时工作目录已经没有用处
+        if not audio_file:
+            workspace.cleanup()
 
-                    # 清理临时音频文件
-                    try:
-                        os.remove(audio_file)
-                    except:
-                        pass
+        return {'result': result, 'audio_file': audio_file, 'workspace': workspace}
 
-            # 清理临时音频文件（强制转录模式）
-            if force_transcribe:
-                try:
-                    os.remove(audio_file)
-                except:
-                    pass
-            
-            result['transcript_file'] = transcript_file
+    def complete_transcript(self, prepared, status_callback=None, progress_callback=None):
+        """
+        第二阶段：转录第一阶段下载的音频
+
+        Args:
+            prepared (dict): prepare_transcript 的返回值
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+
+        Returns:
+            dict: 处理结果
+        """
+        result = prepared['result']
+        audio_file = prepared.get('audio_file')
+
+        if not audio_file or result['error']:
+            return result
+
+        try:
+            # 使用 Whisper 转录
+            if status_callback:
+                status_callback("正在使用 AI 转录音频...")
+
+            workspace = prepared.get('workspace')
+            transcribe_result = self._transcribe_audio(audio_file, workspace, status_callback, progress_callback)
+            result['transcript_file'] = transcribe_result['transcript_file']
+            if workspace:
+                workspace.mark('transcribed', transcript_file=result['transcript_file'])
+            result['processing_time'] = transcribe_result['processing_time']
+            result['audio_duration'] = transcribe_result['audio_duration']
+            result['speed_ratio'] = transcribe_result['speed_ratio']
             result['success'] = True
-            
+
+            # 清理工作目录（含临时音频文件）
+            if workspace:
+                workspace.cleanup()
+
         except Exception as e:
             result['error'] = str(e)
             self.logger.error(f"YouTube 处理失败: {str(e)}")
-        
+
         return result
-    
+
+    async def get_transcript_async(self, url, status_callback=None, progress_callback=None, executor=None):
+        """
+        get_transcript 的 asyncio 版本
+
+        获取视频信息、检查和下载字幕、下载音频都以异步子进程在事件循环中执行，
+        重试等待使用 asyncio.sleep，不占用线程；Whisper 转录是 CPU/GPU 密集任务，放到线程池中执行。
+
+        Args:
+            url (str): YouTube 视频 URL
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
+            executor (Executor): 转录使用的线程池，默认为事件循环的默认线程池
+
+        Returns:
+            dict: 处理结果
+        """
+        prepared = await self.prepare_transcript_async(url, status_callback, progress_callback)
+        return await self.complete_transcript_async(prepared, status_callback, progress_callback, executor)
+
+    async def prepare_transcript_async(self, url, status_callback=None, progress_callback=None, workspace=None):
+        """
+        prepare_transcript 的 asyncio 版本，返回值相同
+
+        协程被取消时会终止正在运行的 yt-dlp 并清理工作目录。
+        """
+        result = self._new_result()
+        audio_file = None
+        workspace = workspace or JobWorkspace()
+
+        try:
+            if status_callback:
+                status_callback("获取视频信息...")
+
+            video_info = await self._get_video_info_async(url)
+            result['video_title'] = video_info.get('title', 'Unknown')
+            workspace.mark('metadata', video_title=result['video_title'])
+
+            if self.config.getboolean('general', 'force_transcribe_mode', False):
+                result['method'] = 'whisper'
+                if status_callback:
+                    status_callback("强制转录模式：跳过字幕检测，直接使用AI转录...")
+
+                audio_file = await self._download_audio_async(url, video_info, workspace, status_callback, progress_callback)
+            else:
+                if status_callback:
+                    status_callback("检查字幕可用性...")
+
+                best_subtitle_lang = await self._check_subtitles_async(url, video_info)
+
+                if best_subtitle_lang:
+                    result['method'] = 'subtitle'
+                    if status_callback:
+                        status_callback(f"发现字幕 ({best_subtitle_lang})，正在下载...")
+
+                    result['transcript_file'] = await self._download_subtitles_async(
+                        url, video_info, best_subtitle_lang, workspace
+                    )
+                    result['success'] = True
+                else:
+                    result['method'] = 'whisper'
+                    if status_callback:
+                        status_callback("未发现字幕，正在下载音频...")
+
+                    audio_file = await self._download_audio_async(url, video_info, workspace, status_callback, progress_callback)
+
+        except asyncio.CancelledError:
+            workspace.cleanup()
+            raise
+        except Exception as e:
+            result['error'] = str(e)
+            self.logger.error(f"YouTube 处理失败: {str(e)}")
+
+        if not audio_file:
+            workspace.cleanup()
+
+        return {'result': result, 'audio_file': audio_file, 'workspace': workspace}
+
+    async def complete_transcript_async(self, prepared, status_callback=None, progress_callback=None, executor=None):
+        """
+        complete_transcript 的 asyncio 版本，转录在 executor 线程池中执行
+
+        转录开始后取消协程不会中断 Whisper 进程，只是不再等待结果；
+        转录线程继承当前协程的取消令牌，取消令牌时 Whisper 进程随之终止。
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            executor, functools.partial(context.run, self.complete_transcript, prepared, status_callback, progress_callback)
+        )
+
+    def _new_result(self):
+        """创建空的处理结果"""
+        return {
+            'success': False,
+            'transcript_file': None,
+            'error': None,
+            'video_title': None,
+            'method': None,  # 'subtitle' 或 'whisper'
+            'processing_time': None,
+            'audio_duration': None,
+            'speed_ratio': None
+        }
+
+    def estimate_cost(self, url):
+        """
+        估计任务的转录成本（只读取视频信息缓存，不联网）
+
+        Args:
+            url (str): YouTube 视频链接
+
+        Returns:
+            float: 有可用字幕时为 0（不需要 Whisper），否则为视频时长（秒）；
+                没有缓存的视频信息或时长时返回 None
+        """
+        platform, video_id = extract_video_id_from_url(url)
+        video_info = self.metadata_cache.get('youtube', video_id) if platform == 'youtube' else None
+        if not video_info:
+            return None
+
+        force_transcribe = self.config.getboolean('general', 'force_transcribe_mode', False)
+        if not force_transcribe and self._get_subtitle_languages_from_info(video_info):
+            return 0.0
+        return float(video_info.get('duration') or 0) or None
+
+    def expand_url(self, url):
+        """
+        把播放列表或频道链接展开为视频链接（yt-dlp --flat-playlist，只需一次请求）
+
+        Args:
+            url (str): YouTube 链接
+
+        Returns:
+            list: 视频链接列表，单个视频的链接原样返回
+
+        Raises:
+            Exception: yt-dlp 执行失败
+        """
+        platform, kind = extract_collection_from_url(url)
+        if platform != 'youtube':
+            return [url]
+
+        if kind == 'channel':
+            url = self._channel_videos_url(url)
+
+        extra_args = list(BROWSER_ARGS)
+        if self.config.proxy:
+            extra_args.extend(['--proxy', self.config.proxy])
+        command = build_flat_playlist_command(
+            self.config.yt_dlp_path, url, self.config.playlist_max_entries, extra_args
+        )
+
+        print(f"\n🔍 执行 yt-dlp 展开播放列表:")
+        print(f"📋 {' '.join(command)}")
+        self._debug_log(f"🔍 展开播放列表: {url}")
+
+        video_ids = list_playlist_ids(self.scheduler, command, r'[\w-]{11}', "展开播放列表")
+        return [f"https://www.youtube.com/watch?v={video_id}" for video_id in video_ids]
+
+    def _channel_videos_url(self, url):
+        """频道首页链接改为"视频"标签页，否则 yt-dlp 列出的是各个标签页而不是视频"""
+        parts = urlsplit(url)
+        segments = [segment for segment in parts.path.split('/') if segment]
+        base_length = 1 if segments and segments[0].startswith('@') else 2
+        if len(segments) > base_length:
+            return url
+
+        path = '/' + '/'.join(segments + ['videos'])
+        return urlunsplit((parts.scheme, parts.netloc, path, parts.query, ''))
+
     def _get_video_info(self, url):
         """
-        获取视频信息
+        获取视频信息（优先读取本地缓存）
 
         Args:
             url (str): 视频 URL
@@ -151,239 +381,261 @@ class YouTubeHandler:
         Returns:
             dict: 视频信息
         """
-        # 重试机制：最多重试3次
-        max_retries = 3
-        retry_delay = [2, 5, 10]  # 递增延迟时间
+        cache_key, cached_info = self._get_cached_video_info(url)
+        if cached_info:
+            return cached_info
 
-        for attempt in range(max_retries):
-            try:
-                command = [
-                    self.config.yt_dlp_path,
-                    '--dump-json',
-                    '--no-download',
-                    url
-                ]
-
-                # 添加代理设置（在重试时可能尝试不使用代理）
-                if self.config.proxy and attempt < 2:  # 前两次尝试使用代理
-                    command.extend(['--proxy', self.config.proxy])
-                elif attempt >= 2:  # 第三次尝试不使用代理
-                    print("🔄 尝试不使用代理...")
-
-                # 添加额外的反检测参数
-                command.extend([
-                    '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    '--referer', 'https://www.youtube.com/',
-                    '--sleep-interval', '1',
-                    '--max-sleep-interval', '3',
-                    '--no-check-certificate'
-                ])
-
-                # 打印完整命令供用户复制测试
-                command_str = ' '.join(command)
-                if attempt == 0:  # 只在第一次尝试时打印
-                    print(f"\n🔍 执行 yt-dlp 获取视频信息:")
-                    print(f"📋 {command_str}")
-                    print()
-
-                    # 发送到调试窗口
-                    self._debug_log(f"🔍 执行 yt-dlp 获取视频信息:")
-                    self._debug_log(f"📋 {command_str}")
-                elif attempt > 0:
-                    retry_msg = f"🔄 重试第 {attempt + 1} 次..."
-                    print(retry_msg)
-                    self._debug_log(retry_msg)
-
-                result = subprocess.run(
-                    command,
-                    capture_output=True,
-                    text=False,  # 使用字节模式避免编码问题
-                    timeout=120  # 增加超时时间
-                )
+        video_info = self._fetch_video_info(url)
+        self.metadata_cache.set('youtube', cache_key, self._compact_video_info(video_info))
+        return video_info
 
-                if result.returncode != 0:
-                    # 尝试解码错误信息
-                    error_msg = "获取视频信息失败"
-                    try:
-                        error_msg = result.stderr.decode('utf-8', errors='ignore')
-                    except:
-                        try:
-                            error_msg = result.stderr.decode('gbk', errors='ignore')
-                        except:
-                            pass
-
-                    # 检查是否是可重试的错误
-                    if self._is_retryable_error(error_msg) and attempt < max_retries - 1:
-                        print(f"⚠️ 遇到可重试错误，{retry_delay[attempt]}秒后重试: {error_msg.strip()}")
-                        import time
-                        time.sleep(retry_delay[attempt])
-                        continue
-                    else:
-                        raise Exception(f"获取视频信息失败: {error_msg}")
-
-                # 尝试不同编码解码输出
-                json_text = None
-                for encoding in ['utf-8', 'gbk', 'cp936']:
-                    try:
-                        json_text = result.stdout.decode(encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-
-                if not json_text:
-                    raise Exception("无法解码视频信息")
-
-                return json.loads(json_text)
+    def _get_cached_video_info(self, url):
+        """
+        读取缓存的视频信息
 
-            except subprocess.TimeoutExpired:
-                if attempt < max_retries - 1:
-                    print(f"⚠️ 请求超时，{retry_delay[attempt]}秒后重试...")
-                    import time
-                    time.sleep(retry_delay[attempt])
-                    continue
-                else:
-                    raise Exception("获取视频信息超时")
-            except json.JSONDecodeError:
-                if attempt < max_retries - 1:
-                    print(f"⚠️ JSON解析失败，{retry_delay[attempt]}秒后重试...")
-                    import time
-                    time.sleep(retry_delay[attempt])
-                    continue
-                else:
-                    raise Exception("解析视频信息失败")
-            except Exception as e:
-                if self._is_retryable_error(str(e)) and attempt < max_retries - 1:
-                    print(f"⚠️ 遇到错误，{retry_delay[attempt]}秒后重试: {str(e)}")
-                    import time
-                    time.sleep(retry_delay[attempt])
-                    continue
-                else:
-                    raise e
+        Args:
+            url (str): 视频 URL
+
+        Returns:
+            tuple: (缓存键, 视频信息)，未命中时视频信息为 None
+        """
+        platform, video_id = extract_video_id_from_url(url)
+        cache_key = video_id if platform == 'youtube' else None
+
+        cached_info = self.metadata_cache.get('youtube', cache_key)
+        if cached_info:
+            print(f"📦 使用缓存的视频信息: {cached_info.get('title', video_id)}")
+            self._debug_log(f"📦 使用缓存的视频信息: {video_id}")
+
+        return cache_key, cached_info
+
+    def _compact_video_info(self, video_info):
+        """
+        精简视频信息用于缓存
+
+        去掉体积很大且用不到的格式列表和缩略图，字幕字段只保留语言和格式扩展名。
+
+        Args:
+            video_info (dict): yt-dlp --dump-json 的输出
+
+        Returns:
+            dict: 精简后的视频信息
+        """
+        dropped_keys = {'formats', 'requested_formats', 'thumbnails', 'heatmap', 'http_headers'}
+        compact_info = {k: v for k, v in video_info.items() if k not in dropped_keys}
+
+        for key in ('subtitles', 'automatic_captions'):
+            if key in video_info:
+                compact_info[key] = {
+                    lang_code: [{'ext': fmt.get('ext')} for fmt in (formats or []) if isinstance(fmt, dict)]
+                    for lang_code, formats in (video_info.get(key) or {}).items()
+                }
 
-        # 如果所有重试都失败了
-        raise Exception("获取视频信息失败：已达到最大重试次数")
+        return compact_info
 
-    def _is_retryable_error(self, error_msg):
+    def _build_info_command(self, url, use_proxy=True):
         """
-        判断错误是否可重试
+        构建获取视频信息的 yt-dlp 命令
 
         Args:
-            error_msg (str): 错误信息
+            url (str): 视频 URL
+            use_proxy (bool): 是否使用配置的代理
 
         Returns:
-            bool: 是否可重试
-        """
-        retryable_errors = [
-            "HTTP Error 403: Forbidden",
-            "fragment 1 not found",
-            "EOF occurred in violation of protocol",
-            "Connection reset by peer",
-            "Temporary failure in name resolution",
-            "timeout",
-            "Network is unreachable"
+            list: 命令参数列表
+        """
+        command = [
+            self.config.yt_dlp_path,
+            '--dump-json',
+            '--no-download',
+            url
         ]
 
-        error_msg_lower = error_msg.lower()
-        return any(retryable_error.lower() in error_msg_lower for retryable_error in retryable_errors)
+        if self.config.proxy and use_proxy:
+            command.extend(['--proxy', self.config.proxy])
+
+        # 添加额外的反检测参数
+        command.extend(BROWSER_ARGS)
+        command.extend([
+            '--sleep-interval', '1',
+            '--max-sleep-interval', '3',
+            '--no-check-certificate'
+        ])
+        return command
+
+    def _fetch_video_info(self, url):
+        """
+        通过 yt-dlp --dump-json 获取视频信息（经平台请求调度器限速和重试）
+
+        Args:
+            url (str): 视频 URL
+
+        Returns:
+            dict: 视频信息
+        """
+        def fetch(attempt):
+            # 第三次及之后的尝试不使用代理
+            command = self._build_info_command(url, use_proxy=attempt < 2)
+            self._announce_info_attempt(command, attempt)
+            try:
+                result = run_process(command, timeout=120)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("获取视频信息超时")
+            return self._parse_info_result(result)
+
+        return self.scheduler.call(fetch, "获取视频信息")
+
+    def _announce_info_attempt(self, command, attempt):
+        """打印获取视频信息的命令（第一次尝试）或重试提示"""
+        if attempt >= 2 and self.config.proxy:
+            print("🔄 尝试不使用代理...")
+
+        if attempt == 0:
+            # 打印完整命令供用户复制测试
+            command_str = ' '.join(command)
+            print(f"\n🔍 执行 yt-dlp 获取视频信息:")
+            print(f"📋 {command_str}")
+            print()
+
+            # 发送到调试窗口
+            self._debug_log(f"🔍 执行 yt-dlp 获取视频信息:")
+            self._debug_log(f"📋 {command_str}")
+        else:
+            retry_msg = f"🔄 重试第 {attempt} 次..."
+            print(retry_msg)
+            self._debug_log(retry_msg)
+
+    def _parse_info_result(self, result):
+        """
+        解析 yt-dlp --dump-json 的执行结果
+
+        Args:
+            result (ProcessResult): 执行结果
+
+        Returns:
+            dict: 视频信息
+
+        Raises:
+            RetryableError: 输出为空或不是完整的 JSON
+            Exception: yt-dlp 执行失败（是否重试由调度器根据错误信息判断）
+        """
+        if result.returncode != 0:
+            raise Exception(f"获取视频信息失败: {result.stderr or '获取视频信息失败'}")
+
+        if not result.stdout:
+            raise RetryableError("无法解码视频信息")
+
+        try:
+            return json.loads(result.stdout)
+        except json.JSONDecodeError:
+            raise RetryableError("解析视频信息失败")
     
-    def _check_subtitles(self, url):
+    def _check_subtitles(self, url, video_info=None):
         """
         检查视频是否有字幕，并返回最佳字幕语言
 
+        --dump-json 的输出已包含 subtitles 和 automatic_captions 字段，
+        有这些字段时直接从中选择，不再额外调用 yt-dlp --list-subs。
+
         Args:
             url (str): 视频 URL
+            video_info (dict): _get_video_info 返回的视频信息
 
         Returns:
             str or None: 最佳字幕语言代码，如果没有字幕则返回 None
         """
-        # 重试机制：最多重试2次（字幕检查不需要太多重试）
-        max_retries = 2
-        retry_delay = [2, 5]
+        if video_info and ('subtitles' in video_info or 'automatic_captions' in video_info):
+            available_subs = self._get_subtitle_languages_from_info(video_info)
+            if not available_subs:
+                return None
+            return self._select_best_subtitle(available_subs)
 
-        for attempt in range(max_retries):
-            try:
-                command = [
-                    self.config.yt_dlp_path,
-                    '--list-subs',
-                    url
-                ]
-
-                # 添加代理设置
-                if self.config.proxy:
-                    command.extend(['--proxy', self.config.proxy])
-
-                # 添加额外的反检测参数
-                command.extend([
-                    '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    '--referer', 'https://www.youtube.com/'
-                ])
-
-                result = subprocess.run(
-                    command,
-                    capture_output=True,
-                    text=False,  # 使用字节模式避免编码问题
-                    timeout=60  # 增加超时时间
-                )
+        # 视频信息中没有字幕字段时，回退到 --list-subs 文本解析
+        return self._list_subtitles(url)
 
-                if result.returncode != 0:
-                    if attempt < max_retries - 1:
-                        print(f"⚠️ 获取字幕列表失败，{retry_delay[attempt]}秒后重试...")
-                        import time
-                        time.sleep(retry_delay[attempt])
-                        continue
-                    else:
-                        self.logger.warning("获取字幕列表失败")
-                        return None
-
-                # 尝试不同的编码解码输出
-                output_text = None
-                for encoding in ['utf-8', 'gbk', 'cp936', 'latin1']:
-                    try:
-                        output_text = result.stdout.decode(encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-
-                if not output_text:
-                    if attempt < max_retries - 1:
-                        print(f"⚠️ 无法解码字幕列表输出，{retry_delay[attempt]}秒后重试...")
-                        import time
-                        time.sleep(retry_delay[attempt])
-                        continue
-                    else:
-                        self.logger.warning("无法解码字幕列表输出")
-                        return None
-
-                # 解析可用的字幕语言
-                available_subs = self._parse_subtitle_languages(output_text)
-
-                if not available_subs:
-                    return None
-
-                # 按优先级选择字幕
-                return self._select_best_subtitle(available_subs)
+    def _get_subtitle_languages_from_info(self, video_info):
+        """
+        从视频信息中提取可用的字幕语言代码
 
-            except subprocess.TimeoutExpired:
-                if attempt < max_retries - 1:
-                    print(f"⚠️ 检查字幕超时，{retry_delay[attempt]}秒后重试...")
-                    import time
-                    time.sleep(retry_delay[attempt])
-                    continue
-                else:
-                    self.logger.warning("检查字幕超时，假设无字幕")
-                    return None
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    print(f"⚠️ 检查字幕失败，{retry_delay[attempt]}秒后重试: {str(e)}")
-                    import time
-                    time.sleep(retry_delay[attempt])
+        Args:
+            video_info (dict): yt-dlp --dump-json 的输出
+
+        Returns:
+            list: 可用的字幕语言代码列表，手动字幕在前，自动字幕在后
+        """
+        available_subs = []
+
+        for key in ('subtitles', 'automatic_captions'):
+            for lang_code, formats in (video_info.get(key) or {}).items():
+                # live_chat 是直播聊天记录，不是字幕
+                if lang_code == 'live_chat' or not formats:
                     continue
-                else:
-                    self.logger.warning(f"检查字幕失败: {str(e)}，假设无字幕")
-                    return None
+                if lang_code not in available_subs:
+                    available_subs.append(lang_code)
+
+        self.logger.info(f"发现可用字幕: {available_subs}")
+        return available_subs
+
+    def _build_list_subs_command(self, url):
+        """构建列出字幕的 yt-dlp 命令"""
+        command = [
+            self.config.yt_dlp_path,
+            '--list-subs',
+            url
+        ]
+
+        # 添加代理设置
+        if self.config.proxy:
+            command.extend(['--proxy', self.config.proxy])
+
+        # 添加额外的反检测参数
+        command.extend(BROWSER_ARGS)
+        return command
+
+    def _list_subtitles(self, url):
+        """
+        通过 yt-dlp --list-subs 检查字幕（视频信息中缺少字幕字段时的回退方案）
+
+        Args:
+            url (str): 视频 URL
+
+        Returns:
+            str or None: 最佳字幕语言代码，如果没有字幕则返回 None
+        """
+        def list_subs(attempt):
+            try:
+                # 自动字幕的语言列表可能有上百行
+                result = run_process(self._build_list_subs_command(url), timeout=60, tail_lines=2000)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("检查字幕超时")
+            return self._parse_list_subs_result(result)
+
+        # 字幕检查不需要太多重试，失败时假设无字幕
+        try:
+            return self.scheduler.call(list_subs, "获取字幕列表", max_retries=min(1, self.scheduler.max_retries))
+        except JobCancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"{e}，假设无字幕")
+            return None
 
-        # 如果所有重试都失败了，假设无字幕
-        return None
+    def _parse_list_subs_result(self, result):
+        """
+        解析 yt-dlp --list-subs 的执行结果
+
+        Returns:
+            str or None: 最佳字幕语言代码
+
+        Raises:
+            RetryableError: yt-dlp 执行失败
+        """
+        if result.returncode != 0:
+            message = f"获取字幕列表失败: {result.stderr}" if result.stderr else "获取字幕列表失败"
+            raise RetryableError(message, throttled=classify_error(message) == 'throttled')
+
+        # 解析可用的字幕语言并按优先级选择
+        available_subs = self._parse_subtitle_languages(result.stdout)
+        return self._select_best_subtitle(available_subs) if available_subs else None
 
     def _parse_subtitle_languages(self, output_text):
         """
@@ -471,7 +723,7 @@ class YouTubeHandler:
         self.logger.info(f"选择字幕语言: {best_sub} (优先级: {best_priority})")
         return best_sub
     
-    def _download_subtitles(self, url, video_info, subtitle_lang):
+    def _download_subtitles(self, url, video_info, subtitle_lang, workspace):
         """
         下载字幕文件
 
@@ -479,6 +731,7 @@ class YouTubeHandler:
             url (str): 视频 URL
             video_info (dict): 视频信息
             subtitle_lang (str): 字幕语言代码
+            workspace (JobWorkspace): 任务工作目录
 
         Returns:
             str: 文稿文件路径
@@ -486,9 +739,40 @@ class YouTubeHandler:
         # 生成输出文件名
         filename = generate_output_filename(video_info.get('title', 'video'), 'youtube')
         
-        # 设置输出路径
-        output_template = os.path.join(self.config.temp_dir, f"{filename}.%(ext)s")
-        
+        command = self._build_subtitle_command(url, subtitle_lang, filename, workspace)
+
+        # 打印完整命令供用户复制测试
+        print(f"\n🔍 执行 yt-dlp 下载字幕:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+        def download(attempt):
+            try:
+                result = run_process(command, timeout=300)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("下载字幕超时")
+
+            if result.returncode != 0:
+                raise Exception(f"下载字幕失败: {result.stderr or '下载字幕失败'}")
+
+        self.scheduler.call(download, "下载字幕")
+        return self._save_subtitle_transcript(workspace, filename, subtitle_lang)
+    
+    def _build_subtitle_command(self, url, subtitle_lang, filename, workspace):
+        """
+        构建下载字幕的 yt-dlp 命令（输出到任务独占的字幕目录）
+
+        Args:
+            url (str): 视频 URL
+            subtitle_lang (str): 字幕语言代码
+            filename (str): 输出文件名（不含扩展名）
+            workspace (JobWorkspace): 任务工作目录
+
+        Returns:
+            list: 命令参数列表
+        """
+        output_template = os.path.join(workspace.subdir('subtitles'), f"{filename}.%(ext)s")
+
         command = [
             self.config.yt_dlp_path,
             '--write-subs',
@@ -499,68 +783,96 @@ class YouTubeHandler:
             '--output', output_template,
             url
         ]
-        
+
         # 添加代理设置
         if self.config.proxy:
             command.extend(['--proxy', self.config.proxy])
-        
+
+        return command
+
+    def _save_subtitle_transcript(self, workspace, filename, subtitle_lang):
+        """
+        把下载的 VTT 字幕转换为文稿
+
+        Args:
+            workspace (JobWorkspace): 任务工作目录
+            filename (str): 输出文件名（不含扩展名）
+            subtitle_lang (str): 字幕语言代码
+
+        Returns:
+            str: 文稿文件路径
+        """
+        # 查找下载的 VTT 文件（yt-dlp 输出为 <文件名>.<语言>.vtt）
+        vtt_file = workspace.find_file('subtitles', ['.vtt'], f"{filename}.{subtitle_lang}")
+
+        if not vtt_file:
+            raise Exception("未找到下载的字幕文件")
+
+        # 解析 VTT 文件为纯文本
+        transcript_text = parse_vtt(vtt_file)
+
+        # 保存为文本文件
+        transcript_file = os.path.join(self.config.output_dir, f"{filename}.txt")
+        with open(transcript_file, 'w', encoding='utf-8') as f:
+            f.write(transcript_text)
+
+        # 清理临时 VTT 文件
         try:
-            # 打印完整命令供用户复制测试
-            print(f"\n🔍 执行 yt-dlp 下载字幕:")
-            print(f"📋 {' '.join(command)}")
-            print()
+            os.remove(vtt_file)
+        except:
+            pass
 
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=False,  # 使用字节模式避免编码问题
-                timeout=300
-            )
+        return transcript_file
 
-            if result.returncode != 0:
-                # 尝试解码错误信息
-                error_msg = "下载字幕失败"
-                try:
-                    error_msg = result.stderr.decode('utf-8', errors='ignore')
-                except:
-                    try:
-                        error_msg = result.stderr.decode('gbk', errors='ignore')
-                    except:
-                        pass
-                raise Exception(f"下载字幕失败: {error_msg}")
-
-            # 查找下载的 VTT 文件
-            vtt_file = self._find_vtt_file(self.config.temp_dir, filename)
-
-            if not vtt_file:
-                raise Exception("未找到下载的字幕文件")
-
-            # 解析 VTT 文件为纯文本
-            transcript_text = parse_vtt(vtt_file)
-
-            # 保存为文本文件
-            transcript_file = os.path.join(self.config.output_dir, f"{filename}.txt")
-            with open(transcript_file, 'w', encoding='utf-8') as f:
-                f.write(transcript_text)
-
-            # 清理临时 VTT 文件
-            try:
-                os.remove(vtt_file)
-            except:
-                pass
+    def _build_audio_command(self, url, output_template, use_proxy=True):
+        """
+        构建下载音频的 yt-dlp 命令
 
-            return transcript_file
+        Args:
+            url (str): 视频 URL
+            output_template (str): yt-dlp 输出模板
+            use_proxy (bool): 是否使用配置的代理
 
-        except subprocess.TimeoutExpired:
-            raise Exception("下载字幕超时")
-    
-    def _download_audio(self, url, video_info):
+        Returns:
+            list: 命令参数列表
+        """
+        command = [self.config.yt_dlp_path]
+
+        # 默认直接保存平台的原始音频流（m4a/opus），不再转码为 mp3，Whisper 解码时统一重采样
+        if self.config.download_audio_format == 'mp3':
+            command.extend(['--extract-audio', '--audio-format', 'mp3', '--audio-quality', '192K'])
+
+        command.extend([
+            '--format', 'bestaudio/best',  # 优先选择最佳音频格式
+            '--no-video',  # 不下载视频
+            '--newline',  # 每次进度更新单独输出一行，便于解析
+            '--output', output_template,
+            url
+        ])
+
+        if self.config.proxy and use_proxy:
+            command.extend(['--proxy', self.config.proxy])
+
+        # 添加额外的反检测参数
+        command.extend(BROWSER_ARGS)
+        command.extend([
+            '--sleep-interval', '1',
+            '--max-sleep-interval', '3',
+            '--retries', '3',
+            '--no-check-certificate'
+        ])
+        return command
+
+    def _download_audio(self, url, video_info, workspace, status_callback=None, progress_callback=None):
         """
         下载音频文件
 
         Args:
             url (str): 视频 URL
             video_info (dict): 视频信息
+            workspace (JobWorkspace): 任务工作目录
+            status_callback (callable): 状态回调函数，用于显示下载百分比
+            progress_callback (callable): 进度回调函数
 
         Returns:
             str: 音频文件路径
@@ -568,117 +880,176 @@ class YouTubeHandler:
         # 生成输出文件名
         filename = generate_output_filename(video_info.get('title', 'video'), 'youtube')
 
-        # 设置输出路径
-        output_template = os.path.join(self.config.temp_dir, f"{filename}.%(ext)s")
+        # 设置输出路径（任务独占的音频目录）
+        audio_dir = workspace.subdir('audio')
+        output_template = os.path.join(audio_dir, f"{filename}.%(ext)s")
 
-        # 重试机制：最多重试3次
-        max_retries = 3
-        retry_delay = [5, 10, 20]  # 递增延迟时间
+        def download(attempt):
+            # 第三次及之后的尝试不使用代理
+            command = self._build_audio_command(url, output_template, use_proxy=attempt < 2)
+            self._announce_audio_attempt(command, attempt)
 
-        for attempt in range(max_retries):
             try:
-                command = [
-                    self.config.yt_dlp_path,
-                    '--extract-audio',
-                    '--audio-format', 'mp3',
-                    '--audio-quality', '192K',
-                    '--format', 'bestaudio/best',  # 优先选择最佳音频格式
-                    '--no-video',  # 不下载视频
-                    '--output', output_template,
-                    url
-                ]
-
-                # 添加代理设置（在重试时可能尝试不使用代理）
-                if self.config.proxy and attempt < 2:  # 前两次尝试使用代理
-                    command.extend(['--proxy', self.config.proxy])
-                elif attempt >= 2:  # 第三次尝试不使用代理
-                    print("🔄 尝试不使用代理...")
-
-                # 添加额外的反检测参数
-                command.extend([
-                    '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    '--referer', 'https://www.youtube.com/',
-                    '--sleep-interval', '1',
-                    '--max-sleep-interval', '3',
-                    '--retries', '3',
-                    '--no-check-certificate'
-                ])
-
-                # 打印完整命令供用户复制测试
-                if attempt == 0:  # 只在第一次尝试时打印
-                    print(f"\n🔍 执行 yt-dlp 下载音频:")
-                    print(f"📋 {' '.join(command)}")
-                    print()
-                elif attempt > 0:
-                    print(f"🔄 重试第 {attempt + 1} 次下载音频...")
-
-                result = subprocess.run(
+                result = run_process(
                     command,
-                    capture_output=True,
-                    text=False,  # 使用字节模式避免编码问题
-                    timeout=1800  # 30分钟超时
+                    timeout=1800,  # 30分钟超时
+                    progress_parser=ProgressParser('download'),
+                    progress_handler=make_progress_handler(
+                        'download', "正在下载音频", status_callback, progress_callback
+                    )
                 )
+            except subprocess.TimeoutExpired:
+                raise RetryableError("下载音频超时")
 
-                if result.returncode != 0:
-                    # 尝试解码错误信息
-                    error_msg = "下载音频失败"
-                    try:
-                        error_msg = result.stderr.decode('utf-8', errors='ignore')
-                    except:
-                        try:
-                            error_msg = result.stderr.decode('gbk', errors='ignore')
-                        except:
-                            pass
-
-                    # 检查是否是可重试的错误
-                    if self._is_retryable_error(error_msg) and attempt < max_retries - 1:
-                        print(f"⚠️ 遇到可重试错误，{retry_delay[attempt]}秒后重试: {error_msg.strip()}")
-                        import time
-                        time.sleep(retry_delay[attempt])
-                        continue
-                    else:
-                        raise Exception(f"下载音频失败: {error_msg}")
-
-                # 查找下载的音频文件
-                audio_file = os.path.join(self.config.temp_dir, f"{filename}.mp3")
-
-                if not os.path.exists(audio_file):
-                    if attempt < max_retries - 1:
-                        print(f"⚠️ 未找到下载的音频文件，{retry_delay[attempt]}秒后重试...")
-                        import time
-                        time.sleep(retry_delay[attempt])
-                        continue
-                    else:
-                        raise Exception("未找到下载的音频文件")
-
-                return audio_file
+            return self._check_audio_result(result, workspace, filename)
 
-            except subprocess.TimeoutExpired:
-                if attempt < max_retries - 1:
-                    print(f"⚠️ 下载超时，{retry_delay[attempt]}秒后重试...")
-                    import time
-                    time.sleep(retry_delay[attempt])
-                    continue
-                else:
-                    raise Exception("下载音频超时")
-            except Exception as e:
-                if self._is_retryable_error(str(e)) and attempt < max_retries - 1:
-                    print(f"⚠️ 遇到错误，{retry_delay[attempt]}秒后重试: {str(e)}")
-                    import time
-                    time.sleep(retry_delay[attempt])
-                    continue
-                else:
-                    raise e
+        return self.scheduler.call(download, "下载音频")
+
+    def _announce_audio_attempt(self, command, attempt):
+        """打印下载音频的命令（第一次尝试）或重试提示"""
+        if attempt >= 2 and self.config.proxy:
+            print("🔄 尝试不使用代理...")
+
+        if attempt == 0:
+            # 打印完整命令供用户复制测试
+            print(f"\n🔍 执行 yt-dlp 下载音频:")
+            print(f"📋 {' '.join(command)}")
+            print()
+        else:
+            print(f"🔄 重试第 {attempt} 次下载音频...")
 
-        # 如果所有重试都失败了
-        raise Exception("下载音频失败：已达到最大重试次数")
+    def _check_audio_result(self, result, workspace, filename):
+        """
+        检查 yt-dlp 下载音频的执行结果
+
+        Args:
+            result (ProcessResult): 执行结果
+            workspace (JobWorkspace): 任务工作目录
+            filename (str): 输出文件名（不含扩展名）
+
+        Returns:
+            str: 音频文件路径
+
+        Raises:
+            RetryableError: 下载结束但没有找到音频文件
+            Exception: yt-dlp 执行失败（是否重试由调度器根据错误信息判断）
+        """
+        if result.returncode != 0:
+            raise Exception(f"下载音频失败: {result.stderr or '下载音频失败'}")
+
+        # 扩展名取决于平台提供的音频流
+        audio_file = workspace.find_file('audio', AUDIO_EXTENSIONS, filename)
+        if not audio_file:
+            raise RetryableError("未找到下载的音频文件")
+
+        return audio_file
     
-    def _transcribe_audio(self, audio_file):
+    async def _get_video_info_async(self, url):
+        """_get_video_info 的 asyncio 版本"""
+        cache_key, cached_info = self._get_cached_video_info(url)
+        if cached_info:
+            return cached_info
+
+        video_info = await self._fetch_video_info_async(url)
+        self.metadata_cache.set('youtube', cache_key, self._compact_video_info(video_info))
+        return video_info
+
+    async def _fetch_video_info_async(self, url):
+        """_fetch_video_info 的 asyncio 版本"""
+        async def fetch(attempt):
+            command = self._build_info_command(url, use_proxy=attempt < 2)
+            self._announce_info_attempt(command, attempt)
+            try:
+                result = await run_process_async(command, timeout=120)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("获取视频信息超时")
+            return self._parse_info_result(result)
+
+        return await self.scheduler.call_async(fetch, "获取视频信息")
+
+    async def _check_subtitles_async(self, url, video_info=None):
+        """_check_subtitles 的 asyncio 版本"""
+        if video_info and ('subtitles' in video_info or 'automatic_captions' in video_info):
+            return self._check_subtitles(url, video_info)
+
+        return await self._list_subtitles_async(url)
+
+    async def _list_subtitles_async(self, url):
+        """_list_subtitles 的 asyncio 版本"""
+        async def list_subs(attempt):
+            try:
+                # 自动字幕的语言列表可能有上百行
+                result = await run_process_async(self._build_list_subs_command(url), timeout=60, tail_lines=2000)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("检查字幕超时")
+            return self._parse_list_subs_result(result)
+
+        try:
+            return await self.scheduler.call_async(
+                list_subs, "获取字幕列表", max_retries=min(1, self.scheduler.max_retries)
+            )
+        except JobCancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"{e}，假设无字幕")
+            return None
+
+    async def _download_subtitles_async(self, url, video_info, subtitle_lang, workspace):
+        """_download_subtitles 的 asyncio 版本"""
+        filename = generate_output_filename(video_info.get('title', 'video'), 'youtube')
+        command = self._build_subtitle_command(url, subtitle_lang, filename, workspace)
+
+        print(f"\n🔍 执行 yt-dlp 下载字幕:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+        async def download(attempt):
+            try:
+                result = await run_process_async(command, timeout=300)
+            except subprocess.TimeoutExpired:
+                raise RetryableError("下载字幕超时")
+
+            if result.returncode != 0:
+                raise Exception(f"下载字幕失败: {result.stderr or '下载字幕失败'}")
+
+        await self.scheduler.call_async(download, "下载字幕")
+        return self._save_subtitle_transcript(workspace, filename, subtitle_lang)
+
+    async def _download_audio_async(self, url, video_info, workspace, status_callback=None, progress_callback=None):
+        """_download_audio 的 asyncio 版本"""
+        filename = generate_output_filename(video_info.get('title', 'video'), 'youtube')
+        audio_dir = workspace.subdir('audio')
+        output_template = os.path.join(audio_dir, f"{filename}.%(ext)s")
+
+        async def download(attempt):
+            command = self._build_audio_command(url, output_template, use_proxy=attempt < 2)
+            self._announce_audio_attempt(command, attempt)
+
+            try:
+                result = await run_process_async(
+                    command,
+                    timeout=1800,  # 30分钟超时
+                    progress_parser=ProgressParser('download'),
+                    progress_handler=make_progress_handler(
+                        'download', "正在下载音频", status_callback, progress_callback
+                    )
+                )
+            except subprocess.TimeoutExpired:
+                raise RetryableError("下载音频超时")
+
+            return self._check_audio_result(result, workspace, filename)
+
+        return await self.scheduler.call_async(download, "下载音频")
+
+    def _transcribe_audio(self, audio_file, workspace=None, status_callback=None, progress_callback=None):
         """
         转录音频文件
 
         Args:
             audio_file (str): 音频文件路径
+            workspace (JobWorkspace): 任务工作目录
+            status_callback (callable): 状态回调函数
+            progress_callback (callable): 进度回调函数
 
         Returns:
             dict: 包含transcript_file, processing_time, audio_duration, speed_ratio的字典
@@ -695,35 +1066,15 @@ class YouTubeHandler:
         self.logger.info(f"音频文件大小: {file_size} 字节")
 
         try:
-            result = self.transcriber.run_whisper(audio_file, self.config.output_dir)
+            result = self.transcriber.run_whisper(
+                audio_file, self.config.output_dir, status_callback, progress_callback, workspace
+            )
             self.logger.info(f"转录完成，生成文件: {result['transcript_file']}")
             self.logger.info(f"处理时间: {result['processing_time']:.2f}秒, 加速倍率: {result['speed_ratio']:.2f}x")
             return result
         except Exception as e:
             self.logger.error(f"转录失败: {str(e)}")
             raise
-    
-    def _find_vtt_file(self, directory, base_filename):
-        """
-        查找 VTT 字幕文件
-        
-        Args:
-            directory (str): 搜索目录
-            base_filename (str): 基础文件名
-            
-        Returns:
-            str: VTT 文件路径，如果未找到则返回 None
-        """
-        directory_path = Path(directory)
-        
-        # 可能的 VTT 文件模式
-        patterns = [
-            f"{base_filename}.*.vtt",
-            f"{base_filename}.vtt"
-        ]
-        
-        for pattern in patterns:
-            for vtt_file in directory_path.glob(pattern):
-                return str(vtt_file)
-        
-        return None
+
+
+register_handler(YouTubeHandler)
@@ -0,0 +1,369 @@
+"""
+子进程运行模块
+
+逐行读取外部工具（yt-dlp / BBDown / ffmpeg / whisper-ctranslate2）的输出，只保留最后若干行，
+并从输出中解析下载百分比、ffmpeg 的 time= 以及 whisper 分段时间戳，转换为数值进度。
+"""
+
+import asyncio
+import logging
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from .cancel import JobCancelledError, check_cancelled, kill_process_tree, popen_group_kwargs, track_process
+from .utils import format_duration
+
+
+# yt-dlp: [download]  45.3% of 10.00MiB at 1.00MiB/s ETA 00:05
+YTDLP_PROGRESS_PATTERN = re.compile(r'\[download\]\s+(\d+(?:\.\d+)?)%')
+# BBDown 等工具的通用百分比输出
+PERCENT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+# ffmpeg: Duration: 00:10:00.00 / time=00:01:23.45
+FFMPEG_DURATION_PATTERN = re.compile(r'Duration:\s*(\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+FFMPEG_TIME_PATTERN = re.compile(r'time=\s*(\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+# whisper-ctranslate2: [01:23.450 --> 01:25.000] 文本
+WHISPER_SEGMENT_PATTERN = re.compile(
+    r'\[(?:(\d+):)?(\d{2}):(\d{2}(?:\.\d+)?)\s*-->\s*(?:(\d+):)?(\d{2}):(\d{2}(?:\.\d+)?)\]'
+)
+
+
+def _to_seconds(hours, minutes, seconds):
+    """将时、分、秒字符串转换为秒数"""
+    return int(hours or 0) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def decode_output(raw):
+    """
+    解码外部工具的输出（依次尝试 utf-8、gbk、cp936）
+
+    Args:
+        raw (bytes): 原始字节
+
+    Returns:
+        str: 解码后的文本
+    """
+    for encoding in ['utf-8', 'gbk', 'cp936']:
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode('utf-8', errors='ignore')
+
+
+class ProgressParser:
+    """从输出行中解析进度"""
+
+    def __init__(self, kind, total_duration=None):
+        """
+        初始化进度解析器
+
+        Args:
+            kind (str): 输出类型，'download'（yt-dlp/BBDown）、'ffmpeg' 或 'whisper'
+            total_duration (float): 媒体总时长（秒），ffmpeg 可从输出中自动获取
+        """
+        self.kind = kind
+        self.total_duration = total_duration
+
+    def parse(self, line):
+        """
+        解析一行输出
+
+        Args:
+            line (str): 输出行
+
+        Returns:
+            float: 0~1 之间的进度，该行不含进度信息时返回 None
+        """
+        if self.kind == 'download':
+            match = YTDLP_PROGRESS_PATTERN.search(line) or PERCENT_PATTERN.search(line)
+            if match:
+                return min(float(match.group(1)) / 100.0, 1.0)
+            return None
+
+        if self.kind == 'ffmpeg':
+            match = FFMPEG_DURATION_PATTERN.search(line)
+            if match and not self.total_duration:
+                self.total_duration = _to_seconds(*match.groups())
+                return None
+            match = FFMPEG_TIME_PATTERN.search(line)
+            if match and self.total_duration:
+                return min(_to_seconds(*match.groups()) / self.total_duration, 1.0)
+            return None
+
+        if self.kind == 'whisper':
+            match = WHISPER_SEGMENT_PATTERN.search(line)
+            if match and self.total_duration:
+                end = _to_seconds(*match.groups()[3:])
+                return min(end / self.total_duration, 1.0)
+            return None
+
+        return None
+
+
+class ProcessResult:
+    """子进程执行结果（只保留输出的最后若干行）"""
+
+    def __init__(self, command, returncode, stdout, stderr):
+        self.command = command
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+def make_progress_handler(stage, label, status_callback=None, progress_callback=None, min_interval=1.0):
+    """
+    生成供 run_process 使用的进度处理函数
+
+    进度会原样转发给 progress_callback(stage, fraction, eta)，并按时间间隔把百分比和剩余时间写入状态栏。
+
+    Args:
+        stage (str): 阶段名称（download / extract / transcribe）
+        label (str): 状态栏显示的文字，例如 "正在下载音频"
+        status_callback (callable): 状态回调函数
+        progress_callback (callable): 进度回调函数
+        min_interval (float): 状态消息最小间隔（秒）
+
+    Returns:
+        callable: 签名为 handler(fraction, eta) 的函数
+    """
+    last_report = [0.0]
+
+    def handler(fraction, eta):
+        if progress_callback:
+            progress_callback(stage, fraction, eta)
+
+        now = time.time()
+        if status_callback and (now - last_report[0] >= min_interval or fraction >= 1.0):
+            last_report[0] = now
+            message = f"{label} {fraction * 100:.1f}%"
+            if eta is not None and fraction < 1.0:
+                message += f"，预计剩余 {format_duration(int(eta))}"
+            status_callback(message)
+
+    return handler
+
+
+class _OutputCollector:
+    """按行收集子进程输出，保留最后若干行并解析进度（run_process 与 run_process_async 共用）"""
+
+    def __init__(self, command, progress_parser=None, progress_handler=None, line_callback=None, tail_lines=200):
+        self.command = command
+        self.progress_parser = progress_parser
+        self.progress_handler = progress_handler
+        self.line_callback = line_callback
+        self.logger = logging.getLogger(__name__)
+
+        self.start_time = time.time()
+        self.tails = {'stdout': deque(maxlen=tail_lines), 'stderr': deque(maxlen=tail_lines)}
+        self.pending = {'stdout': [], 'stderr': []}
+        self.lock = threading.Lock()
+        self.last_progress = [-1.0, 0.0]  # 上次上报的进度和时间
+
+    def feed(self, stream_name, chunk):
+        """
+        写入一块输出，chunk 为空表示输出流结束
+
+        ffmpeg 和 yt-dlp 用 \\r 刷新同一行，因此同时按 \\r 和 \\n 分行；
+        不完整的行先按块暂存，避免 --dump-json 这类很长的单行输出被反复拼接和扫描
+        """
+        pending = self.pending[stream_name]
+
+        if not chunk:
+            self.pending[stream_name] = []
+            buffer = b''.join(pending)
+            if buffer.strip():
+                self._handle_line(stream_name, decode_output(buffer).rstrip())
+            return
+
+        parts = re.split(rb'[\r\n]', chunk)
+        if len(parts) == 1:
+            pending.append(chunk)
+            return
+
+        parts[0] = b''.join(pending) + parts[0]
+        self.pending[stream_name] = [parts.pop()]
+        for part in parts:
+            if part.strip():
+                self._handle_line(stream_name, decode_output(part).rstrip())
+
+    def _handle_line(self, stream_name, line):
+        with self.lock:
+            self.tails[stream_name].append(line)
+
+            if self.line_callback:
+                try:
+                    self.line_callback(line)
+                except Exception as e:
+                    self.logger.debug(f"输出回调出错: {e}")
+
+            if not (self.progress_parser and self.progress_handler):
+                return
+
+            fraction = self.progress_parser.parse(line)
+            if fraction is None:
+                return
+
+            # 限制上报频率：进度变化至少 0.5% 或间隔 0.5 秒
+            now = time.time()
+            if fraction < 1.0 and fraction - self.last_progress[0] < 0.005 and now - self.last_progress[1] < 0.5:
+                return
+            self.last_progress[0], self.last_progress[1] = fraction, now
+
+            elapsed = now - self.start_time
+            eta = elapsed * (1 - fraction) / fraction if fraction > 0 else None
+            try:
+                self.progress_handler(fraction, eta)
+            except Exception as e:
+                self.logger.debug(f"进度回调出错: {e}")
+
+    def result(self, returncode):
+        """生成执行结果"""
+        return ProcessResult(
+            self.command,
+            returncode,
+            '\n'.join(self.tails['stdout']),
+            '\n'.join(self.tails['stderr'])
+        )
+
+
+def run_process(command, timeout=None, progress_parser=None, progress_handler=None,
+                line_callback=None, env=None, tail_lines=200):
+    """
+    运行外部命令并逐行读取输出
+
+    与 subprocess.run(capture_output=True) 不同，输出不会整体缓存在内存中，
+    只保留最后 tail_lines 行用于错误信息和结果解析。
+    进程运行期间登记在当前任务的取消令牌上（见 core/cancel.py），任务取消时连同其子进程一起终止。
+
+    Args:
+        command (list): 命令参数列表
+        timeout (float): 超时时间（秒），超时后终止进程并抛出 subprocess.TimeoutExpired
+        progress_parser (ProgressParser): 进度解析器
+        progress_handler (callable): 进度回调，签名为 handler(fraction, eta)
+        line_callback (callable): 每行输出的回调，签名为 line_callback(line)
+        env (dict): 环境变量
+        tail_lines (int): 每个输出流保留的行数
+
+    Returns:
+        ProcessResult: 执行结果
+
+    Raises:
+        subprocess.TimeoutExpired: 超时
+        JobCancelledError: 任务被取消
+    """
+    check_cancelled()
+
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+        **popen_group_kwargs()
+    )
+    collector = _OutputCollector(command, progress_parser, progress_handler, line_callback, tail_lines)
+
+    def read_stream(stream, stream_name):
+        while True:
+            chunk = stream.read1(4096) if hasattr(stream, 'read1') else stream.read(4096)
+            collector.feed(stream_name, chunk)
+            if not chunk:
+                break
+
+    readers = [
+        threading.Thread(target=read_stream, args=(process.stdout, 'stdout'), daemon=True),
+        threading.Thread(target=read_stream, args=(process.stderr, 'stderr'), daemon=True)
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        with track_process(process):
+            returncode = process.wait(timeout=timeout)
+    except (subprocess.TimeoutExpired, JobCancelledError):
+        kill_process_tree(process)
+        process.wait()
+        for reader in readers:
+            reader.join(timeout=5)
+        raise
+
+    for reader in readers:
+        reader.join()
+
+    # 进程是被取消令牌终止的
+    check_cancelled()
+
+    return collector.result(returncode)
+
+
+async def run_process_async(command, timeout=None, progress_parser=None, progress_handler=None,
+                            line_callback=None, env=None, tail_lines=200):
+    """
+    run_process 的 asyncio 版本
+
+    用 asyncio.create_subprocess_exec 启动进程，在事件循环中读取输出，不占用线程，
+    大量下载/元数据任务可以在同一个事件循环中并发执行。
+    超时、协程被取消或取消令牌被触发时会终止子进程及其子进程。
+
+    注意：Python 3.12 起 Linux 上用 pidfd 等待子进程退出；更早的版本中
+    asyncio 默认的 ThreadedChildWatcher 仍会为每个子进程启动一个只做 waitpid 的线程。
+
+    Args:
+        与 run_process 相同
+
+    Returns:
+        ProcessResult: 执行结果
+
+    Raises:
+        subprocess.TimeoutExpired: 超时
+        asyncio.CancelledError: 协程被取消
+        JobCancelledError: 取消令牌被触发
+    """
+    check_cancelled()
+
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+        **popen_group_kwargs()
+    )
+    collector = _OutputCollector(command, progress_parser, progress_handler, line_callback, tail_lines)
+
+    async def read_stream(stream, stream_name):
+        while True:
+            chunk = await stream.read(4096)
+            collector.feed(stream_name, chunk)
+            if not chunk:
+                break
+
+    async def communicate():
+        await asyncio.gather(
+            read_stream(process.stdout, 'stdout'),
+            read_stream(process.stderr, 'stderr')
+        )
+        return await process.wait()
+
+    try:
+        with track_process(process):
+            returncode = await asyncio.wait_for(communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill_async(process)
+        raise subprocess.TimeoutExpired(command, timeout)
+    except (asyncio.CancelledError, JobCancelledError):
+        await _kill_async(process)
+        raise
+
+    check_cancelled()
+
+    return collector.result(returncode)
+
+
+async def _kill_async(process):
+    """终止 asyncio 子进程（连同其子进程）并等待其退出"""
+    kill_process_tree(process)
+    try:
+        await asyncio.wait_for(process.wait(), 5)
+    except asyncio.TimeoutError:
+        logging.getLogger(__name__).warning(f"子进程未能及时退出: {process.pid}")
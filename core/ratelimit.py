@@ -0,0 +1,322 @@
+"""
+请求调度模块
+
+同一平台的所有任务共用一个 RequestScheduler，对 yt-dlp / BBDown 发起的请求统一限速和重试：
+
+- 令牌桶限速：按 [download] <平台>_requests_per_minute 控制请求速率，允许 request_burst 个突发请求
+- 指数退避：重试间隔从 retry_delay 开始翻倍，不超过 max_retry_delay，并加入随机抖动，
+  避免并发任务在同一时刻重试
+- 自动降速：遇到 403 / 429 等限流信号时速率减半并暂停该平台的所有请求，
+  之后每次成功请求逐步恢复到配置的速率
+"""
+
+import asyncio
+import logging
+import random
+import subprocess
+import threading
+import time
+from .cancel import JobCancelledError, cancellable_sleep, check_cancelled
+from .config import get_config
+
+
+# 平台限流信号
+THROTTLE_PATTERNS = [
+    "http error 429",
+    "too many requests",
+    "http error 403",
+    "403 forbidden",
+    "rate limit",
+    "rate-limit",
+    "请求过于频繁",
+    "-412",
+]
+
+# 网络抖动等可以重试的错误
+TRANSIENT_PATTERNS = [
+    "fragment 1 not found",
+    "eof occurred in violation of protocol",
+    "connection reset by peer",
+    "connection refused",
+    "temporary failure in name resolution",
+    "timed out",
+    "timeout",
+    "network is unreachable",
+    "remote end closed connection",
+    "http error 500",
+    "http error 502",
+    "http error 503",
+    "http error 504",
+]
+
+# 降速后每次成功请求恢复的比例（相对于配置的速率）
+RECOVERY_STEP = 0.1
+# 降速的下限（相对于配置的速率）
+MIN_RATE_FACTOR = 0.1
+
+
+class RetryableError(Exception):
+    """
+    可重试的请求错误
+
+    处理器可以直接抛出该异常标记需要重试的情况（例如下载结束但没有找到输出文件），
+    其他异常按错误信息判断是否可重试。
+    """
+
+    def __init__(self, message, throttled=False):
+        super().__init__(message)
+        self.throttled = throttled
+
+
+def classify_error(error):
+    """
+    判断错误类型
+
+    Args:
+        error: 异常或错误信息
+
+    Returns:
+        str: 'throttled'（平台限流）、'transient'（可重试）或 None（不可重试）
+    """
+    if isinstance(error, RetryableError):
+        return 'throttled' if error.throttled else 'transient'
+    if isinstance(error, subprocess.TimeoutExpired):
+        return 'transient'
+
+    message = str(error).lower()
+    if any(pattern in message for pattern in THROTTLE_PATTERNS):
+        return 'throttled'
+    if any(pattern in message for pattern in TRANSIENT_PATTERNS):
+        return 'transient'
+    return None
+
+
+class RequestScheduler:
+    """单个平台的请求调度器（线程和协程共用）"""
+
+    def __init__(self, platform, requests_per_minute, burst=3, max_retries=3, base_delay=5.0, max_delay=60.0):
+        """
+        初始化请求调度器
+
+        Args:
+            platform (str): 平台名称，用于日志
+            requests_per_minute (float): 每分钟最多请求数，0 表示不限速
+            burst (int): 令牌桶容量，即允许连续发起的请求数
+            max_retries (int): 默认的最大重试次数
+            base_delay (float): 第一次重试前的等待时间（秒）
+            max_delay (float): 重试等待时间的上限（秒）
+        """
+        self.platform = platform
+        self.logger = logging.getLogger(__name__)
+        self.max_rate = requests_per_minute / 60.0
+        self.rate = self.max_rate
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        # 令牌余额对应的时间点，暂停期间会被推到未来
+        self._updated = time.monotonic()
+
+    def _reserve(self):
+        """
+        预约一个令牌
+
+        令牌余额可以为负，表示已经有请求在排队；返回值是本次请求需要等待的时间。
+
+        Returns:
+            float: 等待时间（秒）
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.rate <= 0:
+                return max(0.0, self._updated - now)
+
+            if now > self._updated:
+                self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+            self._tokens -= 1
+            ready_at = self._updated + max(0.0, -self._tokens) / self.rate
+            return max(0.0, ready_at - now)
+
+    def acquire(self):
+        """
+        等待直到可以发起一次请求（可被取消令牌打断）
+
+        Raises:
+            JobCancelledError: 任务被取消
+        """
+        delay = self._reserve()
+        if delay > 0:
+            self.logger.debug(f"{self.platform} 请求限速，等待 {delay:.1f} 秒")
+            cancellable_sleep(delay)
+        else:
+            check_cancelled()
+
+    async def acquire_async(self):
+        """acquire 的 asyncio 版本"""
+        delay = self._reserve()
+        if delay > 0:
+            self.logger.debug(f"{self.platform} 请求限速，等待 {delay:.1f} 秒")
+            await asyncio.sleep(delay)
+        check_cancelled()
+
+    def backoff(self, attempt):
+        """
+        计算第 attempt 次重试前的等待时间（指数退避，随机取上限的一半到全部）
+
+        Args:
+            attempt (int): 已失败的次数（从 0 开始）
+
+        Returns:
+            float: 等待时间（秒）
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def report_success(self):
+        """请求成功：逐步恢复被降低的速率"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+    def report_throttled(self, pause):
+        """
+        遇到限流：速率减半，并暂停该平台的所有请求
+
+        Args:
+            pause (float): 暂停时间（秒）
+        """
+        with self._lock:
+            self.rate = max(self.max_rate * MIN_RATE_FACTOR, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, time.monotonic() + pause)
+            rate = self.rate
+
+        if rate > 0:
+            message = f"{self.platform} 触发限流，暂停 {pause:.1f} 秒，请求速率降至每分钟 {rate * 60:.1f} 次"
+        else:
+            message = f"{self.platform} 触发限流，暂停 {pause:.1f} 秒"
+        print(f"🐢 {message}")
+        self.logger.warning(message)
+
+    def _handle_failure(self, error, attempt, max_retries, description):
+        """
+        处理一次失败的请求
+
+        Returns:
+            float: 重试前需要额外等待的时间（秒）
+
+        Raises:
+            原异常: 不可重试或已达到最大重试次数
+        """
+        kind = classify_error(error)
+        if kind is None or attempt >= max_retries:
+            if kind and max_retries:
+                self.logger.warning(f"{description}失败，已重试 {max_retries} 次: {error}")
+            raise error
+
+        delay = self.backoff(attempt)
+        reason = str(error).strip().splitlines()[-1] if str(error).strip() else type(error).__name__
+        if kind == 'throttled':
+            # 等待由令牌桶完成，同一平台的其他任务也会一起暂停
+            self.report_throttled(delay)
+            print(f"⚠️ {description}被限流，稍后重试: {reason}")
+            return 0.0
+
+        print(f"⚠️ {description}失败，{delay:.1f}秒后重试: {reason}")
+        return delay
+
+    def call(self, func, description="请求", max_retries=None):
+        """
+        限速执行请求，失败时按退避策略重试
+
+        Args:
+            func (callable): 执行一次请求，签名为 func(attempt)，attempt 从 0 开始
+            description (str): 请求描述，用于提示信息
+            max_retries (int): 最大重试次数，默认使用配置值
+
+        Returns:
+            func 的返回值
+
+        Raises:
+            JobCancelledError: 任务被取消
+            Exception: 不可重试的错误，或重试次数用尽后的最后一个错误
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = func(attempt)
+            except JobCancelledError:
+                raise
+            except Exception as e:
+                delay = self._handle_failure(e, attempt, max_retries, description)
+                if delay:
+                    cancellable_sleep(delay)
+                attempt += 1
+                continue
+
+            self.report_success()
+            return result
+
+    async def call_async(self, func, description="请求", max_retries=None):
+        """
+        call 的 asyncio 版本
+
+        Args:
+            func (callable): 签名为 func(attempt) 的协程函数
+            其余参数与 call 相同
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            await self.acquire_async()
+            try:
+                result = await func(attempt)
+            except JobCancelledError:
+                raise
+            except Exception as e:
+                delay = self._handle_failure(e, attempt, max_retries, description)
+                if delay:
+                    await asyncio.sleep(delay)
+                    check_cancelled()
+                attempt += 1
+                continue
+
+            self.report_success()
+            return result
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(platform):
+    """
+    获取平台共用的请求调度器
+
+    Args:
+        platform (str): 平台名称（youtube / bilibili）
+
+    Returns:
+        RequestScheduler: 请求调度器
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(platform)
+        if scheduler is None:
+            config = get_config()
+            scheduler = RequestScheduler(
+                platform,
+                config.get_requests_per_minute(platform),
+                burst=config.request_burst,
+                max_retries=config.download_max_retries,
+                base_delay=config.download_retry_delay,
+                max_delay=config.download_max_retry_delay
+            )
+            _schedulers[platform] = scheduler
+    return scheduler
@@ -0,0 +1,212 @@
+"""
+平台注册表
+
+各平台处理器用类属性声明自己的 URL 模式：
+
+    class ExampleHandler:
+        PLATFORM = 'example'
+        URL_PATTERNS = [
+            ('video', r'example\.com/v/(?P<id>\w+)'),
+            ('playlist', r'example\.com/list/(?P<id>\w+)'),
+        ]
+
+    register_handler(ExampleHandler)
+
+所有平台的模式合并编译为一个正则表达式，每个 URL 只需一次匹配即可得到平台、ID 和链接类型，
+新平台注册后 TaskManager 自动创建对应的处理器，不需要修改 utils.py 或 manager.py。
+
+模式从域名开始书写（前面的 http(s):// 和子域名由注册表统一匹配），用命名分组 (?P<id>...) 标出 ID；
+同一平台内先声明的模式优先。
+"""
+
+import re
+import threading
+from collections import namedtuple
+
+
+# 链接类型：单个视频、短链接（需要跳转后才能确定视频）、播放列表/合集、频道/个人空间
+URL_KINDS = ('video', 'short', 'playlist', 'channel')
+
+# 各模式之前统一匹配的协议和子域名
+URL_PREFIX = r'\s*(?:https?://)?(?:[\w-]+\.)*?'
+
+UrlMatch = namedtuple('UrlMatch', ['platform', 'id', 'kind'])
+
+
+class PlatformRegistry:
+    """平台处理器与 URL 模式的注册表"""
+
+    def __init__(self):
+        self._platforms = {}  # 平台名称 -> (处理器工厂, [(类型, 正则)])
+        self._lock = threading.Lock()
+        # (合并后的正则, {分组名: (平台, 类型, ID 分组名)})，注册表变化后置为 None
+        self._compiled = None
+
+    def register(self, platform, factory=None, patterns=()):
+        """
+        注册平台
+
+        Args:
+            platform (str): 平台名称
+            factory (callable): 创建处理器实例的函数（通常是处理器类），为 None 时只注册 URL 模式
+            patterns (list): [(类型, 正则)]，类型为 URL_KINDS 之一
+
+        Raises:
+            ValueError: 类型未知或正则中缺少 (?P<id>...) 分组
+        """
+        patterns = list(patterns or [])
+        for kind, pattern in patterns:
+            if kind not in URL_KINDS:
+                raise ValueError(f"未知的链接类型: {kind}")
+            if '(?P<id>' not in pattern:
+                raise ValueError(f"URL 模式缺少 (?P<id>...) 分组: {pattern}")
+            re.compile(pattern)
+
+        with self._lock:
+            self._platforms[platform] = (factory, patterns)
+            self._compiled = None
+
+    def unregister(self, platform):
+        """注销平台"""
+        with self._lock:
+            if self._platforms.pop(platform, None) is not None:
+                self._compiled = None
+
+    def platforms(self):
+        """
+        已注册的平台名称
+
+        Returns:
+            list: 按注册顺序排列的平台名称
+        """
+        with self._lock:
+            return list(self._platforms)
+
+    def create_handlers(self):
+        """
+        为每个注册了处理器工厂的平台创建处理器实例
+
+        Returns:
+            dict: 平台名称 -> 处理器实例
+        """
+        with self._lock:
+            factories = [(platform, factory) for platform, (factory, _) in self._platforms.items() if factory]
+        return {platform: factory() for platform, factory in factories}
+
+    def _get_matcher(self):
+        """合并所有平台的模式并编译（注册表变化后重新编译）"""
+        compiled = self._compiled
+        if compiled is not None:
+            return compiled
+
+        with self._lock:
+            if self._compiled is None:
+                alternatives = []
+                groups = {}
+                for platform, (_, patterns) in self._platforms.items():
+                    for kind, pattern in patterns:
+                        index = len(alternatives)
+                        # 各模式的 ID 分组改为不重名的分组名
+                        pattern = pattern.replace('(?P<id>', f'(?P<id{index}>')
+                        alternatives.append(f'(?P<p{index}>{pattern})')
+                        groups[f'p{index}'] = (platform, kind, f'id{index}')
+
+                body = '|'.join(alternatives) if alternatives else r'(?!)'
+                self._compiled = (re.compile(f'{URL_PREFIX}(?:{body})', re.IGNORECASE), groups)
+            return self._compiled
+
+    def classify(self, url):
+        """
+        识别 URL 的平台、ID 和链接类型
+
+        Args:
+            url (str): URL
+
+        Returns:
+            UrlMatch: (platform, id, kind)，无法识别时返回 None
+        """
+        if not url:
+            return None
+
+        matcher, groups = self._get_matcher()
+        match = matcher.match(url)
+        if not match:
+            return None
+
+        platform, kind, id_group = groups[match.lastgroup]
+        return UrlMatch(platform, match.group(id_group), kind)
+
+    def classify_many(self, urls):
+        """
+        批量识别 URL（重复的 URL 只匹配一次）
+
+        Args:
+            urls (list): URL 列表
+
+        Returns:
+            list: 与输入顺序对应的 UrlMatch（无法识别时为 None）
+        """
+        matcher, groups = self._get_matcher()
+        match_url = matcher.match
+        results = {}
+        for url in urls:
+            if url in results:
+                continue
+            match = match_url(url) if url else None
+            if match:
+                platform, kind, id_group = groups[match.lastgroup]
+                results[url] = UrlMatch(platform, match.group(id_group), kind)
+            else:
+                results[url] = None
+        return [results[url] for url in urls]
+
+
+_registry = PlatformRegistry()
+_builtin_loaded = False
+_builtin_lock = threading.Lock()
+
+
+def _load_builtin_platforms():
+    """导入内置平台处理器（各模块在导入时注册自己）"""
+    global _builtin_loaded
+    if _builtin_loaded:
+        return
+    with _builtin_lock:
+        if not _builtin_loaded:
+            from . import platform  # noqa: F401
+            _builtin_loaded = True
+
+
+def get_registry():
+    """
+    获取全局平台注册表（包含内置平台）
+
+    Returns:
+        PlatformRegistry: 注册表
+    """
+    _load_builtin_platforms()
+    return _registry
+
+
+def register_handler(handler_class):
+    """
+    注册平台处理器类（读取类属性 PLATFORM 和 URL_PATTERNS）
+
+    Args:
+        handler_class: 处理器类
+
+    Returns:
+        处理器类本身，可以用作类装饰器
+    """
+    _registry.register(handler_class.PLATFORM, handler_class, getattr(handler_class, 'URL_PATTERNS', ()))
+    return handler_class
+
+
+def classify_url(url):
+    """
+    识别 URL 的平台、ID 和链接类型
+
+    Returns:
+        UrlMatch: (platform, id, kind)，无法识别时返回 None
+    """
+    return get_registry().classify(url)
@@ -0,0 +1,206 @@
+"""
+短链接解析
+
+b23.tv 等短链接中的代码不是视频 ID，直接用它做视频信息缓存和去重的键会把同一个视频当成不同的视频。
+ShortLinkResolver 在任务开始前跟随短链接的跳转得到视频页面链接（BV/av 号），
+结果按 (平台, 短链接代码) 记录到短链接缓存，同一短链接只联网解析一次。
+
+只请求跳转响应，不跟随到视频页面本身，也不读取页面内容；
+批量解析时各短链接并发请求，请求速率和重试由 <平台>_short 请求调度器控制
+（可以用 [download] <平台>_short_requests_per_minute 限速，默认不限速）。
+
+youtu.be 短链接本身带有视频 ID，由平台注册表直接识别，不需要联网解析。
+"""
+
+import logging
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from .cache import get_short_link_cache
+from .cancel import bind_token, check_cancelled, current_token
+from .config import get_config
+from .ratelimit import get_scheduler
+from .registry import get_registry
+
+
+# 跳转状态码
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# 规范化视频链接时保留的查询参数（分P、视频 ID、播放列表），其余分享跟踪参数被去掉
+KEEP_PARAMS = ('p', 'v', 'list')
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """不自动跟随跳转，跳转响应以 HTTPError 返回"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def canonicalize_url(url):
+    """
+    去掉视频链接中的分享跟踪参数和锚点
+
+    Args:
+        url (str): 视频链接
+
+    Returns:
+        str: 规范化后的链接
+    """
+    parts = urlsplit(url)
+    query = urlencode([(key, value) for key, value in parse_qsl(parts.query) if key in KEEP_PARAMS])
+    return urlunsplit((parts.scheme or 'https', parts.netloc, parts.path, query, ''))
+
+
+class ShortLinkResolver:
+    """短链接解析器"""
+
+    # 最多跟随的跳转次数
+    MAX_REDIRECTS = 5
+
+    def __init__(self, registry=None):
+        """
+        初始化短链接解析器
+
+        Args:
+            registry (PlatformRegistry): 平台注册表，默认为全局注册表
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+        self.registry = registry or get_registry()
+        self.cache = get_short_link_cache()
+        self._opener = urllib.request.build_opener(_NoRedirectHandler)
+
+    def resolve(self, url):
+        """
+        解析短链接
+
+        Args:
+            url (str): URL，不是短链接时原样返回
+
+        Returns:
+            str: 视频页面链接
+
+        Raises:
+            JobCancelledError: 任务被取消
+            Exception: 请求失败或短链接没有指向支持的视频页面
+        """
+        match = self.registry.classify(url)
+        if not match or match.kind != 'short':
+            return url
+
+        cached = self.cache.get(match.platform, match.id)
+        if cached:
+            return cached
+
+        return self._resolve_uncached(url, match)
+
+    def resolve_many(self, urls, status_callback=None, cancel_token=None):
+        """
+        并发解析一批 URL 中的短链接
+
+        已缓存的短链接一次查询取出，重复的短链接只解析一次；解析失败的短链接原样保留。
+
+        Args:
+            urls (list): URL 列表
+            status_callback (callable): 状态回调函数
+            cancel_token (CancellationToken): 取消令牌
+
+        Returns:
+            list: 与输入顺序对应的 URL 列表，短链接替换为视频页面链接
+        """
+        matches = self.registry.classify_many(urls)
+        pending = {}  # (平台, 代码) -> (短链接, UrlMatch)
+        for url, match in zip(urls, matches):
+            if match and match.kind == 'short':
+                pending.setdefault((match.platform, match.id), (url, match))
+
+        if not pending:
+            return list(urls)
+
+        resolved = {}
+        platforms = {platform for platform, _ in pending}
+        for platform in platforms:
+            codes = [code for key_platform, code in pending if key_platform == platform]
+            for code, target in self.cache.get_many(platform, codes).items():
+                resolved[(platform, code)] = target
+
+        missing = [key for key in pending if key not in resolved]
+        if missing:
+            message = f"解析 {len(missing)} 个短链接..."
+            print(f"🔗 {message}")
+            if status_callback:
+                status_callback(message)
+
+            token = cancel_token or current_token()
+
+            def resolve_one(key):
+                url, match = pending[key]
+                try:
+                    with bind_token(token):
+                        return self._resolve_uncached(url, match)
+                except Exception as e:
+                    self.logger.warning(f"解析短链接失败 {url}: {e}")
+                    return None
+
+            workers = max(1, min(self.config.max_concurrent_tasks, len(missing)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='streamscribe-resolve') as pool:
+                for key, target in zip(missing, pool.map(resolve_one, missing)):
+                    if target:
+                        resolved[key] = target
+
+        results = []
+        for url, match in zip(urls, matches):
+            key = (match.platform, match.id) if match and match.kind == 'short' else None
+            results.append(resolved.get(key, url))
+        return results
+
+    def _resolve_uncached(self, url, match):
+        """联网解析短链接并写入缓存"""
+        scheduler = get_scheduler(f"{match.platform}_short")
+        target = scheduler.call(lambda attempt: self._follow(url), f"解析短链接 {url}")
+
+        self.cache.set(match.platform, match.id, target)
+        self.logger.info(f"短链接 {url} -> {target}")
+        return target
+
+    def _follow(self, url):
+        """
+        逐次跟随跳转，直到得到平台注册表能识别的视频、播放列表或频道链接
+
+        Returns:
+            str: 规范化后的链接
+
+        Raises:
+            Exception: 请求失败、跳转次数过多或没有指向支持的页面
+        """
+        current = url.strip()
+        if '://' not in current:
+            current = f"https://{current}"
+
+        for _ in range(self.MAX_REDIRECTS):
+            check_cancelled()
+            request = urllib.request.Request(current, headers={'User-Agent': self.config.user_agent})
+            try:
+                # 没有跳转：短链接服务直接返回了页面
+                with self._opener.open(request, timeout=self.config.short_link_timeout) as response:
+                    current = response.geturl()
+                break
+            except urllib.error.HTTPError as e:
+                location = e.headers.get('Location') if e.code in REDIRECT_CODES else None
+                e.close()
+                if not location:
+                    raise
+                current = urljoin(current, location)
+
+            match = self.registry.classify(current)
+            if match and match.kind != 'short':
+                return canonicalize_url(current)
+        else:
+            raise Exception(f"短链接跳转次数过多: {url}")
+
+        match = self.registry.classify(current)
+        if not match or match.kind == 'short':
+            raise ValueError(f"短链接没有指向支持的视频页面: {current}")
+        return canonicalize_url(current)
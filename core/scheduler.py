@@ -0,0 +1,244 @@
+"""
+任务调度
+
+按优先级和估计的转录成本安排任务顺序，缩短混合批次中第一份文稿出来的时间：
+
+- 显式优先级：数值大的先处理（high / normal / low，也可以直接给整数）
+- 同一优先级内各提交者轮流：先处理最久没有被服务的提交者，一个提交者的大批任务不会挡住其他人
+- 同一提交者内按估计成本从低到高：有字幕的任务（成本为 0，不需要 Whisper）最先，其次音频越短越先；
+  成本未知的任务排在已知成本的任务之后，保持提交顺序
+
+成本为需要转录的音频时长（秒），来自视频信息缓存（yt-dlp --dump-json 的 duration、BBDown 的分P时长）
+或 ffprobe 的探测结果，估计成本本身不会额外联网。
+"""
+
+import heapq
+import queue
+import threading
+import time
+
+
+# 优先级名称
+PRIORITY_LEVELS = {'high': 10, 'normal': 0, 'low': -10}
+
+
+def parse_priority(value):
+    """
+    解析优先级
+
+    Args:
+        value: 整数、数字字符串或 PRIORITY_LEVELS 中的名称，None 表示 normal
+
+    Returns:
+        int: 优先级，数值越大越先处理
+
+    Raises:
+        ValueError: 无法识别的优先级
+    """
+    if value is None or value == '':
+        return PRIORITY_LEVELS['normal']
+    if isinstance(value, bool):
+        raise ValueError(f"无效的优先级: {value}")
+    if isinstance(value, int):
+        return value
+
+    text = str(value).strip().lower()
+    if text in PRIORITY_LEVELS:
+        return PRIORITY_LEVELS[text]
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"无效的优先级: {value}（可用 {', '.join(PRIORITY_LEVELS)} 或整数）")
+
+
+class PriorityJobQueue:
+    """
+    按优先级、提交者轮转和估计成本出队的有界队列（线程安全）
+
+    接口与 queue.Queue 相近：队列已满时 put 阻塞或抛出 queue.Full；
+    close() 之后 get 取完剩余的任务后返回 None，可以用来通知消费线程退出。
+    """
+
+    def __init__(self, maxsize=0):
+        """
+        初始化队列
+
+        Args:
+            maxsize (int): 队列容量，0 表示不限制
+        """
+        self.maxsize = max(0, int(maxsize))
+        self._levels = {}   # 优先级 -> {提交者: [(成本未知, 成本, 序号, 任务)]}
+        self._served = {}   # 提交者 -> 最近一次出队的序号
+        self._count = 0
+        self._seq = 0
+        self._tick = 0
+        self._closed = False
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+
+    def qsize(self):
+        """排队中的任务数"""
+        with self._mutex:
+            return self._count
+
+    def __len__(self):
+        return self.qsize()
+
+    def put(self, item, priority=0, cost=None, submitter=None, block=True, timeout=None):
+        """
+        加入任务
+
+        Args:
+            item: 任务
+            priority (int): 优先级，数值越大越先处理
+            cost (float): 估计成本（需要转录的音频秒数），None 表示未知
+            submitter (str): 提交者，同一优先级内各提交者轮流出队
+            block (bool): 队列已满时是否等待
+            timeout (float): 最长等待时间（秒）
+
+        Raises:
+            queue.Full: 队列已满
+            RuntimeError: 队列已关闭
+        """
+        with self._not_full:
+            if self._closed:
+                raise RuntimeError("队列已关闭")
+            if self.maxsize:
+                if not block:
+                    if self._count >= self.maxsize:
+                        raise queue.Full
+                else:
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while self._count >= self.maxsize:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            raise queue.Full
+                        self._not_full.wait(remaining)
+
+            self._seq += 1
+            entry = (cost is None, cost or 0.0, self._seq, item)
+            heapq.heappush(self._levels.setdefault(priority, {}).setdefault(submitter, []), entry)
+            self._count += 1
+            self._not_empty.notify()
+
+    def put_nowait(self, item, priority=0, cost=None, submitter=None):
+        """不等待的 put，队列已满时抛出 queue.Full"""
+        self.put(item, priority, cost, submitter, block=False)
+
+    def get(self, block=True, timeout=None):
+        """
+        取出下一个任务
+
+        Args:
+            block (bool): 队列为空时是否等待
+            timeout (float): 最长等待时间（秒）
+
+        Returns:
+            下一个任务；队列已关闭且为空时返回 None
+
+        Raises:
+            queue.Empty: 不等待或等待超时时队列为空
+        """
+        with self._not_empty:
+            if not block:
+                if not self._count and not self._closed:
+                    raise queue.Empty
+            else:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not self._count and not self._closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    self._not_empty.wait(remaining)
+
+            if not self._count:
+                return None
+
+            item = self._pop()
+            self._not_full.notify()
+            return item
+
+    def discard(self, item):
+        """
+        移除排队中的任务（例如已取消的任务），释放队列容量
+
+        Args:
+            item: put() 加入的任务
+
+        Returns:
+            bool: 任务是否在队列中
+        """
+        with self._mutex:
+            for priority, submitters in self._levels.items():
+                for submitter, entries in submitters.items():
+                    for index, entry in enumerate(entries):
+                        if entry[3] is item:
+                            entries[index] = entries[-1]
+                            entries.pop()
+                            heapq.heapify(entries)
+                            self._count -= 1
+                            if not entries:
+                                del submitters[submitter]
+                                if not submitters:
+                                    del self._levels[priority]
+                                if not any(submitter in level for level in self._levels.values()):
+                                    self._served.pop(submitter, None)
+                            self._not_full.notify()
+                            return True
+            return False
+
+    def _pop(self):
+        """按优先级、提交者轮转和成本取出一个任务（调用方持有锁）"""
+        priority = max(self._levels)
+        submitters = self._levels[priority]
+        # 最久没有被服务的提交者先出队，相同时先提交的先出队
+        submitter = min(submitters, key=lambda name: (self._served.get(name, 0), submitters[name][0][2]))
+
+        entries = submitters[submitter]
+        item = heapq.heappop(entries)[3]
+        self._count -= 1
+        self._tick += 1
+        self._served[submitter] = self._tick
+
+        if not entries:
+            del submitters[submitter]
+            if not submitters:
+                del self._levels[priority]
+            if not any(submitter in level for level in self._levels.values()):
+                # 没有排队任务的提交者不再记录，保持内存有界
+                del self._served[submitter]
+        return item
+
+    def close(self, discard=False):
+        """
+        关闭队列：不再接受新任务，等待中的 get 在取完剩余任务后返回 None
+
+        Args:
+            discard (bool): 是否丢弃剩余的任务
+        """
+        with self._mutex:
+            self._closed = True
+            if discard:
+                self._levels.clear()
+                self._served.clear()
+                self._count = 0
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+
+def order_jobs(jobs):
+    """
+    按调度顺序排列任务
+
+    Args:
+        jobs (list): Job 列表，读取各任务的 priority、cost 和 submitter
+
+    Returns:
+        list: 按调度顺序排列的新列表（原列表不变）
+    """
+    scheduled = PriorityJobQueue()
+    for job in jobs:
+        scheduled.put(job, job.priority, job.cost, job.submitter)
+    scheduled.close()
+    return [scheduled.get() for _ in jobs]
@@ -0,0 +1,583 @@
+"""
+HTTP 任务服务
+
+在本机提供一个简单的 HTTP 接口，供其他工具提交任务、查询状态和下载文稿：
+
+    POST /jobs                    提交任务，请求体为 {"url": ...}、{"path": ...} 或 {"source": ...}，
+                                  可选 "priority"（high / normal / low 或整数）和 "submitter"（默认为客户端地址）
+    GET  /jobs                    列出任务
+    GET  /jobs/<id>               查询任务状态
+    GET  /jobs/<id>/events        以 JSON 行流式返回任务事件，直到任务结束（?since=N 从第 N 个事件开始）
+    GET  /jobs/<id>/transcript    下载文稿
+    DELETE /jobs/<id>             取消任务（终止正在运行的外部进程）
+    GET  /health                  服务状态
+
+任务进入有界队列，由固定数量的工作线程调用 TaskManager 处理；队列已满时提交返回 503。
+队列按优先级、提交者轮转和估计的转录成本出队（见 core/scheduler.py），多个调用方共用一个服务时互不阻塞。
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, quote
+from .config import get_config
+from .executor import Job
+from .scheduler import PriorityJobQueue, parse_priority
+from .utils import validate_url
+
+
+# 请求体大小上限（字节）
+MAX_REQUEST_BODY = 64 * 1024
+
+
+class ServerJob(Job):
+    """HTTP 服务中的单个任务，记录状态事件供客户端轮询或流式读取"""
+
+    def __init__(self, kind, source):
+        """
+        初始化任务
+
+        Args:
+            kind (str): 'url' 或 'file'
+            source (str): URL 或文件路径
+        """
+        super().__init__(1, source, 1)
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.created_at = time.time()
+        self.events = []
+        self._condition = threading.Condition()
+        self._reported_progress = -1
+
+    @property
+    def label(self):
+        """状态前缀，例如 [3f2a9c1b0d4e]"""
+        return f"[{self.id}]"
+
+    @property
+    def finished(self):
+        """任务是否已结束"""
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def add_event(self, event_type, **fields):
+        """
+        记录事件并唤醒等待中的客户端
+
+        Args:
+            event_type (str): 事件类型，status / progress / done / failed / cancelled
+            **fields: 事件内容
+        """
+        with self._condition:
+            event = {'seq': len(self.events), 'time': time.time(), 'type': event_type}
+            event.update(fields)
+            self.events.append(event)
+            self._condition.notify_all()
+
+    def finish(self, result):
+        """记录任务结果，并在同一步中记录结束事件（流式读取的客户端不会在结束事件之前断开）"""
+        with self._condition:
+            super().finish(result)
+            if self.success:
+                self.add_event('done', status=self.status, transcript_file=self.result.get('transcript_file'))
+            else:
+                self.add_event(self.status, status=self.status, error=self.error)
+
+    def report_progress(self):
+        """任务进度每变化 1% 记录一次进度事件"""
+        percent = int(self.progress * 100)
+        if percent > self._reported_progress:
+            self._reported_progress = percent
+            self.add_event('progress', progress=self.progress)
+
+    def wait_events(self, since, timeout):
+        """
+        等待新事件
+
+        Args:
+            since (int): 已读取的事件数
+            timeout (float): 最长等待时间（秒）
+
+        Returns:
+            list: 新事件列表，超时时为空
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: len(self.events) > since or self.finished, timeout)
+            return list(self.events[since:])
+
+    def to_dict(self):
+        """转换为字典，便于序列化"""
+        data = super().to_dict()
+        data.pop('index', None)
+        data.update({
+            'id': self.id,
+            'kind': self.kind,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'event_count': len(self.events),
+            'priority': self.priority,
+            'submitter': self.submitter,
+            'estimated_cost': self.cost
+        })
+        return data
+
+
+class JobService:
+    """任务队列与工作线程"""
+
+    def __init__(self, manager=None, workers=None, queue_size=None, max_finished_jobs=None):
+        """
+        初始化任务服务
+
+        Args:
+            manager (TaskManager): 任务管理器，默认新建
+            workers (int): 工作线程数，默认读取 [server] workers
+            queue_size (int): 排队任务上限，默认读取 [server] queue_size
+            max_finished_jobs (int): 内存中保留的已结束任务数，默认读取 [server] max_finished_jobs
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        if manager is None:
+            from .manager import TaskManager
+            manager = TaskManager()
+        if workers is None:
+            workers = self.config.server_workers
+        if queue_size is None:
+            queue_size = self.config.server_queue_size
+        if max_finished_jobs is None:
+            max_finished_jobs = self.config.server_max_finished_jobs
+
+        self.manager = manager
+        self.workers = max(1, int(workers))
+        self.max_finished_jobs = max(0, int(max_finished_jobs))
+
+        self._queue = PriorityJobQueue(maxsize=max(1, int(queue_size)))
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """启动工作线程"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'streamscribe-server-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info(f"任务服务已启动，工作线程: {self.workers}，队列上限: {self._queue.maxsize}")
+
+    def stop(self, wait=False, cancel=False):
+        """
+        停止工作线程（队列中剩余的任务不再处理）
+
+        Args:
+            wait (bool): 是否等待工作线程退出
+            cancel (bool): 是否取消正在处理的任务，否则等它们完成
+        """
+        if cancel:
+            for job in self.list_jobs():
+                if not job.finished:
+                    self.cancel(job.id, "任务服务已停止")
+
+        self._queue.close(discard=True)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def submit(self, source, kind=None, priority=None, submitter=None):
+        """
+        提交任务
+
+        Args:
+            source (str): URL 或本地文件路径
+            kind (str): 'url' 或 'file'，默认根据 source 判断
+            priority: 优先级（high / normal / low 或整数），默认为 normal
+            submitter (str): 提交者，同一优先级内各提交者的任务轮流处理
+
+        Returns:
+            ServerJob: 新任务
+
+        Raises:
+            ValueError: 来源无效
+            queue.Full: 队列已满
+        """
+        source = (source or '').strip()
+        if not source:
+            raise ValueError("缺少 url 或 path")
+
+        if kind is None:
+            kind = 'url' if validate_url(source) else 'file'
+
+        if kind == 'url':
+            if not validate_url(source):
+                raise ValueError(f"无效的 URL: {source}")
+        elif kind == 'file':
+            source = os.path.abspath(source)
+            if not os.path.isfile(source):
+                raise ValueError(f"文件不存在: {source}")
+        else:
+            raise ValueError(f"未知的任务类型: {kind}")
+
+        job = ServerJob(kind, source)
+        job.priority = parse_priority(priority)
+        job.submitter = str(submitter) if submitter else None
+        if self.config.cost_scheduling and kind == 'url':
+            # 视频只读取视频信息缓存；本地文件不在请求线程中运行 ffprobe，成本未知，由工作线程开始处理时补上
+            job.cost = self.manager.estimate_cost(kind, source)
+
+        # 先记录排队事件，避免工作线程取出任务后 running 事件排在它前面
+        job.add_event('status', status='queued')
+        with self._lock:
+            self._queue.put_nowait(job, job.priority, job.cost, job.submitter)
+            self._jobs[job.id] = job
+            self._prune()
+
+        self.logger.info(f"任务已提交 {job.label}: {source}")
+        return job
+
+    def cancel(self, job_id, reason="任务已取消"):
+        """
+        取消任务：排队中的任务直接结束，运行中的任务立即终止其外部进程并释放工作线程
+
+        Args:
+            job_id (str): 任务 ID
+            reason (str): 取消原因
+
+        Returns:
+            ServerJob: 任务，不存在时返回 None
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+
+            job.cancel(reason)
+            if job.status == 'queued':
+                # 排队中的任务直接结束并移出队列，不再占用队列容量
+                job.fail(reason)
+                self._queue.discard(job)
+
+        self.logger.info(f"任务已取消 {job.label}")
+        return job
+
+    def get(self, job_id):
+        """
+        查询任务
+
+        Args:
+            job_id (str): 任务 ID
+
+        Returns:
+            ServerJob: 任务，不存在时返回 None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        """
+        列出任务（按提交时间排序）
+
+        Returns:
+            list: ServerJob 列表
+        """
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+
+    def stats(self):
+        """
+        统计各状态的任务数
+
+        Returns:
+            dict: 状态 -> 任务数
+        """
+        counts = {}
+        for job in self.list_jobs():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def _prune(self):
+        """丢弃最早结束的任务，使内存中的已结束任务不超过上限（调用方持有锁）"""
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished),
+            key=lambda job: job.finished_at
+        )
+        for job in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job.id]
+
+    def _worker(self):
+        """工作线程：依次处理队列中的任务"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._run_job(job)
+
+    def _run_job(self, job):
+        """执行单个任务"""
+        def status_callback(message):
+            job.add_event('status', message=message)
+
+        with self._lock:
+            # 排队期间已被取消
+            if job.finished:
+                return
+            job.start('running', timeout=self.config.job_timeout)
+        job.add_event('status', status='running')
+
+        try:
+            if job.cost is None and job.kind == 'file' and self.config.cost_scheduling:
+                # ffprobe 的结果会被随后的处理复用
+                job.cost = self.manager.estimate_cost(job.kind, job.source)
+
+            if job.kind == 'url':
+                process = self.manager.process_url
+            else:
+                process = self.manager.process_local_file
+            job.finish(process(
+                job.source, status_callback, job.bind_progress_callback(job.report_progress), job.cancel_token
+            ))
+        except Exception as e:
+            self.logger.error(f"任务 {job.label} 执行异常: {e}")
+            job.fail(e)
+
+        with self._lock:
+            self._prune()
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """HTTP 请求处理"""
+
+    server_version = 'StreamScribe'
+
+    # 流式事件接口等待新事件的间隔（秒），超时后发送空行保持连接
+    EVENT_POLL_INTERVAL = 15
+
+    @property
+    def service(self):
+        """任务服务实例"""
+        return self.server.service
+
+    def log_message(self, format, *args):
+        """访问日志写入 logging 而不是标准错误"""
+        logging.getLogger(__name__).debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status, data, headers=None):
+        """发送 JSON 响应"""
+        body = json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        """发送错误响应"""
+        self._send_json(status, {'error': message})
+
+    def _route(self):
+        """
+        解析请求路径
+
+        Returns:
+            tuple: (路径片段列表, 查询参数字典)
+        """
+        parts = urlsplit(self.path)
+        segments = [segment for segment in parts.path.split('/') if segment]
+        return segments, parse_qs(parts.query)
+
+    def _read_json(self):
+        """读取 JSON 请求体"""
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_BODY:
+            raise ValueError("请求体过大")
+        if length <= 0:
+            return {}
+        data = json.loads(self.rfile.read(length).decode('utf-8'))
+        if not isinstance(data, dict):
+            raise ValueError("请求体必须是 JSON 对象")
+        return data
+
+    def do_POST(self):
+        """POST /jobs"""
+        segments, _ = self._route()
+        if segments != ['jobs']:
+            self._send_error(HTTPStatus.NOT_FOUND, "未知的接口")
+            return
+
+        try:
+            data = self._read_json()
+            priority = data.get('priority')
+            submitter = data.get('submitter') or self.client_address[0]
+            if data.get('url'):
+                job = self.service.submit(data['url'], 'url', priority, submitter)
+            elif data.get('path'):
+                job = self.service.submit(data['path'], 'file', priority, submitter)
+            else:
+                job = self.service.submit(data.get('source'), None, priority, submitter)
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        except queue.Full:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, "任务队列已满，请稍后重试")
+            return
+
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict(), {'Location': f'/jobs/{job.id}'})
+
+    def do_GET(self):
+        """GET 接口"""
+        segments, query = self._route()
+
+        if segments == ['health']:
+            self._send_json(HTTPStatus.OK, {'status': 'ok', 'jobs': self.service.stats()})
+            return
+
+        if segments == ['jobs']:
+            self._send_json(HTTPStatus.OK, {'jobs': [job.to_dict() for job in self.service.list_jobs()]})
+            return
+
+        if len(segments) < 2 or segments[0] != 'jobs' or len(segments) > 3:
+            self._send_error(HTTPStatus.NOT_FOUND, "未知的接口")
+            return
+
+        job = self.service.get(segments[1])
+        if job is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "任务不存在")
+            return
+
+        action = segments[2] if len(segments) == 3 else None
+        if action is None:
+            self._send_json(HTTPStatus.OK, job.to_dict())
+        elif action == 'events':
+            self._stream_events(job, query)
+        elif action == 'transcript':
+            self._send_transcript(job)
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, "未知的接口")
+
+    def do_DELETE(self):
+        """DELETE /jobs/<id>"""
+        segments, _ = self._route()
+        if len(segments) != 2 or segments[0] != 'jobs':
+            self._send_error(HTTPStatus.NOT_FOUND, "未知的接口")
+            return
+
+        job = self.service.get(segments[1])
+        if job is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "任务不存在")
+            return
+        if job.finished:
+            self._send_error(HTTPStatus.CONFLICT, "任务已结束")
+            return
+
+        self.service.cancel(job.id)
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict())
+
+    def _stream_events(self, job, query):
+        """以 JSON 行流式返回任务事件，任务结束后关闭连接"""
+        try:
+            since = max(0, int(query.get('since', ['0'])[0]))
+        except ValueError:
+            self._send_error(HTTPStatus.BAD_REQUEST, "since 必须是整数")
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            while True:
+                events = job.wait_events(since, self.EVENT_POLL_INTERVAL)
+                if events:
+                    for event in events:
+                        self.wfile.write((json.dumps(event, ensure_ascii=False, default=str) + '\n').encode('utf-8'))
+                    since += len(events)
+                elif not job.finished:
+                    self.wfile.write(b'\n')
+                self.wfile.flush()
+
+                if job.finished and since >= len(job.events):
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_transcript(self, job):
+        """返回任务生成的文稿文件"""
+        if not job.finished:
+            self._send_error(HTTPStatus.CONFLICT, "任务尚未完成")
+            return
+
+        transcript_file = job.result.get('transcript_file') if job.success else None
+        if not transcript_file or not os.path.isfile(transcript_file):
+            self._send_error(HTTPStatus.NOT_FOUND, job.error or "文稿文件不存在")
+            return
+
+        with open(transcript_file, 'rb') as f:
+            body = f.read()
+
+        content_type = 'application/x-subrip' if transcript_file.lower().endswith('.srt') else 'text/plain'
+        filename = os.path.basename(transcript_file)
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{quote(filename)}")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(service, host=None, port=None):
+    """
+    创建 HTTP 服务器（不启动）
+
+    Args:
+        service (JobService): 任务服务
+        host (str): 监听地址，默认读取 [server] host
+        port (int): 端口，默认读取 [server] port，0 表示随机端口
+
+    Returns:
+        ThreadingHTTPServer: HTTP 服务器，service 属性指向任务服务
+    """
+    config = get_config()
+    if host is None:
+        host = config.server_host
+    if port is None:
+        port = config.server_port
+
+    server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(host=None, port=None, workers=None, queue_size=None):
+    """
+    启动 HTTP 任务服务并阻塞运行，直到被中断
+
+    Args:
+        host (str): 监听地址
+        port (int): 端口
+        workers (int): 工作线程数
+        queue_size (int): 排队任务上限
+    """
+    service = JobService(workers=workers, queue_size=queue_size)
+    server = create_server(service, host, port)
+    service.start()
+
+    address, bound_port = server.server_address[:2]
+    print(f"🌐 任务服务已启动: http://{address}:{bound_port}/jobs")
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.stop(cancel=True)
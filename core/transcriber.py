@@ -9,9 +9,20 @@ import subprocess
 import logging
 import time
 import re
-import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from .config import get_config
+from .cache import get_transcript_cache
+from .cancel import JobCancelledError, bind_token, current_token
+from .coalesce import get_in_flight_table
+from .utils import compute_file_hash
+from .whisper_engine import get_whisper_engine
+from .process import ProgressParser, make_progress_handler, run_process
+from .chunking import detect_silences, plan_chunks, split_audio, merge_transcripts
+from .media import get_media_duration
+from .workspace import JobWorkspace
 
 
 class WhisperTranscriber:
@@ -21,6 +32,9 @@ class WhisperTranscriber:
         """初始化转录器"""
         self.config = get_config()
         self.logger = logging.getLogger(__name__)
+        self.transcript_cache = get_transcript_cache()
+        # 进行中的转录（按文稿缓存键），相同音频同时转录时只运行一次 Whisper
+        self.in_flight = get_in_flight_table('transcripts')
         self.debug_callback = None
 
     def set_debug_callback(self, callback):
@@ -42,47 +56,24 @@ class WhisperTranscriber:
         Returns:
             float: 音频时长（秒），如果获取失败返回0
         """
-        ffprobe_commands = [
-            'ffprobe',  # 系统 PATH 中的 ffprobe
-            'J:\\app\\ffmpeg\\bin\\ffprobe.exe',  # 常见的 ffprobe 位置
-        ]
-
-        for ffprobe_cmd in ffprobe_commands:
-            try:
-                command = [
-                    ffprobe_cmd,
-                    '-v', 'error',
-                    '-show_entries', 'format=duration',
-                    '-of', 'json',
-                    audio_path
-                ]
-
-                result = subprocess.run(
-                    command,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-
-                if result.returncode == 0:
-                    data = json.loads(result.stdout)
-                    duration = float(data.get('format', {}).get('duration', 0))
-                    self.logger.info(f"音频时长: {duration:.2f}秒")
-                    return duration
-
-            except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError, json.JSONDecodeError, ValueError):
-                continue
-
-        self.logger.warning("无法获取音频时长，将使用0作为默认值")
-        return 0.0
+        duration = get_media_duration(audio_path)
+        if duration:
+            self.logger.info(f"音频时长: {duration:.2f}秒")
+        else:
+            self.logger.warning("无法获取音频时长，将使用0作为默认值")
+        return duration
 
-    def run_whisper(self, audio_path, output_dir=None):
+    def run_whisper(self, audio_path, output_dir=None, status_callback=None, progress_callback=None, workspace=None):
         """
         使用 Whisper 转录音频文件
 
         Args:
             audio_path (str): 音频文件路径
             output_dir (str): 输出目录，默认使用配置中的输出目录
+            status_callback (callable): 状态回调函数，用于显示转录百分比和剩余时间
+            progress_callback (callable): 进度回调函数，签名为 progress_callback(stage, fraction, eta)
+            workspace (JobWorkspace): 任务工作目录，whisper 先输出到这里再移动到输出目录；
+                默认创建临时工作目录，转录结束后删除
 
         Returns:
             dict: 包含以下键的字典:
@@ -90,6 +81,7 @@ class WhisperTranscriber:
                 - audio_duration (float): 音频时长（秒）
                 - processing_time (float): 处理时间（秒）
                 - speed_ratio (float): 加速倍率（音频时长/处理时间）
+                - mode (str): 转录方式（chunked / engine / process），缓存命中时为 cached
 
         Raises:
             FileNotFoundError: 当音频文件或 Whisper 环境不存在时
@@ -107,82 +99,58 @@ class WhisperTranscriber:
         # 确保输出目录存在
         Path(output_dir).mkdir(parents=True, exist_ok=True)
 
+        # 记录开始时间
+        start_time = time.time()
+
+        # 相同音频内容 + 相同转录参数时直接使用缓存的文稿
+        cache_key = self._get_cache_key(audio_path, output_dir)
+        cached_result = self._load_cached_transcript(cache_key, audio_path, output_dir, start_time)
+        if cached_result:
+            return cached_result
+
         # 获取音频时长
         audio_duration = self._get_audio_duration(audio_path)
 
-        # 记录开始时间
+        # 记录开始时间（不含缓存查询和时长探测）
         start_time = time.time()
 
-        # 使用 whisper-ctranslate2 进行转录
+        # 根据分段时间戳和音频时长计算转录进度
+        progress_handler = make_progress_handler(
+            'transcribe', "正在转录音频", status_callback, progress_callback
+        )
+
+        in_flight = self._claim_transcription(cache_key)
+        if in_flight is None:
+            # 相同音频的转录已经完成，结果在文稿缓存中
+            cached_result = self._load_cached_transcript(cache_key, audio_path, output_dir, start_time)
+            if cached_result:
+                cached_result['coalesced'] = True
+                return cached_result
+
+        own_workspace = workspace is None
+        if own_workspace:
+            workspace = JobWorkspace()
+
+        # 长音频优先分段并行转录，其次使用常驻引擎，都不可用时回退到 whisper-ctranslate2 子进程
         try:
-            command = self._build_whisper_command(audio_path, output_dir)
-            self.logger.info(f"执行 whisper-ctranslate2 命令: {' '.join(command)}")
-
-            # 打印完整命令供用户复制测试
-            command_str = ' '.join(command)
-            print(f"\n🔍 执行 whisper-ctranslate2 转录:")
-            print(f"📋 {command_str}")
-            print()
-
-            # 发送到调试窗口
-            self._debug_log(f"🔍 执行 whisper-ctranslate2 转录:")
-            self._debug_log(f"📋 {command_str}")
-
-            # 设置环境变量解决编码问题
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            env['PYTHONUTF8'] = '1'
-
-            # 执行命令
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=False,  # 使用字节模式避免编码问题
-                timeout=3600,  # 1小时超时
-                env=env
-            )
+            transcript_file = None
+            mode = None
+            if self._should_chunk(audio_duration):
+                transcript_file = self._run_chunked(audio_path, output_dir, audio_duration, progress_handler, workspace)
+                mode = 'chunked'
+            if not transcript_file and self.config.whisper_persistent_engine:
+                transcript_file = self._run_engine(audio_path, output_dir, audio_duration, progress_handler)
+                mode = 'engine'
+            if not transcript_file:
+                # 输出到任务自己的目录，文件名确定后再移动到输出目录
+                staged_file = self._run_whisper_process(
+                    audio_path, workspace.subdir('whisper'), audio_duration, progress_handler
+                )
+                transcript_file = self._move_to_output(staged_file, output_dir)
+                mode = 'process'
 
-            # 解码输出信息（无论成功还是失败都要看）
-            stdout_msg = ""
-            stderr_msg = ""
-
-            try:
-                stdout_msg = result.stdout.decode('utf-8', errors='ignore')
-            except:
-                try:
-                    stdout_msg = result.stdout.decode('gbk', errors='ignore')
-                except:
-                    stdout_msg = str(result.stdout)
-
-            try:
-                stderr_msg = result.stderr.decode('utf-8', errors='ignore')
-            except:
-                try:
-                    stderr_msg = result.stderr.decode('gbk', errors='ignore')
-                except:
-                    stderr_msg = str(result.stderr)
-
-            # 记录whisper的输出
-            if stdout_msg.strip():
-                self.logger.info(f"whisper stdout: {stdout_msg.strip()}")
-            if stderr_msg.strip():
-                self.logger.info(f"whisper stderr: {stderr_msg.strip()}")
-
-            if result.returncode != 0:
-                self.logger.error(f"whisper-ctranslate2 执行失败，返回码: {result.returncode}")
-                self.logger.error(f"错误信息: {stderr_msg}")
-                raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
-
-            # 从whisper输出中解析生成的文件名
-            self.logger.info("whisper-ctranslate2 执行完成，开始查找生成的文稿文件")
-
-            transcript_file = self._parse_transcript_file_from_output(stdout_msg, stderr_msg, audio_path, output_dir)
-
-            if not transcript_file or not os.path.exists(transcript_file):
-                self.logger.error("未找到生成的文稿文件")
-                self.logger.error(f"预期的音频文件名: {Path(audio_path).stem}")
-                self.logger.error(f"输出目录: {output_dir}")
-                raise Exception("未找到生成的文稿文件")
+            # 写入文稿缓存
+            self.transcript_cache.set(cache_key, transcript_file, audio_duration)
 
             # 计算处理时间和加速倍率
             end_time = time.time()
@@ -193,38 +161,395 @@ class WhisperTranscriber:
             self.logger.info(f"⏱️  处理时间: {processing_time:.2f}秒")
             self.logger.info(f"🎵 音频时长: {audio_duration:.2f}秒")
             self.logger.info(f"⚡ 加速倍率: {speed_ratio:.2f}x")
+            self.logger.info(f"🧭 转录方式: {mode}")
 
             # 打印到控制台
             print(f"\n✅ 转录完成！")
             print(f"⏱️  处理时间: {processing_time:.2f}秒")
             print(f"🎵 音频时长: {audio_duration:.2f}秒")
-            print(f"⚡ 加速倍率: {speed_ratio:.2f}x\n")
+            print(f"⚡ 加速倍率: {speed_ratio:.2f}x")
+            print(f"🧭 转录方式: {mode}\n")
 
             return {
                 'transcript_file': transcript_file,
                 'audio_duration': audio_duration,
                 'processing_time': processing_time,
-                'speed_ratio': speed_ratio
+                'speed_ratio': speed_ratio,
+                'mode': mode
             }
 
         except subprocess.TimeoutExpired:
             raise Exception("Whisper 执行超时")
+        except JobCancelledError:
+            self.logger.info(f"转录已取消: {audio_path}")
+            raise
         except Exception as e:
             self.logger.error(f"转录过程中出错: {str(e)}")
             raise
+        finally:
+            if in_flight:
+                self.in_flight.release(cache_key, in_flight)
+            if own_workspace:
+                workspace.cleanup()
+
+    def _claim_transcription(self, cache_key):
+        """
+        登记进行中的转录；相同音频和参数的转录正在进行时等待其结束
+
+        Args:
+            cache_key (str): 文稿缓存键
+
+        Returns:
+            Future: 本次转录由自己执行时返回 Future，结束后需要 release；
+                等待了其他转录或未启用合并时返回 None
+        """
+        if not cache_key or not self.config.coalesce_jobs:
+            return None
+
+        future, owner = self.in_flight.claim(cache_key)
+        if owner:
+            return future
+
+        self.logger.info("相同的音频正在转录，等待其结果")
+        print("⏳ 相同的音频正在转录，等待其结果...")
+        self.in_flight.wait(future)
+        return None
+
+    def _move_to_output(self, transcript_file, output_dir):
+        """
+        将工作目录中的文稿移动到输出目录
+
+        Args:
+            transcript_file (str): 工作目录中的文稿文件
+            output_dir (str): 输出目录
+
+        Returns:
+            str: 输出目录中的文稿文件路径
+        """
+        destination = os.path.join(output_dir, os.path.basename(transcript_file))
+        shutil.move(transcript_file, destination)
+        return destination
     
-    def _build_whisper_command(self, audio_path, output_dir):
+    def _run_whisper_process(self, audio_path, output_dir, audio_duration=0, progress_handler=None, threads=None):
         """
-        构建 whisper-ctranslate2 命令
+        启动 whisper-ctranslate2 子进程转录
+
+        Args:
+            audio_path (str): 音频文件路径
+            output_dir (str): 输出目录（任务独占的工作目录）
+            audio_duration (float): 音频时长（秒），用于计算进度
+            progress_handler (callable): 进度处理函数，签名为 handler(fraction, eta)
+            threads (int): CPU 线程数，默认由 whisper-ctranslate2 决定
+
+        Returns:
+            str: 生成的文稿文件路径
+        """
+        command = self._build_whisper_command(audio_path, output_dir, threads)
+        self.logger.info(f"执行 whisper-ctranslate2 命令: {' '.join(command)}")
+
+        # 打印完整命令供用户复制测试
+        command_str = ' '.join(command)
+        print(f"\n🔍 执行 whisper-ctranslate2 转录:")
+        print(f"📋 {command_str}")
+        print()
+
+        # 发送到调试窗口
+        self._debug_log(f"🔍 执行 whisper-ctranslate2 转录:")
+        self._debug_log(f"📋 {command_str}")
+
+        # 设置环境变量解决编码问题
+        env = os.environ.copy()
+        env['PYTHONIOENCODING'] = 'utf-8'
+        env['PYTHONUTF8'] = '1'
+
+        # 执行命令，逐行读取输出并根据分段时间戳更新进度
+        result = run_process(
+            command,
+            timeout=3600,  # 1小时超时
+            progress_parser=ProgressParser('whisper', audio_duration),
+            progress_handler=progress_handler,
+            env=env
+        )
+
+        stdout_msg = result.stdout
+        stderr_msg = result.stderr
+
+        # 记录whisper的输出（只保留最后若干行）
+        if stdout_msg.strip():
+            self.logger.info(f"whisper stdout: {stdout_msg.strip()}")
+        if stderr_msg.strip():
+            self.logger.info(f"whisper stderr: {stderr_msg.strip()}")
+
+        if result.returncode != 0:
+            self.logger.error(f"whisper-ctranslate2 执行失败，返回码: {result.returncode}")
+            self.logger.error(f"错误信息: {stderr_msg}")
+            raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+
+        # 从whisper输出中解析生成的文件名
+        self.logger.info("whisper-ctranslate2 执行完成，开始查找生成的文稿文件")
+
+        transcript_file = self._parse_transcript_file_from_output(stdout_msg, stderr_msg, audio_path, output_dir)
+
+        if not transcript_file or not os.path.exists(transcript_file):
+            self.logger.error("未找到生成的文稿文件")
+            self.logger.error(f"预期的音频文件名: {Path(audio_path).stem}")
+            self.logger.error(f"输出目录: {output_dir}")
+            raise Exception("未找到生成的文稿文件")
+
+        return transcript_file
+
+    def _should_chunk(self, audio_duration):
+        """判断是否使用分段并行转录（至少能切成两段且并行进程数大于1）"""
+        return (
+            self.config.whisper_chunked_mode
+            and self.config.whisper_chunk_workers > 1
+            and audio_duration >= self.config.whisper_chunk_seconds * 2
+        )
+
+    def _run_chunked(self, audio_path, output_dir, audio_duration, progress_handler, workspace):
+        """
+        分段并行转录：在静音处切分音频，多个 whisper-ctranslate2 进程同时转录后拼接
 
         Args:
             audio_path (str): 音频文件路径
             output_dir (str): 输出目录
+            audio_duration (float): 音频时长（秒）
+            progress_handler (callable): 进度处理函数，签名为 handler(fraction, eta)
+            workspace (JobWorkspace): 任务工作目录，分段文件和各段文稿都放在其中
 
         Returns:
-            list: 命令参数列表
+            str: 拼接后的文稿文件路径，切分或转录失败时返回 None
+        """
+        workers = self.config.whisper_chunk_workers
+        chunk_dir = workspace.subdir('chunks')
+
+        try:
+            silences = detect_silences(audio_path)
+            chunks = plan_chunks(audio_duration, silences, self.config.whisper_chunk_seconds)
+            if len(chunks) < 2:
+                return None
+
+            chunk_files = split_audio(audio_path, chunks, chunk_dir)
+            if not chunk_files:
+                self.logger.warning("音频切分失败，回退到整段转录")
+                return None
+
+            # 每个进程分到的 CPU 线程数，避免多个进程争抢同一批核心
+            threads = max(1, (os.cpu_count() or workers) // workers)
+
+            print(f"\n🧩 分段并行转录: {len(chunks)} 段，{workers} 个进程，每个进程 {threads} 线程")
+            self._debug_log(f"🧩 分段并行转录: {len(chunks)} 段，{workers} 个进程，每个进程 {threads} 线程")
+
+            fractions = [0.0] * len(chunks)
+            lock = threading.Lock()
+            start_time = time.time()
+            # 线程池中的线程不会继承当前任务的取消令牌，需要显式绑定
+            token = current_token()
+
+            def transcribe_chunk(i):
+                start, end = chunks[i]
+                chunk_output_dir = os.path.join(chunk_dir, f"out_{i:03d}")
+                os.makedirs(chunk_output_dir, exist_ok=True)
+
+                def chunk_progress(fraction, eta):
+                    # 按各段时长加权汇总为整体进度
+                    with lock:
+                        fractions[i] = fraction
+                        done = sum(f * (e - s) for f, (s, e) in zip(fractions, chunks)) / audio_duration
+                    if progress_handler and done > 0:
+                        elapsed = time.time() - start_time
+                        progress_handler(done, elapsed * (1 - done) / done)
+
+                with bind_token(token):
+                    return self._run_whisper_process(
+                        chunk_files[i], chunk_output_dir, end - start, chunk_progress, threads
+                    )
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='streamscribe-chunk') as pool:
+                transcript_files = list(pool.map(transcribe_chunk, range(len(chunks))))
+
+            output_format = 'srt' if self.config.whisper_output_format_srt else 'txt'
+            transcript_file = os.path.join(output_dir, f"{Path(audio_path).stem}.{output_format}")
+            merge_transcripts(
+                [(part, start) for part, (start, _) in zip(transcript_files, chunks)],
+                transcript_file,
+                output_format
+            )
+            return transcript_file
+
+        except JobCancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"分段并行转录失败，回退到整段转录: {e}")
+            self._debug_log(f"⚠️ 分段并行转录失败，回退到整段转录: {e}")
+            return None
+
+        finally:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+
+    def _run_engine(self, audio_path, output_dir, audio_duration=0, progress_handler=None):
+        """
+        使用常驻 Whisper 引擎转录（模型只加载一次）
+
+        Args:
+            audio_path (str): 音频文件路径
+            output_dir (str): 输出目录
+            audio_duration (float): 音频时长（秒），用于计算进度
+            progress_handler (callable): 进度处理函数，签名为 handler(fraction, eta)
+
+        Returns:
+            str: 生成的文稿文件路径，引擎不可用或转录失败时返回 None
+        """
+        try:
+            engine = get_whisper_engine(self._get_engine_python(), self._get_engine_model_options())
+            output_format = 'srt' if self.config.whisper_output_format_srt else 'txt'
+            options = {
+                'language': self._get_whisper_language(),
+                'initial_prompt': self.config.whisper_initial_prompt,
+                'vad_filter': self.config.whisper_vad_filter,
+                'output_format': output_format
+            }
+
+            print(f"\n🔍 使用常驻 Whisper 引擎转录: {audio_path}")
+            self._debug_log(f"🔍 使用常驻 Whisper 引擎转录: {audio_path}")
+
+            transcript_file = engine.transcribe(
+                audio_path, output_dir, options,
+                progress_parser=ProgressParser('whisper', audio_duration),
+                progress_handler=progress_handler
+            )
+            if transcript_file and os.path.exists(transcript_file):
+                return transcript_file
+
+            self.logger.warning("常驻 Whisper 引擎未生成文稿文件")
+
+        except JobCancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"常驻 Whisper 引擎不可用，回退到 whisper-ctranslate2: {e}")
+            self._debug_log(f"⚠️ 常驻 Whisper 引擎不可用，回退到 whisper-ctranslate2: {e}")
+
+        return None
+
+    def _get_engine_python(self):
+        """获取常驻引擎使用的 Python（默认与 whisper-ctranslate2 位于同一目录）"""
+        if self.config.whisper_engine_python:
+            return self.config.whisper_engine_python
+
+        scripts_dir = os.path.dirname(self._get_whisper_exe())
+        python_name = 'python.exe' if os.name == 'nt' else 'python'
+        return os.path.join(scripts_dir, python_name)
+
+    def _get_engine_model_options(self):
+        """获取常驻引擎的模型参数（与 _build_whisper_command 保持一致）"""
+        current_model = self.config.whisper_model
+        options = {
+            'model': current_model,
+            'model_directory': self.config.get_model_directory(current_model),
+            'device': self.config.whisper_device,
+            'compute_type': self.config.get_compute_type_for_model(current_model)
+        }
+        if self.config.whisper_device == 'cuda':
+            options['device_index'] = self.config.whisper_device_index
+        return options
+
+    def _get_cache_key(self, audio_path, output_dir):
+        """
+        计算文稿缓存键（音频内容哈希 + 有效转录参数）
+
+        Args:
+            audio_path (str): 音频文件路径
+            output_dir (str): 输出目录
+
+        Returns:
+            str: 缓存键，缓存未启用或计算失败时返回 None
+        """
+        if not self.transcript_cache.enabled:
+            return None
+
+        try:
+            command = self._build_whisper_command(audio_path, output_dir)
+            params = self._get_transcription_params(command)
+            return self.transcript_cache.make_key(compute_file_hash(audio_path), params)
+        except Exception as e:
+            self.logger.warning(f"计算文稿缓存键失败: {e}")
+            return None
+
+    def _get_transcription_params(self, command):
+        """
+        从 whisper 命令中提取影响转录结果的参数
+
+        去掉可执行文件、音频路径和输出目录，保留模型、量化类型、语言、提示词、VAD、输出格式等。
+
+        Args:
+            command (list): _build_whisper_command 生成的命令
+
+        Returns:
+            list: 参数列表
+        """
+        params = []
+        args = command[2:]
+        i = 0
+        while i < len(args):
+            if args[i] == '--output_dir':
+                i += 2
+                continue
+            params.append(args[i])
+            i += 1
+        return params
+
+    def _load_cached_transcript(self, cache_key, audio_path, output_dir, start_time):
+        """
+        从文稿缓存中恢复文稿文件
+
+        Args:
+            cache_key (str): 缓存键
+            audio_path (str): 音频文件路径
+            output_dir (str): 输出目录
+            start_time (float): 开始处理的时间戳
+
+        Returns:
+            dict: 与 run_whisper 相同格式的结果，未命中时返回 None
+        """
+        cached = self.transcript_cache.get(cache_key)
+        if not cached:
+            return None
+
+        transcript_file = os.path.join(output_dir, f"{Path(audio_path).stem}{cached['ext']}")
+        try:
+            with open(transcript_file, 'w', encoding='utf-8') as f:
+                f.write(cached['content'])
+        except OSError as e:
+            self.logger.warning(f"恢复缓存文稿失败: {e}")
+            return None
+
+        audio_duration = cached['audio_duration']
+        processing_time = time.time() - start_time
+        speed_ratio = audio_duration / processing_time if processing_time > 0 and audio_duration > 0 else 0
+
+        self.logger.info(f"命中文稿缓存，文稿文件: {transcript_file}")
+        print(f"\n📦 命中文稿缓存，跳过转录: {transcript_file}\n")
+        self._debug_log(f"📦 命中文稿缓存，跳过转录: {transcript_file}")
+
+        return {
+            'transcript_file': transcript_file,
+            'audio_duration': audio_duration,
+            'processing_time': processing_time,
+            'speed_ratio': speed_ratio,
+            'mode': 'cached',
+            'cached': True
+        }
+
+    def _get_whisper_exe(self):
+        """
+        获取 whisper-ctranslate2 可执行文件路径（优先从tools_path.txt读取）
+
+        Returns:
+            str: 可执行文件路径
+
+        Raises:
+            FileNotFoundError: 当可执行文件不存在时
         """
-        # 获取whisper-ctranslate2可执行文件路径（优先从tools_path.txt读取）
         if hasattr(self.config, '_tools_paths') and self.config._tools_paths and 'whisper_exe' in self.config._tools_paths:
             whisper_exe = self.config._tools_paths['whisper_exe']
         else:
@@ -235,6 +560,42 @@ class WhisperTranscriber:
         if not os.path.exists(whisper_exe):
             raise FileNotFoundError(f"whisper-ctranslate2 可执行文件不存在: {whisper_exe}")
 
+        return whisper_exe
+
+    def _get_whisper_language(self):
+        """
+        获取 Whisper 语言参数
+
+        Returns:
+            str: whisper-ctranslate2 支持的语言代码，自动检测时返回 None
+        """
+        if self.config.whisper_language == 'auto':
+            return None
+
+        # 将语言代码转换为 whisper-ctranslate2 支持的格式
+        language_map = {
+            'zh': 'zh',
+            'zh-Hans': 'zh',
+            'zh-Hant': 'zh',
+            'en': 'en',
+            'auto': None
+        }
+        return language_map.get(self.config.whisper_language, self.config.whisper_language)
+
+    def _build_whisper_command(self, audio_path, output_dir, threads=None):
+        """
+        构建 whisper-ctranslate2 命令
+
+        Args:
+            audio_path (str): 音频文件路径
+            output_dir (str): 输出目录
+            threads (int): CPU 线程数（分段并行转录时使用）
+
+        Returns:
+            list: 命令参数列表
+        """
+        whisper_exe = self._get_whisper_exe()
+
         # 获取当前模型
         current_model = self.config.whisper_model
 
@@ -273,23 +634,17 @@ class WhisperTranscriber:
                 command.extend(['--device_index', str(self.config.whisper_device_index)])
 
         # 添加语言设置（如果不是自动检测）
-        if self.config.whisper_language != 'auto':
-            # 将语言代码转换为 whisper-ctranslate2 支持的格式
-            language_map = {
-                'zh': 'zh',
-                'zh-Hans': 'zh',
-                'zh-Hant': 'zh',
-                'en': 'en',
-                'auto': None
-            }
-            language = language_map.get(self.config.whisper_language, self.config.whisper_language)
-            if language:
-                command.extend(['--language', language])
+        language = self._get_whisper_language()
+        if language:
+            command.extend(['--language', language])
 
         # 添加初始提示词（提高中文识别准确度）
         if self.config.whisper_initial_prompt:
             command.extend(['--initial_prompt', self.config.whisper_initial_prompt])
 
+        if threads:
+            command.extend(['--threads', str(threads)])
+
         return command
 
     def _parse_transcript_file_from_output(self, stdout_msg, stderr_msg, audio_path, output_dir):
@@ -341,11 +696,14 @@ class WhisperTranscriber:
 
     def _find_transcript_file(self, audio_path, output_dir):
         """
-        查找生成的文稿文件（基于文件名匹配）
+        查找生成的文稿文件
+
+        output_dir 是任务独占的工作目录，先按音频文件名精确匹配，
+        whisper 修改了文件名时（截断长文件名、替换特殊字符）目录中也只有本任务的输出。
 
         Args:
             audio_path (str): 原始音频文件路径
-            output_dir (str): 输出目录
+            output_dir (str): whisper 的输出目录
 
         Returns:
             str: 文稿文件路径，如果未找到则返回 None
@@ -361,72 +719,26 @@ class WhisperTranscriber:
 
         self.logger.info(f"查找转录文件，音频文件名: {audio_name}")
 
-        # 方法1：精确匹配
         for ext in possible_extensions:
             transcript_file = os.path.join(output_dir, f"{audio_name}{ext}")
-
             if os.path.exists(transcript_file):
                 self.logger.info(f"找到转录文件: {transcript_file}")
                 return transcript_file
-            else:
-                # 尝试使用Path对象检查
-                try:
-                    path_obj = Path(transcript_file)
-                    if path_obj.exists():
-                        return str(path_obj)
-                except Exception:
-                    pass
-
-        # 方法1.5：尝试不同的文件名变体（whisper可能会修改文件名）
-        # whisper有时会截断长文件名或替换特殊字符
-        audio_name_variants = [
-            audio_name,
-            audio_name.replace('_', ' '),  # 下划线替换为空格
-            audio_name.replace(' ', '_'),  # 空格替换为下划线
-        ]
-
-        # 如果文件名太长，尝试截断版本
-        if len(audio_name) > 100:
-            audio_name_variants.extend([
-                audio_name[:100],
-                audio_name[:80],
-                audio_name[:60]
-            ])
-
-        for variant in audio_name_variants:
-            if variant != audio_name:  # 避免重复检查
-                for ext in possible_extensions:
-                    transcript_file = os.path.join(output_dir, f"{variant}{ext}")
-                    if os.path.exists(transcript_file):
-                        self.logger.info(f"找到变体转录文件: {transcript_file}")
-                        return transcript_file
-
-        # 方法2：查找最新的文本文件（仅限最近5分钟内生成的文件）
-        output_path = Path(output_dir)
-        current_time = time.time()
-        recent_files = []
 
-        for ext in possible_extensions:
-            for file_path in output_path.glob(f"*{ext}"):
-                file_mtime = file_path.stat().st_mtime
-                # 只考虑最近5分钟内修改的文件
-                if current_time - file_mtime < 300:  # 300秒 = 5分钟
-                    recent_files.append(file_path)
-
-        if recent_files:
-            # 按修改时间排序，取最新的
-            latest_file = max(recent_files, key=lambda f: f.stat().st_mtime)
-            self.logger.info(f"找到最近生成的文件: {latest_file}")
-            return str(latest_file)
-
-        # 如果还是找不到，记录错误
-        self.logger.error(f"未找到转录文件，输出目录内容:")
         try:
-            for file_path in output_path.iterdir():
-                self.logger.error(f"  - {file_path.name}")
-        except Exception as e:
+            names = sorted(os.listdir(output_dir))
+        except OSError as e:
             self.logger.error(f"无法列出目录内容: {e}")
+            return None
+
+        for ext in possible_extensions:
+            for name in names:
+                if name.lower().endswith(ext):
+                    transcript_file = os.path.join(output_dir, name)
+                    self.logger.info(f"找到转录文件: {transcript_file}")
+                    return transcript_file
 
+        self.logger.error(f"未找到转录文件，输出目录内容: {names}")
         return None
     
     def get_supported_formats(self):
@@ -438,7 +750,7 @@ class WhisperTranscriber:
         """
         return [
             '.mp3', '.wav', '.flac', '.m4a', '.aac', 
-            '.ogg', '.wma', '.mp4', '.avi', '.mkv'
+            '.ogg', '.opus', '.webm', '.wma', '.mp4', '.avi', '.mkv'
         ]
     
     def validate_audio_file(self, audio_path):
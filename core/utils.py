@@ -6,9 +6,21 @@
 
 import re
 import os
+import hashlib
 import logging
 from pathlib import Path
 from datetime import datetime
+from .registry import classify_url
+
+
+# URL 格式
+URL_PATTERN = re.compile(
+    r'^https?://'  # http:// 或 https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # 域名
+    r'localhost|'  # localhost
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP 地址
+    r'(?::\d+)?'  # 可选端口
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
 
 
 def setup_logging():
@@ -123,6 +135,24 @@ def sanitize_filename(filename):
     return filename
 
 
+def compute_file_hash(file_path, chunk_size=1024 * 1024):
+    """
+    计算文件内容的 SHA-256 哈希（分块读取，适用于大文件）
+
+    Args:
+        file_path (str): 文件路径
+        chunk_size (int): 每次读取的字节数
+
+    Returns:
+        str: 十六进制哈希字符串
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
 def generate_output_filename(video_title, platform='unknown'):
     """
     生成输出文件名
@@ -148,42 +178,68 @@ def generate_output_filename(video_title, platform='unknown'):
 
 def extract_video_id_from_url(url):
     """
-    从 URL 中提取视频 ID
+    从 URL 中提取视频 ID（平台和模式由平台注册表提供，见 core/registry.py）
     
     Args:
         url (str): 视频 URL
         
     Returns:
-        tuple: (platform, video_id) 或 (None, None) 如果无法识别
+        tuple: (platform, video_id) 或 (None, None) 如果无法识别；
+            B站短链接（b23.tv）返回短链接代码
     """
-    # YouTube URL 模式
-    youtube_patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com/embed/([a-zA-Z0-9_-]{11})',
-        r'youtube\.com/v/([a-zA-Z0-9_-]{11})'
-    ]
-    
-    for pattern in youtube_patterns:
-        match = re.search(pattern, url)
-        if match:
-            return 'youtube', match.group(1)
-
-    # Bilibili URL 模式
-    bilibili_patterns = [
-        r'bilibili\.com/video/(BV[a-zA-Z0-9]+)',
-        r'bilibili\.com/video/(av\d+)',
-        r'b23\.tv/([a-zA-Z0-9]+)',
-        r'bilibili\.com/s/video/(BV[a-zA-Z0-9]+)'
-    ]
-
-    for pattern in bilibili_patterns:
-        match = re.search(pattern, url)
-        if match:
-            return 'bilibili', match.group(1)
+    match = classify_url(url)
+    if match and match.kind in ('video', 'short'):
+        return match.platform, match.id
+    return None, None
+
+
+def extract_collection_from_url(url):
+    """
+    识别播放列表、频道和合集链接
+
+    同时带有视频 ID 的链接（例如 watch?v=...&list=...）按单个视频处理。
 
+    Args:
+        url (str): URL
+
+    Returns:
+        tuple: (platform, kind)，kind 为 'playlist' 或 'channel'；不是播放列表或频道时返回 (None, None)
+    """
+    match = classify_url(url)
+    if match and match.kind in ('playlist', 'channel'):
+        return match.platform, match.kind
     return None, None
 
 
+def extract_part_number(url):
+    """
+    提取 B站多P视频链接中的分P序号（?p=N）
+
+    Returns:
+        int: 分P序号，链接中没有时返回 None
+    """
+    match = re.search(r'[?&]p=(\d+)', url)
+    return int(match.group(1)) if match else None
+
+
+def get_video_key(url):
+    """
+    生成用于去重的视频标识（平台 + 视频 ID，B站多P视频包括分P序号）
+
+    Args:
+        url (str): 视频 URL
+
+    Returns:
+        str: 视频标识，无法识别的 URL 返回 None
+    """
+    match = classify_url(url)
+    if not match or match.kind != 'video':
+        return None
+    if match.platform == 'bilibili':
+        return f"{match.platform}:{match.id}:p{extract_part_number(url) or 1}"
+    return f"{match.platform}:{match.id}"
+
+
 def format_duration(seconds):
     """
     格式化时长显示
@@ -204,6 +260,36 @@ def format_duration(seconds):
         return f"{minutes:02d}:{seconds:02d}"
 
 
+def parse_duration(text):
+    """
+    解析时长文本
+
+    Args:
+        text (str): 例如 10m00s、1h02m03s、01:02:03、05:30 或秒数
+
+    Returns:
+        float: 秒数，无法解析时返回 None
+    """
+    text = (text or '').strip().lower()
+    if not text:
+        return None
+
+    if ':' in text:
+        try:
+            seconds = 0.0
+            for part in text.split(':'):
+                seconds = seconds * 60 + float(part)
+            return seconds
+        except ValueError:
+            return None
+
+    match = re.fullmatch(r'(?:(\d+)h)?(?:(\d+)m)?(?:(\d+(?:\.\d+)?)s?)?', text)
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds or 0)
+
+
 def ensure_directory_exists(directory_path):
     """
     确保目录存在，如果不存在则创建
@@ -250,12 +336,4 @@ def validate_url(url):
     Returns:
         bool: URL 是否有效
     """
-    url_pattern = re.compile(
-        r'^https?://'  # http:// 或 https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # 域名
-        r'localhost|'  # localhost
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP 地址
-        r'(?::\d+)?'  # 可选端口
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    
-    return url_pattern.match(url) is not None
+    return URL_PATTERN.match(url) is not None
@@ -0,0 +1,447 @@
+"""
+文件夹监视模式
+
+监视一个收件文件夹，新的音视频文件写入完成后自动转录：
+
+- 变化检测：Linux 上通过 ctypes 调用 inotify，其他系统或 inotify 不可用时定时扫描文件夹
+- 写入完成判断：文件大小和修改时间在 stable_seconds 秒内保持不变（复制、录音软件写入或网络同步中的文件不会被提前处理）
+- 有界并发：最多 workers 个文件同时处理，其余排队
+- 启动时文件夹中已有的文件同样会被处理，已转录索引中记录过且未变化的文件直接跳过，重启监视不会重复转录
+- 处理失败的文件等待 stable_seconds 秒后自动重试，最多 max_retries 次；之后文件再次变化时重新处理
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .cancel import CancellationToken, JobCancelledError, bind_token
+from .config import get_config
+from .executor import Job
+from .index import get_file_index
+
+
+# inotify 事件（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+
+# struct inotify_event 的固定部分：wd, mask, cookie, len
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifySource:
+    """基于 inotify 的变化来源（仅 Linux）"""
+
+    def __init__(self, directory, recursive=False):
+        """
+        Args:
+            directory (str): 监视的文件夹
+            recursive (bool): 是否监视子文件夹
+
+        Raises:
+            OSError: 当前系统不支持 inotify 或无法添加监视
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError("当前系统不支持 inotify")
+
+        self.logger = logging.getLogger(__name__)
+        self.recursive = recursive
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 失败: {os.strerror(errno)}")
+
+        self._watches = {}  # wd -> 目录
+        try:
+            self._add_tree(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"无法监视 {directory}: {os.strerror(errno)}")
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory):
+        """监视目录（递归时包括其中的子目录）"""
+        self._add_watch(directory)
+        if not self.recursive:
+            return
+        for root, dirs, _ in os.walk(directory):
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+            for name in dirs:
+                try:
+                    self._add_watch(os.path.join(root, name))
+                except OSError as e:
+                    self.logger.warning(str(e))
+
+    def wait(self, timeout):
+        """
+        等待文件变化
+
+        Args:
+            timeout (float): 最长等待时间（秒）
+
+        Returns:
+            tuple: (发生变化的文件路径集合, 是否需要重新扫描整个文件夹)
+        """
+        changed = set()
+        rescan = False
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return changed, rescan
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed, rescan
+
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出，丢失的事件只能通过重新扫描补回
+                rescan = True
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO) and not name.startswith('.'):
+                    # 新建或移入的子目录：添加监视，并扫描添加监视之前已写入的文件
+                    try:
+                        self._add_tree(path)
+                    except OSError as e:
+                        self.logger.warning(str(e))
+                    rescan = True
+                continue
+
+            changed.add(path)
+
+        return changed, rescan
+
+    def close(self):
+        """关闭 inotify 文件描述符"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingSource:
+    """定时扫描的变化来源（没有 inotify 时使用）"""
+
+    def __init__(self, cancel_token):
+        self.cancel_token = cancel_token
+
+    def wait(self, timeout):
+        """等待一个扫描间隔，每次都要求重新扫描整个文件夹；停止监视时不再扫描"""
+        try:
+            self.cancel_token.wait(timeout)
+        except JobCancelledError:
+            return set(), False
+        return set(), True
+
+    def close(self):
+        pass
+
+
+class WatchJob(Job):
+    """监视模式中的单个任务"""
+
+    def __init__(self, index, source, cancel_token=None):
+        super().__init__(index, source, 0, cancel_token)
+
+    @property
+    def label(self):
+        """状态前缀，例如 [#3 lecture.mp4]"""
+        return f"[#{self.index} {os.path.basename(self.source)}]"
+
+
+class FolderWatcher:
+    """监视文件夹并自动转录新文件"""
+
+    def __init__(self, manager, directory, recursive=None, workers=None, stable_seconds=None,
+                 poll_interval=None, use_inotify=None, status_callback=None, job_callback=None,
+                 cancel_token=None):
+        """
+        初始化文件夹监视
+
+        Args:
+            manager (TaskManager): 任务管理器
+            directory (str): 监视的文件夹
+            recursive (bool): 是否监视子文件夹，默认读取 [watch] recursive
+            workers (int): 同时处理的文件数，默认读取 [watch] workers
+            stable_seconds (float): 文件保持不变多少秒后开始处理，默认读取 [watch] stable_seconds
+            poll_interval (float): 检查间隔（秒），默认读取 [watch] poll_interval
+            use_inotify (bool): 是否使用 inotify，默认读取 [watch] use_inotify
+            status_callback (callable): 状态回调函数
+            job_callback (callable): 单个任务完成时的回调，参数为 WatchJob 对象
+            cancel_token (CancellationToken): 取消令牌，取消后停止监视并终止正在处理的任务
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        self.manager = manager
+        self.directory = os.path.abspath(directory)
+        self.recursive = self.config.watch_recursive if recursive is None else recursive
+        self.workers = max(1, int(workers if workers is not None else self.config.watch_workers))
+        self.stable_seconds = self.config.watch_stable_seconds if stable_seconds is None else stable_seconds
+        self.poll_interval = self.config.watch_poll_interval if poll_interval is None else poll_interval
+        self.use_inotify = self.config.watch_use_inotify if use_inotify is None else use_inotify
+        self.max_retries = self.config.watch_max_retries
+        self.status_callback = status_callback
+        self.job_callback = job_callback
+        self.cancel_token = cancel_token or CancellationToken()
+
+        self.handler = manager.platform_handlers['local']
+        self.supported_formats = set(self.config.get_all_supported_formats())
+
+        # 监视可能持续运行很久，只保留计数，结束的任务交给 job_callback 后不再保留
+        self.counts = {'total': 0, 'success': 0, 'failed': 0, 'cancelled': 0}
+        self._pending = {}   # 路径 -> (大小, 修改时间, 开始保持不变的时间)
+        self._handled = {}   # 路径 -> 提交或跳过时的 (大小, 修改时间)，处理失败后移除以便重试
+        self._failures = {}  # 路径 -> (失败时的 (大小, 修改时间), 连续失败次数)
+        self._retries = set()  # 等待重试的路径
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def _notify(self, message):
+        print(f"👀 {message}")
+        self.logger.info(message)
+        if self.status_callback:
+            self.status_callback(message)
+
+    def _create_source(self):
+        """创建变化来源，inotify 不可用时退回定时扫描"""
+        if self.use_inotify:
+            try:
+                return InotifySource(self.directory, self.recursive)
+            except (OSError, AttributeError) as e:
+                self.logger.info(f"inotify 不可用，改为定时扫描: {e}")
+        return PollingSource(self.cancel_token)
+
+    def _is_candidate(self, path):
+        name = os.path.basename(path)
+        if name.startswith('.'):
+            return False
+        return os.path.splitext(name)[1].lower().lstrip('.') in self.supported_formats
+
+    @staticmethod
+    def _signature(path):
+        """文件的 (大小, 修改时间)，文件不存在时返回 None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _track(self, paths, now):
+        """记录发生变化的文件，等待其写入完成"""
+        for path in paths:
+            if not self._is_candidate(path):
+                continue
+            signature = self._signature(path)
+            if signature is None:
+                continue
+            with self._lock:
+                if self._handled.get(path) == signature:
+                    continue
+            pending = self._pending.get(path)
+            if pending is None or pending[:2] != signature:
+                self._pending[path] = (signature[0], signature[1], now)
+
+    def _collect_stable(self, now):
+        """
+        取出已经写入完成的文件
+
+        Returns:
+            list: 文件路径列表（按路径排序）
+        """
+        ready = []
+        for path, (size, mtime_ns, since) in list(self._pending.items()):
+            signature = self._signature(path)
+            if signature is None:
+                del self._pending[path]
+            elif signature != (size, mtime_ns):
+                self._pending[path] = (signature[0], signature[1], now)
+            elif now - since >= self.stable_seconds and size > 0:
+                with self._lock:
+                    if path in self._running:
+                        # 上一次转录尚未结束，结束后再处理新的内容
+                        continue
+                del self._pending[path]
+                ready.append(path)
+        return sorted(ready)
+
+    def _submit_ready(self, pool, paths):
+        """跳过已转录的文件，其余提交到线程池"""
+        if not paths:
+            return
+
+        pending, skipped = get_file_index().filter_pending(paths)
+        for path in skipped:
+            with self._lock:
+                self._handled[path] = self._signature(path)
+            self.logger.info(f"已转录，跳过: {path}")
+
+        for path in pending:
+            with self._lock:
+                self._handled[path] = self._signature(path)
+                self.counts['total'] += 1
+                job = WatchJob(self.counts['total'], path, self.cancel_token)
+                self._running.add(path)
+            self._notify(f"发现新文件，加入队列: {os.path.relpath(path, self.directory)}")
+            pool.submit(self._run_job, job)
+
+    def _run_job(self, job):
+        """在工作线程中处理单个文件"""
+        try:
+            if job.cancelled:
+                job.fail(job.cancel_token.reason)
+                return
+
+            job.start(timeout=self.config.job_timeout)
+            try:
+                with bind_token(job.cancel_token):
+                    job.finish(self.manager.process_local_file(
+                        job.source,
+                        job.bind_status_callback(self.status_callback),
+                        job.bind_progress_callback(),
+                        job.cancel_token,
+                        self.manager.mirrored_output_dir(self.directory, job.source)
+                    ))
+            except Exception as e:
+                self.logger.error(f"任务 {job.label} 执行异常: {e}")
+                job.fail(e)
+
+            if job.success:
+                with self._lock:
+                    self._failures.pop(job.source, None)
+                self._notify(f"{job.label} 转录完成: {job.result.get('transcript_file')}")
+            elif not self.cancel_token.cancelled:
+                self._notify(f"{job.label} 处理失败: {job.error}")
+                self._schedule_retry(job)
+
+            if self.job_callback:
+                try:
+                    self.job_callback(job)
+                except Exception as e:
+                    self.logger.warning(f"任务回调出错: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(job.source)
+                if job.success:
+                    self.counts['success'] += 1
+                elif job.status == 'cancelled':
+                    self.counts['cancelled'] += 1
+                else:
+                    self.counts['failed'] += 1
+
+    def _schedule_retry(self, job):
+        """处理失败的文件：重试次数未用完时等待重新处理，用完后等文件再次变化"""
+        path = job.source
+        signature = self._signature(path)
+        with self._lock:
+            failed_signature, attempts = self._failures.get(path, (None, 0))
+            # 文件内容变化后重新计数
+            attempts = attempts + 1 if failed_signature == signature else 1
+            self._failures[path] = (signature, attempts)
+            if attempts > self.max_retries:
+                # 保留 _handled 中的记录，文件不变时不再处理
+                self._failures.pop(path, None)
+                exhausted = True
+            else:
+                self._handled.pop(path, None)
+                self._retries.add(path)
+                exhausted = False
+
+        if exhausted:
+            if self.max_retries:
+                self._notify(f"{job.label} 已重试 {self.max_retries} 次仍然失败，文件再次变化时重新处理")
+        else:
+            self._notify(f"{job.label} 将在 {self.stable_seconds:g} 秒后重试（第 {attempts}/{self.max_retries} 次）")
+
+    def _take_retries(self):
+        """取出等待重试的文件"""
+        with self._lock:
+            retries, self._retries = self._retries, set()
+        return retries
+
+    def run(self):
+        """
+        开始监视，直到取消令牌被取消
+
+        Returns:
+            dict: 监视期间处理的文件数，包含 total、success、failed 和 cancelled
+
+        Raises:
+            NotADirectoryError: 文件夹不存在
+        """
+        if not os.path.isdir(self.directory):
+            raise NotADirectoryError(f"目录不存在: {self.directory}")
+
+        source = self._create_source()
+        mode = 'inotify' if isinstance(source, InotifySource) else f'每 {self.poll_interval:g} 秒扫描'
+        self._notify(f"开始监视 {self.directory}（{mode}，并发数 {self.workers}）")
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='streamscribe-watch')
+        try:
+            # 启动时文件夹中已有的文件
+            self._track(self.handler.scan_directory(self.directory, self.recursive), time.monotonic())
+
+            while not self.cancel_token.cancelled:
+                # inotify 没有事件时也按检查间隔唤醒，以便检查等待中的文件是否已写入完成
+                changed, rescan = source.wait(self.poll_interval)
+                if rescan:
+                    try:
+                        changed |= set(self.handler.scan_directory(self.directory, self.recursive))
+                    except NotADirectoryError:
+                        self._notify(f"监视的文件夹已被删除: {self.directory}")
+                        break
+
+                now = time.monotonic()
+                self._track(changed | self._take_retries(), now)
+                self._submit_ready(pool, self._collect_stable(now))
+        finally:
+            source.close()
+            # 取消时终止正在运行的任务，排队中的任务直接结束
+            pool.shutdown(wait=True)
+            self._notify(f"已停止监视 {self.directory}，共处理 {self.counts['total']} 个文件")
+
+        return self.counts
+
+    def stop(self, reason="已停止监视"):
+        """停止监视并终止正在处理的任务"""
+        self.cancel_token.cancel(reason)
@@ -0,0 +1,292 @@
+"""
+常驻 Whisper 引擎
+
+在 Whisper 虚拟环境的 Python 中启动常驻工作进程（whisper_worker.py），模型只加载一次，
+之后通过标准输入/输出逐行传递 JSON 任务，省去每个文件都重新启动解释器和加载模型的时间。
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+from .cancel import current_token, kill_process_tree
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'whisper_worker.py')
+
+
+class WhisperEngine:
+    """常驻 Whisper 工作进程的客户端"""
+
+    def __init__(self, python_exe, model_options, startup_timeout=600):
+        """
+        初始化引擎（不会立即启动工作进程）
+
+        Args:
+            python_exe (str): Whisper 虚拟环境中的 Python 可执行文件
+            model_options (dict): 模型参数（model / model_directory / device / device_index / compute_type）
+            startup_timeout (int): 等待模型加载完成的超时时间（秒）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.python_exe = python_exe
+        self.model_options = dict(model_options)
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.line_callback = None  # 工作进程输出的每一行（例如分段时间戳）
+
+        self._responses = queue.Queue()
+        self._lock = threading.Lock()
+        self._job_id = 0
+
+    @property
+    def signature(self):
+        """模型参数签名，参数变化时需要重启引擎"""
+        return (self.python_exe, tuple(sorted(self.model_options.items())))
+
+    def is_alive(self):
+        """工作进程是否在运行"""
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """启动工作进程并等待模型加载完成"""
+        if not os.path.exists(self.python_exe):
+            raise FileNotFoundError(f"Whisper 虚拟环境 Python 不存在: {self.python_exe}")
+
+        command = [self.python_exe, WORKER_SCRIPT]
+        for key in ('model', 'model_directory', 'device', 'device_index', 'compute_type'):
+            value = self.model_options.get(key)
+            if value is not None:
+                command.extend([f'--{key}', str(value)])
+
+        print(f"\n🔍 启动常驻 Whisper 引擎:")
+        print(f"📋 {' '.join(command)}")
+        print()
+
+        # 设置环境变量解决编码问题
+        env = os.environ.copy()
+        env['PYTHONIOENCODING'] = 'utf-8'
+        env['PYTHONUTF8'] = '1'
+
+        self._responses = queue.Queue()
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env
+        )
+
+        threading.Thread(target=self._read_stdout, args=(self.process, self._responses), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self.process,), daemon=True).start()
+
+        ready = self._wait_response(self.startup_timeout)
+        if not ready.get('ready'):
+            self.close()
+            raise Exception(f"常驻 Whisper 引擎启动失败: {ready.get('error', '未知错误')}")
+
+        self.logger.info("常驻 Whisper 引擎已就绪")
+
+    def transcribe(self, audio_path, output_dir, options, timeout=3600,
+                   progress_parser=None, progress_handler=None):
+        """
+        提交转录任务并等待结果
+
+        Args:
+            audio_path (str): 音频文件路径
+            output_dir (str): 输出目录
+            options (dict): 转录参数（language / initial_prompt / vad_filter / output_format）
+            timeout (int): 超时时间（秒）
+            progress_parser (ProgressParser): 分段时间戳进度解析器
+            progress_handler (callable): 进度回调，签名为 handler(fraction, eta)
+
+        Returns:
+            str: 生成的文稿文件路径
+
+        Raises:
+            JobCancelledError: 任务被取消（工作进程会被终止，下次转录时重新启动）
+        """
+        # 等待其他任务释放引擎期间也响应取消
+        token = current_token()
+        while not self._lock.acquire(timeout=0.5):
+            if token:
+                token.raise_if_cancelled()
+
+        try:
+            if token:
+                token.raise_if_cancelled()
+
+            if not self.is_alive():
+                self.start()
+
+            self._job_id += 1
+            job = dict(options)
+            job.update({
+                'id': self._job_id,
+                'audio': os.path.abspath(audio_path),
+                'output_dir': os.path.abspath(output_dir)
+            })
+
+            self.line_callback = self._make_progress_callback(progress_parser, progress_handler)
+            try:
+                try:
+                    self.process.stdin.write((json.dumps(job, ensure_ascii=False) + '\n').encode('utf-8'))
+                    self.process.stdin.flush()
+                except OSError as e:
+                    self.close()
+                    raise Exception(f"无法向常驻 Whisper 引擎提交任务: {e}")
+
+                while True:
+                    response = self._wait_response(timeout)
+                    if response.get('id') == self._job_id:
+                        break
+            finally:
+                self.line_callback = None
+
+            if not response.get('ok'):
+                raise Exception(f"常驻 Whisper 引擎转录失败: {response.get('error', '未知错误')}")
+
+            return response['transcript_file']
+        finally:
+            self._lock.release()
+
+    def _make_progress_callback(self, progress_parser, progress_handler):
+        """根据工作进程输出的分段时间戳生成进度回调"""
+        if not (progress_parser and progress_handler):
+            return None
+
+        start_time = time.time()
+
+        def callback(line):
+            fraction = progress_parser.parse(line)
+            if fraction is None:
+                return
+            elapsed = time.time() - start_time
+            eta = elapsed * (1 - fraction) / fraction if fraction > 0 else None
+            progress_handler(fraction, eta)
+
+        return callback
+
+    def _wait_response(self, timeout):
+        """
+        等待工作进程的下一条响应
+
+        超时或进程退出时关闭引擎并抛出异常；当前任务被取消时立即终止工作进程，
+        不等 Whisper 处理完正在转录的文件。
+        """
+        token = current_token()
+        deadline = time.time() + timeout
+
+        while True:
+            if token and token.cancelled:
+                self.kill()
+                token.raise_if_cancelled()
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.close()
+                raise subprocess.TimeoutExpired(WORKER_SCRIPT, timeout)
+
+            try:
+                response = self._responses.get(timeout=min(remaining, 0.5))
+                break
+            except queue.Empty:
+                continue
+
+        if response is None:
+            self.close()
+            raise Exception("常驻 Whisper 引擎已退出")
+
+        return response
+
+    def _read_stdout(self, process, responses):
+        """读取协议输出（JSON 行）"""
+        for raw_line in process.stdout:
+            line = raw_line.decode('utf-8', errors='ignore').strip()
+            if not line:
+                continue
+            try:
+                responses.put(json.loads(line))
+            except ValueError:
+                self.logger.debug(f"whisper engine: {line}")
+        responses.put(None)
+
+    def _read_stderr(self, process):
+        """读取日志输出，避免管道写满阻塞工作进程"""
+        for raw_line in process.stderr:
+            line = raw_line.decode('utf-8', errors='ignore').rstrip()
+            if not line:
+                continue
+            self.logger.debug(f"whisper engine: {line}")
+            if self.line_callback:
+                try:
+                    self.line_callback(line)
+                except Exception:
+                    pass
+
+    def close(self):
+        """关闭工作进程"""
+        process = self.process
+        self.process = None
+
+        if process is None or process.poll() is not None:
+            return
+
+        try:
+            process.stdin.write(b'{"cmd": "exit"}\n')
+            process.stdin.flush()
+            process.stdin.close()
+            process.wait(timeout=10)
+        except Exception:
+            process.kill()
+
+    def kill(self):
+        """立即终止工作进程（下次转录时重新启动并加载模型）"""
+        process = self.process
+        self.process = None
+
+        if process is None or process.poll() is not None:
+            return
+
+        kill_process_tree(process)
+        process.wait()
+
+
+# 全局引擎实例
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_whisper_engine(python_exe, model_options):
+    """
+    获取全局常驻引擎，模型参数变化时自动重建
+
+    Args:
+        python_exe (str): Whisper 虚拟环境中的 Python 可执行文件
+        model_options (dict): 模型参数
+
+    Returns:
+        WhisperEngine: 引擎实例
+    """
+    global _engine
+    with _engine_lock:
+        candidate = WhisperEngine(python_exe, model_options)
+        if _engine is None or _engine.signature != candidate.signature:
+            if _engine is not None:
+                _engine.close()
+            _engine = candidate
+        return _engine
+
+
+def shutdown_whisper_engine():
+    """关闭全局常驻引擎"""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+            _engine = None
+
+
+atexit.register(shutdown_whisper_engine)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+常驻 Whisper 工作进程
+
+由 core/whisper_engine.py 使用 Whisper 虚拟环境中的 Python 启动（需要 faster-whisper，
+whisper-ctranslate2 本身就依赖它）。启动时加载一次模型，之后从标准输入逐行读取 JSON 任务，
+并把结果以 JSON 行写到标准输出。
+
+该脚本在独立的虚拟环境中运行，不能导入 core 包。
+"""
+
+import argparse
+import json
+import os
+import sys
+
+
+def format_timestamp(seconds, always_include_hours=False, decimal_marker='.'):
+    """
+    格式化时间戳
+
+    Args:
+        seconds (float): 秒数
+        always_include_hours (bool): 是否总是输出小时部分
+        decimal_marker (str): 毫秒分隔符（SRT 使用逗号）
+
+    Returns:
+        str: 格式化的时间戳
+    """
+    milliseconds = int(round(seconds * 1000.0))
+    hours = milliseconds // 3600000
+    milliseconds -= hours * 3600000
+    minutes = milliseconds // 60000
+    milliseconds -= minutes * 60000
+    secs = milliseconds // 1000
+    milliseconds -= secs * 1000
+
+    hours_marker = f"{hours:02d}:" if always_include_hours or hours > 0 else ""
+    return f"{hours_marker}{minutes:02d}:{secs:02d}{decimal_marker}{milliseconds:03d}"
+
+
+def write_transcript(segments, output_path, output_format):
+    """
+    写入文稿文件
+
+    Args:
+        segments (list): (start, end, text) 列表
+        output_path (str): 输出文件路径
+        output_format (str): 'srt' 或 'txt'
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        if output_format == 'srt':
+            for i, (start, end, text) in enumerate(segments, 1):
+                f.write(f"{i}\n")
+                f.write(f"{format_timestamp(start, True, ',')} --> {format_timestamp(end, True, ',')}\n")
+                f.write(f"{text}\n\n")
+        else:
+            for _, _, text in segments:
+                f.write(f"{text}\n")
+
+
+def main():
+    """工作进程主循环"""
+    parser = argparse.ArgumentParser(description='StreamScribe resident whisper worker')
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--model_directory', default=None)
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--device_index', type=int, default=0)
+    parser.add_argument('--compute_type', default='int8')
+    args = parser.parse_args()
+
+    # 标准输出只用于协议，其余输出全部转到标准错误
+    protocol = sys.stdout
+    sys.stdout = sys.stderr
+
+    def respond(message):
+        protocol.write(json.dumps(message, ensure_ascii=False) + '\n')
+        protocol.flush()
+
+    try:
+        from faster_whisper import WhisperModel
+
+        model = WhisperModel(
+            args.model_directory or args.model,
+            device=args.device,
+            device_index=args.device_index,
+            compute_type=args.compute_type
+        )
+    except Exception as e:
+        respond({'ready': False, 'error': f"{type(e).__name__}: {e}"})
+        return 1
+
+    respond({'ready': True})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        job_id = None
+        try:
+            job = json.loads(line)
+            job_id = job.get('id')
+
+            if job.get('cmd') == 'exit':
+                break
+
+            segments, info = model.transcribe(
+                job['audio'],
+                language=job.get('language'),
+                initial_prompt=job.get('initial_prompt') or None,
+                vad_filter=bool(job.get('vad_filter'))
+            )
+
+            collected = []
+            for segment in segments:
+                text = segment.text.strip()
+                collected.append((segment.start, segment.end, text))
+                # 与 whisper-ctranslate2 的输出格式保持一致，便于解析进度
+                print(f"[{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}] {text}", flush=True)
+
+            output_format = job.get('output_format', 'txt')
+            stem = os.path.splitext(os.path.basename(job['audio']))[0]
+            output_path = os.path.join(job['output_dir'], f"{stem}.{output_format}")
+            write_transcript(collected, output_path, output_format)
+
+            respond({
+                'id': job_id,
+                'ok': True,
+                'transcript_file': output_path,
+                'duration': getattr(info, 'duration', None)
+            })
+
+        except Exception as e:
+            respond({'id': job_id, 'ok': False, 'error': f"{type(e).__name__}: {e}"})
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+任务工作目录模块
+
+每个任务在 temp_dir/jobs/<job_id>/ 下拥有独立的工作目录，外部工具的输出都写到这里，
+结果文件的路径是确定的，不需要在共享的临时目录中按扩展名或修改时间查找，
+并发任务之间也不会误取对方的文件。
+"""
+
+import logging
+import os
+import shutil
+import uuid
+from .config import get_config
+
+
+class JobWorkspace:
+    """单个任务的工作目录"""
+
+    def __init__(self, job_id=None, root=None, journal=None):
+        """
+        创建工作目录
+
+        Args:
+            job_id (str): 任务标识，默认生成随机标识；相同标识对应同一目录，可用于中断后恢复
+            root (str): 工作目录的上级目录，默认为 temp_dir/jobs
+            journal (JobJournal): 任务日志，设置后 mark() 会把处理阶段写入日志
+        """
+        self.config = get_config()
+        self.logger = logging.getLogger(__name__)
+
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.root = root or os.path.join(self.config.temp_dir, 'jobs')
+        self.path = os.path.join(self.root, self.job_id)
+        self.journal = journal
+        os.makedirs(self.path, exist_ok=True)
+
+    def mark(self, state, **fields):
+        """
+        记录任务处理阶段（未关联任务日志时不做任何事）
+
+        Args:
+            state (str): 阶段名称，见 JobJournal.STATES
+            **fields: 随阶段一起记录的字段
+        """
+        if self.journal:
+            self.journal.update(self.job_id, state, **fields)
+
+    def subdir(self, name):
+        """
+        获取（并创建）子目录
+
+        Args:
+            name (str): 子目录名称，例如 audio / subtitles / whisper
+
+        Returns:
+            str: 子目录路径
+        """
+        path = os.path.join(self.path, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def file_path(self, name, *parts):
+        """
+        获取工作目录中的文件路径
+
+        Args:
+            name (str): 文件名（或子目录名，后面跟文件名）
+
+        Returns:
+            str: 文件路径
+        """
+        return os.path.join(self.path, name, *parts)
+
+    def find_file(self, subdir, extensions, stem=None):
+        """
+        在子目录中查找文件
+
+        目录中只有本任务的文件，因此只需检查确定的文件名，或列出这一个小目录。
+
+        Args:
+            subdir (str): 子目录名称
+            extensions (list): 按优先级排列的扩展名（带点，例如 '.srt'）
+            stem (str): 已知的文件名（不含扩展名），优先按该名称直接查找
+
+        Returns:
+            str: 文件路径，未找到时返回 None
+        """
+        directory = os.path.join(self.path, subdir)
+        if not os.path.isdir(directory):
+            return None
+
+        if stem:
+            for ext in extensions:
+                candidate = os.path.join(directory, f"{stem}{ext}")
+                if os.path.exists(candidate):
+                    return candidate
+
+        names = sorted(os.listdir(directory))
+        for ext in extensions:
+            for name in names:
+                if name.lower().endswith(ext):
+                    return os.path.join(directory, name)
+
+        return None
+
+    def cleanup(self):
+        """删除工作目录"""
+        try:
+            shutil.rmtree(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"清理工作目录失败: {self.path}: {e}")
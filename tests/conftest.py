@@ -0,0 +1,24 @@
+"""
+测试共用的夹具
+
+测试不需要 yt-dlp、BBDown 和 Whisper：每个测试在临时目录中使用默认配置运行，
+临时文件、缓存和输出都写在该目录下。
+"""
+
+import os
+import sys
+
+import pytest
+
+# 从仓库根目录导入 core 包
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import config as config_module
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """在临时目录中创建并加载默认配置"""
+    monkeypatch.chdir(tmp_path)
+    yield config_module.load_config(str(tmp_path / 'config.ini'))
+    monkeypatch.setattr(config_module, '_config_instance', None)
@@ -0,0 +1,91 @@
+"""asyncio 模式下解析短链接不阻塞事件循环"""
+
+import asyncio
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.manager import TaskManager
+from core.registry import get_registry
+
+
+# 短链接服务器的响应延迟（秒）
+RESOLVE_DELAY = 1.0
+
+
+class SlowRedirectHandler(BaseHTTPRequestHandler):
+    """延迟后把 /s/<id> 跳转到测试平台的视频页面"""
+
+    def do_GET(self):
+        time.sleep(RESOLVE_DELAY)
+        self.send_response(302)
+        self.send_header('Location', f"https://video.example.com/watch/{self.path.rsplit('/', 1)[-1]}")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ExampleHandler:
+    """测试平台的处理器，只记录第一阶段收到的链接"""
+
+    PLATFORM = 'example'
+
+    def __init__(self):
+        self.prepared_urls = []
+
+    async def prepare_transcript_async(self, url, status_callback=None, progress_callback=None, workspace=None):
+        self.prepared_urls.append(url)
+        return {'result': {'success': True, 'error': None}, 'audio_file': None, 'workspace': workspace}
+
+
+@pytest.fixture
+def short_link_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowRedirectHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def example_platform():
+    registry = get_registry()
+    registry.register('example', ExampleHandler, [
+        ('video', r'video\.example\.com/watch/(?P<id>\w+)'),
+        ('short', r'127\.0\.0\.1:\d+/s/(?P<id>\w+)'),
+    ])
+    yield
+    registry.unregister('example')
+
+
+def test_prepare_url_async_does_not_block_loop(config, short_link_server, example_platform):
+    manager = TaskManager()
+    video_id = uuid.uuid4().hex[:11]
+
+    async def run():
+        ticks = []
+        stop = asyncio.Event()
+
+        async def ticker():
+            while not stop.is_set():
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.05)
+            ticks.append(time.monotonic())
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0.2)
+        prepared = await manager.prepare_url_async(f"{short_link_server}/s/{video_id}")
+        stop.set()
+        await task
+        return prepared, max(later - earlier for earlier, later in zip(ticks, ticks[1:]))
+
+    prepared, max_gap = asyncio.run(run())
+
+    assert prepared['url'] == f"https://video.example.com/watch/{video_id}"
+    assert manager.platform_handlers['example'].prepared_urls == [prepared['url']]
+    # 解析期间事件循环照常运行（阻塞时会停顿 RESOLVE_DELAY 秒）
+    assert max_gap < RESOLVE_DELAY / 2
@@ -0,0 +1,39 @@
+"""批量执行器与流水线：任务完成回调出错不影响其余任务"""
+
+import pytest
+
+from core.executor import BatchExecutor
+from core.pipeline import TranscriptionPipeline
+
+
+def failing_callback(job):
+    raise RuntimeError("界面已关闭")
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_batch_executor_guards_job_callback(config, workers):
+    seen = []
+
+    def job_callback(job):
+        seen.append(job.source)
+        failing_callback(job)
+
+    jobs = BatchExecutor(max_workers=workers).run(
+        ['a', 'b', 'c'], lambda source, status, progress: {'success': True}, job_callback=job_callback
+    )
+
+    assert [job.status for job in jobs] == ['done', 'done', 'done']
+    assert sorted(seen) == ['a', 'b', 'c']
+
+
+def test_pipeline_guards_job_callback(config):
+    pipeline = TranscriptionPipeline(
+        prepare_func=lambda source, status, progress: {'success': True},
+        complete_func=lambda prepared, status, progress: prepared,
+        needs_transcription=lambda prepared: False,
+        download_workers=2, transcribe_workers=1, prefetch_count=1
+    )
+
+    jobs = pipeline.run(['a', 'b', 'c'], job_callback=failing_callback)
+
+    assert [job.status for job in jobs] == ['done', 'done', 'done']
@@ -0,0 +1,90 @@
+"""HTTP 任务服务：事件顺序、取消排队任务和成本估计"""
+
+import queue
+import threading
+
+import pytest
+
+from core.server import JobService
+
+
+class FakeManager:
+    """只记录调用的任务管理器，process_* 在 release 之前阻塞"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.estimates = []
+
+    def estimate_cost(self, kind, source):
+        self.estimates.append((kind, threading.current_thread().name))
+        return 30.0
+
+    def process_url(self, source, status_callback=None, progress_callback=None, cancel_token=None):
+        status_callback("开始处理视频链接...")
+        self.release.wait(5)
+        progress_callback('transcribe', 1.0)
+        return {'success': True, 'transcript_file': 'out.txt', 'error': None}
+
+    process_local_file = process_url
+
+
+@pytest.fixture
+def manager():
+    manager = FakeManager()
+    yield manager
+    manager.release.set()
+
+
+def test_events_are_ordered(config, manager):
+    service = JobService(manager, workers=1, queue_size=5)
+    job = service.submit('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    service.start()
+    try:
+        manager.release.set()
+        events = []
+        while not job.finished or len(events) < len(job.events):
+            events.extend(job.wait_events(len(events), 5))
+    finally:
+        service.stop(wait=True)
+
+    assert [event['seq'] for event in events] == list(range(len(events)))
+    assert events[0] == dict(events[0], type='status', status='queued')
+    assert events[1] == dict(events[1], type='status', status='running')
+    assert events[-1]['type'] == 'done'
+    assert [event['type'] for event in events].count('done') == 1
+
+
+def test_cancel_frees_queue_slot(config, manager):
+    service = JobService(manager, workers=1, queue_size=1)
+    first = service.submit('https://www.youtube.com/watch?v=aaaaaaaaaaa')
+    with pytest.raises(queue.Full):
+        service.submit('https://www.youtube.com/watch?v=bbbbbbbbbbb')
+
+    service.cancel(first.id)
+
+    assert first.status == 'cancelled'
+    assert first.events[-1]['type'] == 'cancelled'
+    second = service.submit('https://www.youtube.com/watch?v=bbbbbbbbbbb')
+    assert second.status == 'queued'
+    service.stop()
+
+
+def test_file_cost_is_estimated_by_worker(config, manager, tmp_path):
+    audio = tmp_path / 'lecture.mp3'
+    audio.write_bytes(b'\0')
+
+    service = JobService(manager, workers=1, queue_size=5)
+    job = service.submit(str(audio))
+    assert manager.estimates == []
+    assert job.cost is None
+
+    service.start()
+    try:
+        manager.release.set()
+        while not job.finished:
+            job.wait_events(len(job.events), 5)
+    finally:
+        service.stop(wait=True)
+
+    assert manager.estimates == [('file', 'streamscribe-server-0')]
+    assert job.to_dict()['estimated_cost'] == 30.0
@@ -18,6 +18,7 @@ import platform
 import os
 import threading
 import datetime
+from core.cancel import CancellationToken
 from core.config import get_config
 from core.manager import TaskManager
 
@@ -185,9 +186,11 @@ class StreamScribeCompactUI:
 
         # 初始化变量
         self.processing = False
+        self.cancel_token = None
         self.current_transcript_file = None
         self.processed_results = []
         self.selected_files = []
+        self.selected_directory = None
         self.debug_window = None
 
         # 创建界面
@@ -412,6 +415,15 @@ class StreamScribeCompactUI:
         )
         self.select_files_button.pack(side="left")
 
+        self.select_folder_button = ctk.CTkButton(
+            file_button_frame,
+            text="选择文件夹",
+            command=self.select_folder,
+            width=100,
+            height=28
+        )
+        self.select_folder_button.pack(side="left", padx=(8, 0))
+
         self.clear_files_button = ctk.CTkButton(
             file_button_frame,
             text="清除",
@@ -553,6 +565,17 @@ class StreamScribeCompactUI:
         )
         self.start_button.pack(pady=(0, 8))
 
+        # 停止按钮（处理中可用，终止正在运行的下载和转录）
+        self.stop_button = ctk.CTkButton(
+            right_frame,
+            text="停止",
+            command=self.stop_processing,
+            width=90,
+            height=26,
+            state="disabled"
+        )
+        self.stop_button.pack(pady=(0, 8))
+
         # 清除按钮
         self.clear_button = ctk.CTkButton(
             right_frame,
@@ -908,16 +931,29 @@ class StreamScribeCompactUI:
 
         if files:
             self.selected_files = list(files)
+            self.selected_directory = None
+            self.update_file_list_display()
+
+    def select_folder(self):
+        """选择文件夹（递归处理其中的音视频文件，已转录且未变化的文件会被跳过）"""
+        directory = filedialog.askdirectory(title="选择包含音频或视频文件的文件夹")
+
+        if directory:
+            self.selected_directory = directory
+            self.selected_files = []
             self.update_file_list_display()
 
     def clear_selected_files(self):
         """清除选择的文件"""
         self.selected_files = []
+        self.selected_directory = None
         self.update_file_list_display()
 
     def update_file_list_display(self):
         """更新文件列表显示"""
-        if not self.selected_files:
+        if self.selected_directory:
+            self.file_list_label.configure(text=f"已选择文件夹: {self.selected_directory}")
+        elif not self.selected_files:
             self.file_list_label.configure(text="未选择文件")
         elif len(self.selected_files) == 1:
             filename = os.path.basename(self.selected_files[0])
@@ -946,21 +982,29 @@ class StreamScribeCompactUI:
                 return
 
             # 使用线程异步处理，避免UI卡死
+            self.cancel_token = CancellationToken()
             threading.Thread(target=self.process_urls, args=(urls,), daemon=True).start()
 
         else:
             # 文件模式
+            if self.selected_directory:
+                self.cancel_token = CancellationToken()
+                threading.Thread(target=self.process_directory, args=(self.selected_directory,), daemon=True).start()
+                return
+
             if not self.selected_files:
-                messagebox.showwarning("警告", "请选择要处理的文件")
+                messagebox.showwarning("警告", "请选择要处理的文件或文件夹")
                 return
 
             # 使用线程异步处理，避免UI卡死
+            self.cancel_token = CancellationToken()
             threading.Thread(target=self.process_files, args=(self.selected_files,), daemon=True).start()
 
     def process_urls(self, urls):
-        """处理URL列表"""
+        """处理URL列表（按 max_concurrent_tasks 并发处理）"""
         self.processing = True
         self.update_button_state(self.start_button, "disabled")
+        self.update_button_state(self.stop_button, "normal")
         self.processed_results = []
 
         # 清空结果文本框
@@ -969,160 +1013,190 @@ class StreamScribeCompactUI:
         self.root.after(0, clear_textbox)
 
         total_urls = len(urls)
-        # 用于累计处理时间和加速倍率
-        total_processing_time = 0
-        total_speed_ratio = 0
-        success_count = 0
-
-        for i, url in enumerate(urls):
-            try:
-                self.update_status(f"处理第 {i+1}/{total_urls} 个视频...")
-                self.update_progress((i) / total_urls)
-
-                def status_callback(message):
-                    self.update_status(f"[{i+1}/{total_urls}] {message}")
+        entries = {}
 
-                result = self.manager.process_url(url, status_callback)
+        def job_callback(job):
+            title = (job.result or {}).get('video_title') or f'视频{job.index}'
+            entries[job.index] = self._collect_job_result(job, title, job.total)
 
-                if result['success']:
-                    # 读取转录文件内容
-                    transcript_file = result.get('transcript_file')
-                    if transcript_file and os.path.exists(transcript_file):
-                        with open(transcript_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
+        self.update_status(f"开始处理 {total_urls} 个链接...")
+        self.update_progress(0)
 
-                        self.processed_results.append({
-                            'title': result.get('video_title', f'视频{i+1}'),
-                            'content': content,
-                            'file': transcript_file
-                        })
+        try:
+            batch_result = self.manager.process_batch_urls(
+                urls, self.update_status, job_callback, progress_callback=self.update_progress,
+                cancel_token=self.cancel_token
+            )
+            jobs = batch_result['jobs']
+        except Exception as e:
+            self.update_textbox(f"\n处理异常: {str(e)}\n")
+            jobs = []
 
-                        # 显示结果（不包含处理时间）
-                        self.display_result(result.get('video_title', f'视频{i+1}'), content)
+        self.processed_results = [entries[i] for i in sorted(entries) if entries[i]]
+        self._finish_batch(jobs, f"完成！处理了 {len(jobs)} 个视频")
 
-                        # 累计处理时间和加速倍率
-                        if result.get('processing_time') is not None:
-                            total_processing_time += result['processing_time']
-                            success_count += 1
-                        if result.get('speed_ratio') is not None:
-                            total_speed_ratio += result['speed_ratio']
+    def process_files(self, files):
+        """处理文件列表（按 max_concurrent_tasks 并发处理）"""
+        self.processing = True
+        self.update_button_state(self.start_button, "disabled")
+        self.update_button_state(self.stop_button, "normal")
+        self.processed_results = []
 
-                else:
-                    error_msg = f"处理失败: {result.get('error', '未知错误')}"
-                    self.update_textbox(f"\n=== 视频{i+1} ===\n{error_msg}\n")
+        # 清空结果文本框
+        def clear_textbox():
+            self.result_textbox.delete("1.0", "end")
+        self.root.after(0, clear_textbox)
 
-            except Exception as e:
-                error_msg = f"处理异常: {str(e)}"
-                self.update_textbox(f"\n=== 视频{i+1} ===\n{error_msg}\n")
+        total_files = len(files)
+        entries = {}
 
-        self.update_progress(1.0)
+        def job_callback(job):
+            title = os.path.basename(job.source)
+            entries[job.index] = self._collect_job_result(job, title, total_files)
 
-        # 构建状态消息，包含处理时间和加速倍率
-        status_msg = f"完成！处理了 {total_urls} 个视频"
-        if success_count > 0:
-            avg_speed_ratio = total_speed_ratio / success_count
-            status_msg += f"，⏱️  处理时间: {total_processing_time:.2f}秒 | ⚡ 加速倍率: {avg_speed_ratio:.2f}x"
+        self.update_status(f"开始处理 {total_files} 个文件...")
+        self.update_progress(0)
 
-        self.update_status(status_msg)
-        self.processing = False
-        self.update_button_state(self.start_button, "normal")
+        try:
+            batch_result = self.manager.process_batch_files(
+                files, self.update_status, job_callback, progress_callback=self.update_progress,
+                cancel_token=self.cancel_token
+            )
+            jobs = batch_result['jobs']
+        except Exception as e:
+            self.update_textbox(f"\n处理异常: {str(e)}\n")
+            jobs = []
 
-        # 启用复制和打开文件按钮
-        if self.processed_results:
-            self.update_button_state(self.copy_button, "normal")
-            if len(self.processed_results) == 1:
-                self.update_button_state(self.open_file_button, "normal")
-                self.current_transcript_file = self.processed_results[0]['file']
+        self.processed_results = [entries[i] for i in sorted(entries) if entries[i]]
+        self._finish_batch(jobs, f"完成！处理了 {total_files} 个文件")
 
-    def process_files(self, files):
-        """处理文件列表"""
+    def process_directory(self, directory):
+        """处理文件夹（递归扫描，只处理新增或修改过的文件）"""
         self.processing = True
-        self.start_button.configure(state="disabled")
+        self.update_button_state(self.start_button, "disabled")
+        self.update_button_state(self.stop_button, "normal")
         self.processed_results = []
-        self.result_textbox.delete("1.0", "end")
 
-        total_files = len(files)
-        # 用于累计处理时间和加速倍率
-        total_processing_time = 0
-        total_speed_ratio = 0
-        success_count = 0
+        # 清空结果文本框
+        def clear_textbox():
+            self.result_textbox.delete("1.0", "end")
+        self.root.after(0, clear_textbox)
 
-        for i, file_path in enumerate(files):
-            try:
-                self.update_status(f"处理第 {i+1}/{total_files} 个文件...")
-                self.progress_bar.set((i) / total_files)
-
-                def status_callback(message):
-                    self.update_status(f"[{i+1}/{total_files}] {message}")
-
-                result = self.manager.process_local_file(file_path, status_callback)
-
-                if result['success']:
-                    # 读取转录文件内容
-                    transcript_file = result.get('transcript_file')
-                    if transcript_file and os.path.exists(transcript_file):
-                        with open(transcript_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-
-                        filename = os.path.basename(file_path)
-                        self.processed_results.append({
-                            'title': filename,
-                            'content': content,
-                            'file': transcript_file
-                        })
-
-                        # 显示结果（不包含处理时间）
-                        self.display_result(filename, content)
-
-                        # 累计处理时间和加速倍率
-                        if result.get('processing_time') is not None:
-                            total_processing_time += result['processing_time']
-                            success_count += 1
-                        if result.get('speed_ratio') is not None:
-                            total_speed_ratio += result['speed_ratio']
+        entries = {}
 
-                else:
-                    error_msg = f"处理失败: {result.get('error', '未知错误')}"
-                    filename = os.path.basename(file_path)
-                    self.result_textbox.insert("end", f"\n=== {filename} ===\n{error_msg}\n")
+        def job_callback(job):
+            title = os.path.relpath(job.source, directory)
+            entries[job.index] = self._collect_job_result(job, title, job.total)
+
+        self.update_status(f"正在扫描文件夹 {directory}...")
+        self.update_progress(0)
+
+        skipped_count = 0
+        try:
+            batch_result = self.manager.process_directory(
+                directory, self.update_status, job_callback, progress_callback=self.update_progress,
+                cancel_token=self.cancel_token
+            )
+            jobs = batch_result['jobs']
+            skipped_count = batch_result['skipped_count']
+        except Exception as e:
+            self.update_textbox(f"\n处理异常: {str(e)}\n")
+            jobs = []
+
+        self.processed_results = [entries[i] for i in sorted(entries) if entries[i]]
+        self._finish_batch(jobs, f"完成！处理了 {len(jobs)} 个文件，跳过 {skipped_count} 个已转录文件")
+
+    def stop_processing(self):
+        """停止处理：终止正在运行的下载和转录进程，尚未开始的任务不再处理"""
+        if not self.processing or not self.cancel_token:
+            return
+
+        self.cancel_token.cancel("已被用户停止")
+        self.update_button_state(self.stop_button, "disabled")
+        self.update_status("正在停止...")
+
+    def _collect_job_result(self, job, title, total):
+        """
+        读取并显示单个任务的结果（在批处理线程中调用）
 
-            except Exception as e:
-                error_msg = f"处理异常: {str(e)}"
-                filename = os.path.basename(file_path)
-                self.result_textbox.insert("end", f"\n=== {filename} ===\n{error_msg}\n")
+        Args:
+            job: 已完成的 Job 对象
+            title (str): 结果标题
+            total (int): 本批次任务总数
 
-        self.progress_bar.set(1.0)
+        Returns:
+            dict: 结果条目（title/content/file），失败时返回 None
+        """
+        result = job.result or {}
+
+        if not result.get('success'):
+            error_msg = f"处理失败: {result.get('error', '未知错误')}"
+            self.update_textbox(f"\n=== {title} ===\n{error_msg}\n")
+            return None
+
+        transcript_file = result.get('transcript_file')
+        if not transcript_file or not os.path.exists(transcript_file):
+            return None
+
+        try:
+            with open(transcript_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            self.update_textbox(f"\n=== {title} ===\n处理异常: {str(e)}\n")
+            return None
+
+        # 显示内容（截取前500字符预览），多个结果时显示标题
+        preview = content[:500] + "..." if len(content) > 500 else content
+        header = f"\n=== {title} ===\n" if total > 1 else ""
+        self.update_textbox(f"{header}{preview}\n")
+
+        return {
+            'title': title,
+            'content': content,
+            'file': transcript_file
+        }
+
+    def _finish_batch(self, jobs, status_msg):
+        """批处理结束后汇总统计并恢复界面状态"""
+        self.update_progress(1.0)
+
+        # 用户停止时说明已完成的数量
+        if self.cancel_token and self.cancel_token.cancelled:
+            done_count = sum(1 for job in jobs if job.success)
+            status_msg = f"已停止，{done_count}/{len(jobs)} 个任务已完成"
+
+        # 累计处理时间和加速倍率
+        total_processing_time = 0
+        total_speed_ratio = 0
+        success_count = 0
+
+        for job in jobs:
+            result = job.result or {}
+            if not result.get('success'):
+                continue
+            if result.get('processing_time') is not None:
+                total_processing_time += result['processing_time']
+                success_count += 1
+            if result.get('speed_ratio') is not None:
+                total_speed_ratio += result['speed_ratio']
 
         # 构建状态消息，包含处理时间和加速倍率
-        status_msg = f"完成！处理了 {total_files} 个文件"
         if success_count > 0:
             avg_speed_ratio = total_speed_ratio / success_count
             status_msg += f"，⏱️  处理时间: {total_processing_time:.2f}秒 | ⚡ 加速倍率: {avg_speed_ratio:.2f}x"
 
         self.update_status(status_msg)
         self.processing = False
-        self.start_button.configure(state="normal")
+        self.update_button_state(self.start_button, "normal")
+        self.update_button_state(self.stop_button, "disabled")
 
         # 启用复制和打开文件按钮
         if self.processed_results:
-            self.copy_button.configure(state="normal")
+            self.update_button_state(self.copy_button, "normal")
             if len(self.processed_results) == 1:
-                self.open_file_button.configure(state="normal")
+                self.update_button_state(self.open_file_button, "normal")
                 self.current_transcript_file = self.processed_results[0]['file']
 
-    def display_result(self, title, content):
-        """显示处理结果"""
-        if len(self.processed_results) > 1:
-            # 多个结果，显示标题
-            self.result_textbox.insert("end", f"\n=== {title} ===\n")
-
-        # 显示内容（截取前500字符预览）
-        preview = content[:500] + "..." if len(content) > 500 else content
-        self.result_textbox.insert("end", f"{preview}\n")
-
-        # 滚动到底部
-        self.result_textbox.see("end")
-
     def copy_result_text(self):
         """复制结果文本到剪贴板（智能复制）"""
         try:
@@ -1185,6 +1259,7 @@ class StreamScribeCompactUI:
 
         # 清除选择的文件
         self.selected_files = []
+        self.selected_directory = None
         self.update_file_list_display()
 
         # 重置强制转录模式